@@ -9,6 +9,7 @@ from tutelary.models import Policy
 from tutelary.decorators import permissioned_model
 
 from simple_history.models import HistoricalRecords
+from core.permissions import invalidate_permissions
 from .manager import UserManager
 
 
@@ -61,6 +62,11 @@ class User(auth_base.AbstractBaseUser, auth.PermissionsMixin):
                     {'error_message':
                      _("You don't have permission to update user details")})]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Deferred fields are not in __dict__ and are not loaded here.
+        self._original_is_active = self.__dict__.get('is_active')
+
     def get_full_name(self):
         """
         Returns the full_name.
@@ -75,3 +81,12 @@ def assign_default_policy(sender, instance, **kwargs):
     if policy not in assigned_policies:
         assigned_policies.insert(0, policy)
     instance.assign_policies(*assigned_policies)
+
+
+@receiver(models.signals.post_save, sender=User)
+def invalidate_deactivated_permissions(sender, instance, created, **kwargs):
+    # is_active is not part of the key of cached permission decisions, so
+    # they are dropped when it changes.
+    if not created and instance._original_is_active != instance.is_active:
+        invalidate_permissions()
+    instance._original_is_active = instance.is_active
@@ -71,6 +71,7 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE_CLASSES = (
+    'core.middleware.PermissionCacheMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -277,3 +278,80 @@ MIME_LOOKUPS = {
     'image/gif': 'gif',
     'image/tiff': 'tiff'
 }
+
+# The cache is shared by the server processes, so that the versions that
+# invalidate cached permissions, tiles and pages reach all of them.
+# Deployments running on several hosts point MEMCACHED_LOCATION at a
+# memcached server all of them use. Values over memcached's item size
+# (1 MB by default), such as very large pages, are not cached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ.get('MEMCACHED_LOCATION', '127.0.0.1:11211'),
+    }
+}
+
+# Project data exports run as jobs: 'thread' runs them in an in-process
+# worker pool, 'worker' leaves them to the runexportworker management
+# command and 'sync' runs them within the request. 'thread' needs uWSGI's
+# enable-threads option, which both uwsgi.ini files set.
+EXPORT_JOB_MODE = 'thread'
+EXPORT_JOB_WORKERS = 2
+# Pending and running jobs that have not made progress for this long are
+# taken for lost, e.g. when the process running them was restarted, and
+# are marked as failed so that the export is requested again.
+EXPORT_JOB_TIMEOUT = 60 * 10
+
+# Thumbnails of image resources and the layers of GPX resources are
+# created after the upload: 'thread' creates them in an in-process worker
+# pool and 'sync' within the request. Like EXPORT_JOB_MODE, 'thread'
+# needs uWSGI's enable-threads option. Resource.thumbnail links to the
+# 128x128 thumbnail.
+RESOURCE_DERIVATIVE_MODE = 'thread'
+RESOURCE_DERIVATIVE_WORKERS = 2
+RESOURCE_THUMBNAIL_SIZES = ((128, 128),)
+
+# GPX routes and tracks are cut into lines of at most GPX_SEGMENT_POINTS
+# points, which are simplified with a tolerance of GPX_SIMPLIFY_TOLERANCE
+# degrees (about a metre; 0 keeps every point).
+GPX_SEGMENT_POINTS = 10000
+GPX_SIMPLIFY_TOLERANCE = 0.00001
+
+# Number of threads running the exporters of an 'all data' download
+# concurrently; 0 runs them one after another.
+EXPORT_PARALLEL_WORKERS = 3
+
+# Location tiles are cached until a location of the project changes, or
+# for TILE_CACHE_TIMEOUT seconds. Tiles are not served beyond
+# TILE_MAX_ZOOM; GeoJSON tiles hold complete geometries, so map pages
+# reuse the tiles of lower zoom levels when zoomed in further.
+TILE_CACHE_TIMEOUT = 60 * 60 * 24
+TILE_MAX_ZOOM = 22
+
+# Page sizes of the project record lists in the API, see
+# core.pagination.CursorPagination.
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+# Number of parties returned by each request of the party typeahead.
+PARTY_SEARCH_LIMIT = 20
+PARTY_SEARCH_MAX_LIMIT = 100
+
+# Rendered /collect/formList/ responses are cached per user; any change to
+# questionnaires, projects or memberships invalidates them.
+FORM_LIST_CACHE_TIMEOUT = 60 * 60
+
+# Permission decisions are kept in the shared cache (see CACHES) for this
+# long; 0 keeps them for the current request only. Hosts that do not share
+# the cache would honour a revoked permission until the timeout.
+PERMISSION_CACHE_TIMEOUT = 60 * 10
+
+# Parsed XLSForms and their XForm XML are cached by the content of the
+# uploaded file, so uploading the same form again skips pyxform.
+XLSFORM_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Organization and project pages rendered for anonymous visitors are
+# cached until organizations, projects, permissions or the records of the
+# project change, or for PAGE_CACHE_TIMEOUT seconds. The same timeout
+# applies to the cached map setup of project pages.
+PAGE_CACHE_TIMEOUT = 60 * 60
@@ -1,3 +1,13 @@
 from .dev import *  # NOQA
 
 MEDIA_ROOT = os.path.join(os.path.dirname(BASE_DIR), 'core/media/test')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+EXPORT_JOB_MODE = 'sync'
+RESOURCE_DERIVATIVE_MODE = 'sync'
+EXPORT_PARALLEL_WORKERS = 0
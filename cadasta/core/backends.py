@@ -1,6 +1,19 @@
 from tutelary.backends import Backend as TutelaryBackend
+from tutelary.engine import Object
 from django.contrib.auth.backends import ModelBackend
 
+from .permissions import get_decision
+
 
 class Auth(TutelaryBackend, ModelBackend):
-    pass
+    def has_perm(self, user, perm, obj=None, *args, **kwargs):
+        # Permission objects are resolved to their paths first, so that
+        # decisions on the same object share a cache entry.
+        if hasattr(obj, 'get_permissions_object'):
+            obj = obj.get_permissions_object(perm)
+        if obj is not None and not isinstance(obj, Object):
+            return super().has_perm(user, perm, obj, *args, **kwargs)
+
+        return get_decision(
+            user, perm, None if obj is None else str(obj),
+            lambda: super(Auth, self).has_perm(user, perm, obj))
@@ -0,0 +1,82 @@
+import resource
+import time
+
+from django.db import transaction
+from organization.models import Organization, Project
+from party.models import Party, TenureRelationship
+from spatial.models import SpatialUnit
+
+from .util import random_id
+
+BATCH_SIZE = 5000
+
+
+def peak_rss():
+    """Peak resident set size of this process in kilobytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Benchmark:
+    """Context manager that times a block of work on ``count`` records.
+
+    Peak RSS can only grow within a process, so run increasing record
+    counts in one process (or one count per process) to compare them.
+    """
+
+    def __init__(self, name, count):
+        self.name = name
+        self.count = count
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.rss = peak_rss()
+
+    @property
+    def rate(self):
+        return self.count / self.elapsed if self.elapsed else 0
+
+    def __str__(self):
+        return '{}: {} records in {:.2f}s ({:.0f}/s), peak RSS {} kB'.format(
+            self.name, self.count, self.elapsed, self.rate, self.rss)
+
+
+def create_project_records(count, project=None):
+    """Creates a project with ``count`` locations, parties and tenure
+    relationships, bypassing model ``save()`` for speed."""
+    if project is None:
+        org = Organization.objects.create(name='Benchmark ' + random_id())
+        project = Project.objects.create(name='Benchmark', organization=org)
+
+    for start in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        units = [SpatialUnit(id=random_id(), project=project, type='PA',
+                             geometry='SRID=4326;POINT ({} {})'.format(
+                                 (start + i) % 360 - 180, (i % 180) - 90),
+                             attributes={})
+                 for i in range(size)]
+        parties = [Party(id=random_id(), project=project,
+                         name='Party {}'.format(start + i), attributes={})
+                   for i in range(size)]
+        SpatialUnit.objects.bulk_create(units)
+        Party.objects.bulk_create(parties)
+        TenureRelationship.objects.bulk_create([
+            TenureRelationship(id=random_id(), project=project, party=p,
+                               spatial_unit=su, tenure_type_id='FH',
+                               attributes={})
+            for p, su in zip(parties, units)
+        ])
+
+    return project
+
+
+def run_in_rollback(func, *args, **kwargs):
+    """Runs ``func`` inside a transaction that is always rolled back, so
+    benchmark records never persist."""
+    with transaction.atomic():
+        result = func(*args, **kwargs)
+        transaction.set_rollback(True)
+    return result
@@ -0,0 +1,23 @@
+import time
+
+from django.core.cache import cache
+
+
+def get_version(key):
+    """Returns the version stored under ``key``. Cache keys that include
+    the version are abandoned by incrementing it."""
+    version = cache.get(key)
+    if version is None:
+        # Starting from the current time means that versions used before
+        # the key was evicted are not used again.
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def increment_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Without a version nothing has been cached under it yet.
+        pass
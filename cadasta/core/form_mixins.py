@@ -1,14 +1,22 @@
-from tutelary.models import Role
+from django.contrib.contenttypes.models import ContentType
+from jsonattrs import forms as jsonattrs_forms
 
+from .permissions import is_superuser
+from .schemas import lookup_instance_schemas, lookup_schemas
 
-class SuperUserCheck:
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._su_role = None
 
+class SuperUserCheck:
     def is_superuser(self, user):
-        if not hasattr(self, 'su_role'):
-            self.su_role = Role.objects.get(name='superuser')
+        return is_superuser(user)
+
 
-        return any([isinstance(pol, Role) and pol == self.su_role
-                    for pol in user.assigned_policies()])
+class AttributeModelForm(jsonattrs_forms.AttributeModelForm):
+    def add_attribute_fields(self, schema_selectors):
+        # Caches the schemas with their attributes before jsonattrs looks
+        # them up, so that it builds the fields without further queries.
+        if self.instance.pk:
+            lookup_instance_schemas(self.instance)
+        elif schema_selectors is not None:
+            lookup_schemas(ContentType.objects.get_for_model(self.Meta.model),
+                           [s['selector'] for s in schema_selectors])
+        super().add_attribute_fields(schema_selectors)
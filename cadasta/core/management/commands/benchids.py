@@ -0,0 +1,72 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from organization.models import Organization, Project
+from party.models import Party
+from spatial.models import SpatialUnit
+
+from ...benchmarks import Benchmark, run_in_rollback
+from ...util import ID_FIELD_LENGTH, byte_to_base32_chr
+
+
+def legacy_save(instance):
+    """Saves ``instance`` the way RandomIDModel used to: building the id
+    with the random module, and checking that it is unused first."""
+    while True:
+        instance.id = ''.join(byte_to_base32_chr(random.randint(0, 0xFF))
+                              for i in range(ID_FIELD_LENGTH))
+        if not type(instance).objects.filter(pk=instance.id).exists():
+            break
+    instance.save(force_insert=True)
+
+
+class Command(BaseCommand):
+    help = """Compares insert rates of parties and locations saved with the
+            former id checks, saved with optimistic inserts, and inserted
+            with bulk_insert. Nothing is written to the database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records',
+                            nargs='+',
+                            type=int,
+                            dest='records',
+                            default=[1000],
+                            help="""Numbers of records to insert.""")
+
+    def build(self, model, project, count):
+        if model is Party:
+            return [Party(project=project, name='Party {}'.format(i),
+                          attributes={})
+                    for i in range(count)]
+        return [SpatialUnit(project=project, type='PA', attributes={},
+                            geometry='SRID=4326;POINT (0 0)')
+                for i in range(count)]
+
+    def run(self, count):
+        org = Organization.objects.create(name='Benchmark')
+        project = Project.objects.create(name='Benchmark', organization=org)
+
+        for model in (Party, SpatialUnit):
+            name = model._meta.verbose_name_plural
+
+            instances = self.build(model, project, count)
+            with Benchmark('{}: checked ids'.format(name), count) as bench:
+                for instance in instances:
+                    legacy_save(instance)
+            self.stdout.write(str(bench))
+
+            instances = self.build(model, project, count)
+            with Benchmark('{}: save()'.format(name), count) as bench:
+                for instance in instances:
+                    instance.save()
+            self.stdout.write(str(bench))
+
+            instances = self.build(model, project, count)
+            with Benchmark('{}: bulk_insert()'.format(name), count) as bench:
+                model.bulk_insert(instances)
+            self.stdout.write(str(bench))
+
+    def handle(self, *args, **options):
+        for count in sorted(options['records']):
+            run_in_rollback(self.run, count)
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from tutelary.backends import Backend as TutelaryBackend
+
+from accounts.models import User
+from organization.models import OrganizationRole
+
+from ...backends import Auth
+from ...benchmarks import Benchmark, create_project_records, run_in_rollback
+from ...permissions import clear_request_cache
+from ...util import random_id
+
+ACTIONS = ('spatial.view', 'spatial.update', 'spatial.delete')
+
+
+class Command(BaseCommand):
+    help = """Compares tutelary permission checks with the memoized checks,
+            in checks per second, on the locations of a generated project.
+            Nothing is written to the database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records',
+                            nargs='+',
+                            type=int,
+                            dest='records',
+                            default=[1000],
+                            help="""Numbers of locations to check.""")
+        parser.add_argument('--requests',
+                            type=int,
+                            dest='requests',
+                            default=5,
+                            help="""Number of times every location is
+                                    checked, each time as a new request.""")
+
+    def check_all(self, backend, user, project, locations, requests):
+        for i in range(requests):
+            clear_request_cache()
+            # Views check the project, and templates check it again for
+            # every record they list.
+            for location in locations:
+                backend.has_perm(user, 'project.view_private', project)
+                for action in ACTIONS:
+                    backend.has_perm(user, action, location)
+
+    def run(self, count, requests):
+        project = create_project_records(count)
+        user = User.objects.create(username='benchmark-' + random_id(),
+                                   email='benchmark@example.com')
+        OrganizationRole.objects.create(organization=project.organization,
+                                        user=user)
+        locations = list(project.spatial_units.select_related(
+            'project__organization'))
+        checks = count * (len(ACTIONS) + 1) * requests
+
+        for name, backend in (('tutelary', TutelaryBackend()),
+                              ('memoized', Auth())):
+            with Benchmark(name, checks) as bench:
+                self.check_all(backend, user, project, locations, requests)
+            self.stdout.write(str(bench))
+
+    def handle(self, *args, **options):
+        for count in sorted(options['records']):
+            run_in_rollback(self.run, count, options['requests'])
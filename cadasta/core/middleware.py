@@ -0,0 +1,12 @@
+from .permissions import clear_request_cache
+
+
+class PermissionCacheMiddleware:
+    """Forgets the permission decisions of the previous request."""
+
+    def process_request(self, request):
+        clear_request_cache()
+
+    def process_response(self, request, response):
+        clear_request_cache()
+        return response
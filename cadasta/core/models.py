@@ -1,55 +1,249 @@
+import contextlib
+import functools
 import itertools
-import math
+import operator
+import re
 from core.util import slugify
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from jsonattrs.models import Attribute, Schema
+from tutelary.models import PermissionSet, Policy, Role
 
-from .util import random_id, ID_FIELD_LENGTH
+from .permissions import invalidate_permissions
+from .schemas import invalidate_schemas
+from .util import random_id, random_ids, ID_FIELD_LENGTH
+
+ID_INSERT_ATTEMPTS = 3
+SLUG_INSERT_ATTEMPTS = 3
+SLUG_SUFFIX_DIGITS = 6
 
 
 class RandomIDModel(models.Model):
+    """Model with a random string id.
+
+    Ids are random enough that records are inserted without checking
+    that their id is unused. In the unlikely case that it is, the insert
+    fails and, outside of a transaction, is retried with a new id, up to
+    ID_INSERT_ATTEMPTS times. Inside a transaction the failed insert
+    aborts it, and retrying would need a savepoint around every insert
+    for a collision that practically never happens, so the error is
+    raised instead.
+    """
+
     id = models.CharField(primary_key=True, max_length=ID_FIELD_LENGTH)
 
     class Meta:
         abstract = True
 
     def save(self, *args, **kwargs):
-        if not self.id:
-            kwargs['force_insert'] = True
+        if self.id:
+            return super(RandomIDModel, self).save(*args, **kwargs)
+
+        kwargs['force_insert'] = True
+        connection = transaction.get_connection(kwargs.get('using'))
+        attempts = 1 if connection.in_atomic_block else ID_INSERT_ATTEMPTS
+        for attempt in range(1, attempts + 1):
+            self.id = random_id()
+            try:
+                return super(RandomIDModel, self).save(*args, **kwargs)
+            except IntegrityError:
+                if (attempt == attempts or
+                        not type(self).objects.filter(pk=self.id).exists()):
+                    self.id = None
+                    raise
+
+    @classmethod
+    def bulk_insert(cls, instances):
+        """Inserts ``instances`` with one ``bulk_create``, first giving ids
+        to those that have none. Like ``save()``, the insert is retried
+        with new ids if one of the ids is already used."""
+        new_instances = [instance for instance in instances
+                         if not instance.id]
+        for attempt in range(1, ID_INSERT_ATTEMPTS + 1):
+            for instance, id in zip(new_instances,
+                                    random_ids(len(new_instances))):
+                instance.id = id
+            try:
+                with transaction.atomic():
+                    return cls.objects.bulk_create(instances)
+            except IntegrityError:
+                ids = [instance.id for instance in new_instances]
+                if (attempt == ID_INSERT_ATTEMPTS or
+                        not cls.objects.filter(pk__in=ids).exists()):
+                    raise
+
+
+def savepoint_if_atomic(using=None):
+    """Outside of a transaction a failed insert leaves nothing to roll
+    back, so a savepoint is only needed inside one."""
+    if transaction.get_connection(using).in_atomic_block:
+        return transaction.atomic(using=using)
+    return contextlib.ExitStack()
+
+
+def create_historical_records(model, instances, user=None):
+    """Adds the history rows that simple_history saves for created
+    records, for ``instances`` that were inserted with ``bulk_create``."""
+    history = getattr(model, 'history', None)
+    if history is None:
+        return
+
+    history_date = timezone.now()
+    history.model.objects.bulk_create([
+        history.model(
+            history_date=history_date, history_type='+',
+            history_user=user,
+            **{field.attname: getattr(instance, field.attname)
+               for field in model._meta.fields})
+        for instance in instances
+    ])
+
+
+def slug_candidate(slug, number, max_length):
+    if not number:
+        return slug
+    suffix = '-{}'.format(number)
+    return slug[:max_length - len(suffix)] + suffix
+
+
+def candidates_pattern(slug, max_length):
+    """Returns a regular expression that matches ``slug`` and its
+    candidates with suffixes of up to SLUG_SUFFIX_DIGITS digits."""
+    def escape(text):
+        return re.sub(r'([^\w-])', r'\\\1', text)
 
-            ok = False
-            while not ok:
-                self.id = random_id()
+    alternatives = [escape(slug)]
+    for digits in range(1, SLUG_SUFFIX_DIGITS + 1):
+        alternatives.append('{}-[0-9]{{{}}}'.format(
+            escape(slug[:max_length - digits - 1]), digits))
+    return '^({})$'.format('|'.join(alternatives))
 
-                if not type(self).objects.filter(pk=self.id).exists():
-                    ok = True
-                    super(RandomIDModel, self).save(*args, **kwargs)
 
-        else:
-            super(RandomIDModel, self).save(*args, **kwargs)
+def taken_slugs(model, slugs):
+    """Returns the slugs in use among the candidates of ``slugs``, read
+    with one query."""
+    max_length = model._meta.get_field('slug').max_length
+
+    # The candidates with suffixes of up to SLUG_SUFFIX_DIGITS digits keep
+    # this prefix after truncation; it narrows the rows the pattern is
+    # matched against.
+    prefix_length = max_length - SLUG_SUFFIX_DIGITS - 1
+    query = functools.reduce(operator.or_, (
+        models.Q(slug__startswith=slug[:prefix_length],
+                 slug__regex=candidates_pattern(slug, max_length))
+        for slug in set(slugs)))
+    return set(model.objects.filter(query).values_list('slug', flat=True))
+
+
+def allocate_slugs(model, slugs):
+    """Returns a free slug for each of ``slugs``, appending ``-1``, ``-2``
+    and so on to the slugs that are taken.
+
+    The slugs in use are read with one query for the whole batch, which
+    only returns the candidates of ``slugs``, and a slug that occurs more
+    than once in ``slugs`` gets a different suffix each time. The slugs
+    are only free at the time of the query; see SlugModel for how
+    concurrent creates are handled.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    taken = taken_slugs(model, slugs)
+
+    allocated = []
+    for slug in slugs:
+        for number in itertools.count():
+            candidate = slug_candidate(slug, number, max_length)
+            if candidate in taken:
+                continue
+            if (len(str(number)) > SLUG_SUFFIX_DIGITS and
+                    model.objects.filter(slug=candidate).exists()):
+                continue
+            break
+        taken.add(candidate)
+        allocated.append(candidate)
+    return allocated
 
 
 class SlugModel:
+    """Model with a unique slug, which is derived from the name unless it
+    is set.
+
+    If the slug is taken, a numeric suffix is added. Two records created
+    at the same time may still be given the same slug; the unique
+    constraint then rejects one of them, which is saved again with a new
+    slug, up to SLUG_INSERT_ATTEMPTS times.
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__original_slug = self.slug
 
-    def save(self, *args, **kwargs):
+    def get_requested_slug(self):
+        if self.slug:
+            return self.slug
         max_length = self._meta.get_field('slug').max_length
-        if not self.slug:
-            self.slug = slugify(
-                self.name, max_length=max_length, allow_unicode=True
-            )
+        return slugify(self.name, max_length=max_length, allow_unicode=True)
 
-        orig_slug = self.slug
+    def save(self, *args, **kwargs):
+        self.slug = self.get_requested_slug()
+        if self.id and self.__original_slug == self.slug:
+            return super().save(*args, **kwargs)
 
-        if not self.id or self.__original_slug != self.slug:
-            for x in itertools.count(1):
-                if not type(self).objects.filter(slug=self.slug).exists():
-                    break
-                slug_length = max_length - int(math.log10(x)) - 2
-                trial_slug = orig_slug[:slug_length]
-                self.slug = '{}-{}'.format(trial_slug, x)
+        model = type(self)
+        requested_slug = self.slug
+        for attempt in range(1, SLUG_INSERT_ATTEMPTS + 1):
+            self.slug = allocate_slugs(model, [requested_slug])[0]
+            try:
+                with savepoint_if_atomic(kwargs.get('using')):
+                    result = super().save(*args, **kwargs)
+                break
+            except IntegrityError:
+                if (attempt == SLUG_INSERT_ATTEMPTS or
+                        not model.objects.filter(slug=self.slug).exists()):
+                    raise
 
         self.__original_slug = self.slug
+        return result
+
+    @classmethod
+    def bulk_insert(cls, instances):
+        """Allocates slugs for ``instances`` with one query and inserts
+        them with ``bulk_insert``, allocating again if another record
+        took one of the slugs in the meantime."""
+        requested_slugs = [instance.get_requested_slug()
+                           for instance in instances]
+        for attempt in range(1, SLUG_INSERT_ATTEMPTS + 1):
+            slugs = allocate_slugs(cls, requested_slugs)
+            for instance, slug in zip(instances, slugs):
+                instance.slug = slug
+            try:
+                with transaction.atomic():
+                    result = super().bulk_insert(instances)
+                break
+            except IntegrityError:
+                if (attempt == SLUG_INSERT_ATTEMPTS or
+                        not cls.objects.filter(slug__in=slugs).exists()):
+                    raise
+
+        for instance in instances:
+            instance.__original_slug = instance.slug
+        return result
+
+
+@receiver(models.signals.post_save, sender=Policy)
+@receiver(models.signals.post_delete, sender=Policy)
+@receiver(models.signals.post_save, sender=Role)
+@receiver(models.signals.post_delete, sender=Role)
+@receiver(models.signals.post_save, sender=PermissionSet)
+@receiver(models.signals.post_delete, sender=PermissionSet)
+@receiver(models.signals.m2m_changed, sender=PermissionSet.users.through)
+def invalidate_permission_cache(sender, **kwargs):
+    invalidate_permissions()
+
 
-        return super().save(*args, **kwargs)
+@receiver(models.signals.post_save, sender=Schema)
+@receiver(models.signals.post_delete, sender=Schema)
+@receiver(models.signals.post_save, sender=Attribute)
+@receiver(models.signals.post_delete, sender=Attribute)
+def invalidate_schema_cache(sender, **kwargs):
+    invalidate_schemas()
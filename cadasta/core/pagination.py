@@ -0,0 +1,139 @@
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.http import StreamingHttpResponse
+from rest_framework import pagination
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_gis.serializers import GeoFeatureModelSerializer
+
+
+def value_ordering(model, field_name):
+    """Returns the ordering of ``model`` by the field ``field_name`` as a
+    lookup of a value the cursor can hold. Like the ORM, records are
+    ordered by a foreign key by the default ordering of the related
+    records, so ``organization`` becomes ``organization__name``."""
+    prefix = '-' if field_name.startswith('-') else ''
+    name = field_name.lstrip('-')
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return field_name
+    if field.many_to_one:
+        related_ordering = field.related_model._meta.ordering or ('pk',)
+        name += '__' + related_ordering[0].lstrip('-')
+    return prefix + name
+
+
+class CursorPagination(pagination.CursorPagination):
+    """Keyset pagination over the random ids of the records, or over the
+    field requested with the `ordering` parameter. Unlike page numbers, a
+    cursor does not need to count or skip the rows before the page.
+
+    The page size is the API_PAGE_SIZE setting, and can be changed with
+    the `page_size` parameter up to API_MAX_PAGE_SIZE.
+    """
+
+    ordering = ('id',)
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            page_size = 0
+        if page_size <= 0:
+            return settings.API_PAGE_SIZE
+        return min(page_size, settings.API_MAX_PAGE_SIZE)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = tuple(value_ordering(queryset.model, field)
+                         for field in ordering or self.ordering)
+
+        # Records with the same value of the ordering field are kept in a
+        # stable order by their ids.
+        if ordering[0].lstrip('-') != 'id':
+            ordering += ('id',)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        value = instance
+        for name in ordering[0].lstrip('-').split('__'):
+            value = getattr(value, name)
+        return str(value)
+
+
+class GeoJsonCursorPagination(CursorPagination):
+    """Cursor pagination for GeoJSON feature collections."""
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('type', 'FeatureCollection'),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('features', data['features'])
+        ]))
+
+
+class PaginatedListMixin:
+    """Paginates the list with a cursor. Clients that send
+    ``paginate=false`` get all records in one response instead, which is
+    streamed and serialized ``stream_chunk_size`` records at a time."""
+
+    pagination_class = CursorPagination
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('paginate', '').lower() != 'false':
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(self.stream_list(queryset),
+                                     content_type='application/json')
+
+    def iterate_chunks(self, queryset):
+        if 'ordering' in self.request.query_params:
+            chunk = []
+            for obj in queryset.iterator():
+                chunk.append(obj)
+                if len(chunk) == self.stream_chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+            return
+
+        # Without an explicit ordering, records are read in chunks that
+        # start after the id of the last record of the previous chunk.
+        queryset = queryset.order_by('pk')
+        chunk = list(queryset[:self.stream_chunk_size])
+        while chunk:
+            yield chunk
+            if len(chunk) < self.stream_chunk_size:
+                break
+            chunk = list(queryset.filter(
+                pk__gt=chunk[-1].pk)[:self.stream_chunk_size])
+
+    def stream_list(self, queryset):
+        is_geojson = issubclass(self.get_serializer_class(),
+                                GeoFeatureModelSerializer)
+        if is_geojson:
+            yield '{"type": "FeatureCollection", "features": ['
+        else:
+            yield '['
+
+        separator = ''
+        for chunk in self.iterate_chunks(queryset):
+            data = self.get_serializer(chunk, many=True).data
+            for item in (data['features'] if is_geojson else data):
+                yield separator + json.dumps(item, cls=JSONEncoder)
+                separator = ', '
+
+        yield ']}' if is_geojson else ']'
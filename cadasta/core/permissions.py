@@ -0,0 +1,80 @@
+"""Memoization of tutelary permission decisions.
+
+Decisions are remembered for the rest of the request, and for
+PERMISSION_CACHE_TIMEOUT seconds in the shared cache. Both are keyed by
+a version that changes whenever policies, roles or policy assignments
+change, see the receivers in core.models, or users are activated or
+deactivated, see accounts.models.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from tutelary.models import Role
+
+from .cache import get_version, increment_version
+
+VERSION_KEY = 'core.permissions.version'
+
+_request_cache = threading.local()
+
+
+def get_request_cache():
+    decisions = getattr(_request_cache, 'decisions', None)
+    if decisions is None:
+        _request_cache.version = get_version(VERSION_KEY)
+        decisions = _request_cache.decisions = {}
+    return decisions
+
+
+def clear_request_cache():
+    _request_cache.decisions = None
+
+
+def invalidate_permissions():
+    increment_version(VERSION_KEY)
+    # Decisions made before the change is committed are made from the old
+    # rows; the version is changed again so that they are not used.
+    transaction.on_commit(lambda: increment_version(VERSION_KEY))
+    clear_request_cache()
+
+
+def get_decision(user, action, path, decide):
+    """Returns whether ``user`` may perform ``action`` on the object at
+    ``path``, calling ``decide()`` only if the decision is not cached."""
+    decisions = get_request_cache()
+    key = (user.pk, action, path)
+    if key in decisions:
+        return decisions[key]
+
+    timeout = settings.PERMISSION_CACHE_TIMEOUT
+    if timeout:
+        shared_key = 'core.permissions:{}:{}'.format(
+            _request_cache.version,
+            hashlib.md5(repr(key).encode()).hexdigest())
+        allowed = cache.get(shared_key)
+        if allowed is None:
+            allowed = decide()
+            cache.set(shared_key, allowed, timeout)
+    else:
+        allowed = decide()
+
+    decisions[key] = allowed
+    return allowed
+
+
+def is_superuser(user):
+    """Whether the superuser role is assigned to ``user``, looked up once
+    per request."""
+    if not hasattr(user, 'assigned_policies'):
+        return False
+
+    decisions = get_request_cache()
+    key = (user.pk, 'superuser')
+    if key not in decisions:
+        decisions[key] = any(
+            isinstance(policy, Role) and policy.name == 'superuser'
+            for policy in user.assigned_policies())
+    return decisions[key]
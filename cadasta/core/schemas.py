@@ -0,0 +1,100 @@
+"""Process-wide cache of jsonattrs schemas and their composed attributes.
+
+jsonattrs caches the schemas for each content type and selector list,
+but reads the attributes of every schema again each time they are
+composed, which happens for every form and every model instance with
+attributes. The schemas cached here are fetched in one query with their
+attributes and attribute types prefetched. They are stored in jsonattrs'
+own cache, so the schema lookups that jsonattrs makes while validating
+model instances compose them without queries too.
+
+Cached schemas are dropped when schemas or attributes change, see the
+receivers in core.models.
+"""
+import functools
+import operator
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Prefetch, Q
+from django.db.models.query import prefetch_related_objects
+from jsonattrs.models import Attribute, Schema, SchemaManager, compose_schemas
+
+from .cache import get_version, increment_version
+
+VERSION_KEY = 'core.schemas.version'
+
+_composed = {}
+_version = None
+
+
+def attributes_prefetch():
+    return Prefetch('attributes',
+                    queryset=Attribute.objects.select_related('attr_type'))
+
+
+def is_prefetched(schema):
+    return 'attributes' in getattr(schema, '_prefetched_objects_cache', {})
+
+
+def check_version():
+    """Drops the cached schemas if they were changed, possibly by another
+    process, since they were cached."""
+    global _version
+    version = get_version(VERSION_KEY)
+    if version != _version:
+        SchemaManager.invalidate_cache()
+        _composed.clear()
+        _version = version
+
+
+def invalidate_schemas():
+    increment_version(VERSION_KEY)
+    check_version()
+
+
+def lookup_schemas(content_type, selectors):
+    """Returns the schemas for ``content_type`` that apply to
+    ``selectors``, like ``Schema.objects.lookup``, with their attributes
+    prefetched."""
+    selectors = tuple(selectors)
+    if any(s is None for s in selectors):
+        return None
+
+    check_version()
+    key = (content_type, selectors)
+    schemas = SchemaManager.cache.get(key)
+    if schemas is None:
+        prefixes = [tuple(str(s) for s in selectors[:i])
+                    for i in range(len(selectors) + 1)]
+        query = functools.reduce(operator.or_, (Q(selectors=list(p))
+                                                for p in prefixes))
+        found = {
+            tuple(schema.selectors): schema
+            for schema in Schema.objects.filter(
+                query, content_type=content_type
+            ).prefetch_related(attributes_prefetch())
+        }
+        schemas = [found[p] for p in prefixes if p in found]
+        SchemaManager.cache[key] = schemas
+    elif not all(is_prefetched(schema) for schema in schemas):
+        # Cached by jsonattrs itself.
+        prefetch_related_objects(schemas, [attributes_prefetch()])
+    return schemas
+
+
+def lookup_instance_schemas(instance):
+    content_type = ContentType.objects.get_for_model(instance)
+    return lookup_schemas(
+        content_type, Schema.objects._get_selectors(instance, content_type))
+
+
+def get_attributes(content_type, selectors):
+    """Returns the attributes of the schemas for ``content_type`` and
+    ``selectors``, composed like ``compose_schemas`` does: a dict of
+    attributes by name, and the sets of names of required attributes and
+    of attributes with defaults."""
+    schemas = lookup_schemas(content_type, selectors) or []
+    key = (content_type, tuple(selectors))
+    if key not in _composed:
+        _composed[key] = compose_schemas(*schemas)
+    return _composed[key]
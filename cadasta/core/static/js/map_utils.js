@@ -37,7 +37,62 @@ function add_map_controls(map) {
   return map
 }
 
-function renderFeatures(map, projectExtent, spatialUnits, trans, fitBounds) {
+function loadLocationTiles(map, geoJson, tilesUrl, exclude) {
+  // Tiles below maxTileZoom hold geometries simplified for their zoom
+  // level, which are replaced when tiles of a higher zoom level are
+  // loaded. Tiles of maxTileZoom hold complete geometries, so they are
+  // reused when the map is zoomed in further.
+  var maxTileZoom = 16;
+  var tileSize = 256;
+  var loadedTiles = {};
+  // Zoom level of the tile each feature was loaded from, and its layer.
+  var loadedFeatures = {};
+  var featureLayers = {};
+  if (exclude) { loadedFeatures[exclude] = Infinity; }
+
+  var onEachFeature = geoJson.options.onEachFeature;
+  geoJson.options.onEachFeature = function(feature, layer) {
+    featureLayers[feature.id] = layer;
+    if (onEachFeature) { onEachFeature(feature, layer); }
+  };
+
+  function addFeatures(data, zoom) {
+    $.each(data.features, function(idx, feature) {
+      var loadedZoom = loadedFeatures[feature.id];
+      if (loadedZoom !== undefined) {
+        // Points are never simplified.
+        if (loadedZoom >= zoom || feature.geometry.type === 'Point') return;
+        geoJson.removeLayer(featureLayers[feature.id]);
+      }
+      loadedFeatures[feature.id] = zoom;
+      geoJson.addData(feature);
+    });
+  }
+
+  function loadTiles() {
+    var zoom = Math.min(map.getZoom(), maxTileZoom);
+    var bounds = map.getBounds();
+    var nw = map.project(bounds.getNorthWest(), zoom).divideBy(tileSize).floor();
+    var se = map.project(bounds.getSouthEast(), zoom).divideBy(tileSize).floor();
+    var maxTile = Math.pow(2, zoom) - 1;
+
+    for (var x = Math.max(nw.x, 0); x <= Math.min(se.x, maxTile); x++) {
+      for (var y = Math.max(nw.y, 0); y <= Math.min(se.y, maxTile); y++) {
+        var tile = zoom + '/' + x + '/' + y;
+        if (loadedTiles[tile]) continue;
+        loadedTiles[tile] = true;
+        $.getJSON(tilesUrl.replace('{z}/{x}/{y}', tile), function(data) {
+          addFeatures(data, zoom);
+        });
+      }
+    }
+  }
+
+  map.on('moveend', loadTiles);
+  loadTiles();
+}
+
+function renderFeatures(map, projectExtent, locations, trans, fitBounds) {
   var projectBounds;
 
   if (projectExtent) {
@@ -72,11 +127,10 @@ function renderFeatures(map, projectExtent, spatialUnits, trans, fitBounds) {
   });
 
   L.Deflate(map, {minSize: 20, layerGroup: geoJson});
-  geoJson.addData(spatialUnits);
 
   if (fitBounds === 'locations') {
-    if (spatialUnits.features.length) {
-      map.fitBounds(L.geoJson(spatialUnits).getBounds());
+    if (locations.bounds) {
+      map.fitBounds(locations.bounds);
     } else if (projectBounds) {
       map.fitBounds(projectBounds);
     }
@@ -86,6 +140,8 @@ function renderFeatures(map, projectExtent, spatialUnits, trans, fitBounds) {
   markerGroup.addTo(map);
   markerGroup.checkIn(geoJson);
   geoJson.addTo(map);
+
+  loadLocationTiles(map, geoJson, locations.tilesUrl, locations.exclude);
 }
 
 function switch_layer_controls(map, options){
@@ -112,9 +168,11 @@ function switch_layer_controls(map, options){
 
 function add_spatial_resources(map, url){
     $.ajax(url).done(function(data){
-        if (data.length == 0) return;
+        // The list is paginated; load the following pages too.
+        if (data.next) add_spatial_resources(map, data.next);
+        if (data.results.length == 0) return;
         var spatialResources = {};
-        $.each(data, function(idx, resource){
+        $.each(data.results, function(idx, resource){
             var name = resource.name;
             var layers = {};
             var group = new L.LayerGroup();
@@ -1,7 +1,12 @@
-import random
+from unittest.mock import patch
+
+import pytest
+from django.db import IntegrityError, connection
 from django.db.models import SlugField, CharField, Model
-from django.test import TestCase
-from ..models import RandomIDModel, SlugModel
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from ..models import (RandomIDModel, SlugModel, allocate_slugs,
+                      taken_slugs)
 
 
 class MyRandomIdModel(RandomIDModel):
@@ -17,14 +22,58 @@ class RandomIDModelTest(TestCase):
         instance.save()
         assert instance.id is not None
 
+    def test_duplicate_ids_in_transaction(self):
+        instance1 = MyRandomIdModel()
+        instance1.save()
+        with patch('core.models.random_id',
+                   side_effect=[instance1.id, 'a' * 24]):
+            instance2 = MyRandomIdModel()
+            with pytest.raises(IntegrityError):
+                instance2.save()
+        assert instance2.id is None
+
+    def test_save_does_not_check_id(self):
+        with CaptureQueriesContext(connection) as queries:
+            MyRandomIdModel().save()
+        assert len(queries) == 1
+        assert queries[0]['sql'].startswith('INSERT')
+
+    def test_bulk_insert(self):
+        instances = [MyRandomIdModel() for i in range(10)]
+        MyRandomIdModel.bulk_insert(instances)
+        assert len({instance.id for instance in instances}) == 10
+        assert MyRandomIdModel.objects.count() == 10
+
+    def test_bulk_insert_duplicate_ids(self):
+        instance = MyRandomIdModel()
+        instance.save()
+        instances = [MyRandomIdModel(), MyRandomIdModel()]
+        with patch('core.models.random_ids',
+                   side_effect=[[instance.id, 'a' * 24],
+                                ['b' * 24, 'c' * 24]]):
+            MyRandomIdModel.bulk_insert(instances)
+        assert [i.id for i in instances] == ['b' * 24, 'c' * 24]
+        assert MyRandomIdModel.objects.count() == 3
+
+
+class RandomIDModelAutocommitTest(TransactionTestCase):
     def test_duplicate_ids(self):
-        random.seed(a=10)
         instance1 = MyRandomIdModel()
         instance1.save()
-        random.seed(a=10)
-        instance2 = MyRandomIdModel()
-        instance2.save()
-        assert instance1.id != instance2.id
+        with patch('core.models.random_id',
+                   side_effect=[instance1.id, 'a' * 24]):
+            instance2 = MyRandomIdModel()
+            instance2.save()
+        assert instance2.id == 'a' * 24
+
+    def test_duplicate_ids_give_up(self):
+        instance1 = MyRandomIdModel()
+        instance1.save()
+        with patch('core.models.random_id', return_value=instance1.id):
+            instance2 = MyRandomIdModel()
+            with pytest.raises(IntegrityError):
+                instance2.save()
+        assert instance2.id is None
 
 
 class MySlugModel(SlugModel, Model):
@@ -35,6 +84,14 @@ class MySlugModel(SlugModel, Model):
         app_label = 'core'
 
 
+class MySlugIdModel(SlugModel, RandomIDModel):
+    name = CharField(max_length=100)
+    slug = SlugField(max_length=50, unique=True)
+
+    class Meta:
+        app_label = 'core'
+
+
 class SlugModelTest(TestCase):
     name = CharField(max_length=200)
     abstract_model = SlugModel
@@ -154,3 +211,61 @@ class SlugModelTest(TestCase):
 
         assert MySlugModel.objects.count() == 101
         assert instance.slug[-4:] == '-100'
+
+    def test_save_queries_for_slug(self):
+        for i in range(0, 10):
+            MySlugModel.objects.create(name='Test Name')
+
+        with CaptureQueriesContext(connection) as queries:
+            instance = MySlugModel.objects.create(name='Test Name')
+        assert instance.slug == 'test-name-10'
+        assert len([query for query in queries
+                    if query['sql'].startswith('SELECT')]) == 1
+
+    def test_save_with_taken_slug(self):
+        MySlugModel.objects.create(name='Test Name')
+        with patch('core.models.allocate_slugs',
+                   side_effect=[['test-name'], ['test-name-1']]):
+            instance = MySlugModel.objects.create(name='Test Name')
+        assert instance.slug == 'test-name-1'
+
+    def test_allocate_slugs(self):
+        MySlugModel.objects.create(name='Test Name')
+        MySlugModel.objects.create(name='Test Name')
+        MySlugModel.objects.create(name='Other')
+
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(MySlugModel, [
+                'test-name', 'test-name', 'other', 'new', 'new'])
+        assert slugs == [
+            'test-name-2', 'test-name-3', 'other-1', 'new', 'new-1']
+
+    def test_taken_slugs_are_only_candidates(self):
+        for slug in ('test', 'test-1', 'test-name', 'testing', 'test-1a'):
+            MySlugModel.objects.create(name='Test', slug=slug)
+        assert taken_slugs(MySlugModel, ['test']) == {'test', 'test-1'}
+
+    def test_allocate_slugs_long_name(self):
+        slug = 'x' * 50
+        MySlugModel.objects.create(name='Test Name', slug=slug)
+        assert allocate_slugs(MySlugModel, [slug]) == ['x' * 48 + '-1']
+
+    def test_bulk_insert(self):
+        MySlugIdModel.objects.create(name='Test Name')
+        instances = [MySlugIdModel(name='Test Name'),
+                     MySlugIdModel(name='Test Name'),
+                     MySlugIdModel(name='Other', slug='other')]
+        MySlugIdModel.bulk_insert(instances)
+
+        assert [i.slug for i in instances] == [
+            'test-name-1', 'test-name-2', 'other']
+        assert MySlugIdModel.objects.count() == 4
+
+    def test_bulk_insert_with_taken_slug(self):
+        MySlugIdModel.objects.create(name='Test Name')
+        instances = [MySlugIdModel(name='Test Name')]
+        with patch('core.models.allocate_slugs',
+                   side_effect=[['test-name'], ['test-name-1']]):
+            MySlugIdModel.bulk_insert(instances)
+        assert instances[0].slug == 'test-name-1'
+        assert MySlugIdModel.objects.count() == 2
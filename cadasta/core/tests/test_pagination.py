@@ -0,0 +1,35 @@
+from django.test import TestCase, override_settings
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ..pagination import CursorPagination
+
+
+class View:
+    filter_backends = (filters.OrderingFilter,)
+    ordering_fields = ('name',)
+
+
+def make_request(**params):
+    return Request(APIRequestFactory().get('/', params))
+
+
+@override_settings(API_PAGE_SIZE=10, API_MAX_PAGE_SIZE=50)
+class CursorPaginationTest(TestCase):
+    def test_get_page_size(self):
+        paginator = CursorPagination()
+        assert paginator.get_page_size(make_request()) == 10
+        assert paginator.get_page_size(make_request(page_size=20)) == 20
+        assert paginator.get_page_size(make_request(page_size=100)) == 50
+        assert paginator.get_page_size(make_request(page_size=0)) == 10
+        assert paginator.get_page_size(make_request(page_size='a')) == 10
+
+    def test_get_ordering(self):
+        paginator = CursorPagination()
+        assert paginator.get_ordering(make_request(), None, View()) == (
+            'id',)
+        assert paginator.get_ordering(
+            make_request(ordering='-name'), None, View()) == ('-name', 'id')
+        assert paginator.get_ordering(
+            make_request(ordering='description'), None, View()) == ('id',)
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from tutelary.models import Role
+
+from accounts.tests.factories import UserFactory
+from organization.models import OrganizationRole
+from organization.tests.factories import ProjectFactory
+
+from .utils.cases import UserTestCase
+from ..cache import get_version
+from ..permissions import VERSION_KEY, clear_request_cache, is_superuser
+
+
+class PermissionCacheTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory.create()
+        self.project = ProjectFactory.create(access='private')
+        clear_request_cache()
+
+    def test_decision_is_cached_for_the_request(self):
+        assert self.user.has_perm('org.list') is True
+        with self.assertNumQueries(0):
+            assert self.user.has_perm('org.list') is True
+
+    def test_decision_is_cached_per_object(self):
+        OrganizationRole.objects.create(
+            organization=self.project.organization, user=self.user)
+        assert self.user.has_perm('project.view_private', self.project)
+        with self.assertNumQueries(0):
+            assert self.user.has_perm('project.view_private', self.project)
+        assert not self.user.has_perm('project.view_private',
+                                      ProjectFactory.create(access='private'))
+
+    def test_decision_is_shared_between_requests(self):
+        assert self.user.has_perm('org.list') is True
+        clear_request_cache()
+        with self.assertNumQueries(0):
+            assert self.user.has_perm('org.list') is True
+
+    @override_settings(PERMISSION_CACHE_TIMEOUT=0)
+    def test_decision_is_not_shared_without_timeout(self):
+        assert self.user.has_perm('org.list') is True
+        clear_request_cache()
+        with CaptureQueriesContext(connection) as queries:
+            assert self.user.has_perm('org.list') is True
+        assert len(queries) > 0
+
+    def test_policy_assignment_invalidates_decisions(self):
+        assert not self.user.has_perm('project.view_private', self.project)
+
+        OrganizationRole.objects.create(
+            organization=self.project.organization, user=self.user)
+        assert self.user.has_perm('project.view_private', self.project)
+
+        OrganizationRole.objects.get(user=self.user).delete()
+        assert not self.user.has_perm('project.view_private', self.project)
+
+    def test_deactivating_user_invalidates_decisions(self):
+        version = get_version(VERSION_KEY)
+        self.user.full_name = 'Changed'
+        self.user.save()
+        assert get_version(VERSION_KEY) == version
+
+        self.user.is_active = False
+        self.user.save()
+        assert get_version(VERSION_KEY) != version
+
+    def test_is_superuser(self):
+        assert is_superuser(self.user) is False
+        with self.assertNumQueries(0):
+            assert is_superuser(self.user) is False
+
+        self.user.assign_policies(Role.objects.get(name='superuser'))
+        assert is_superuser(self.user) is True
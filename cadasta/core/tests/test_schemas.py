@@ -0,0 +1,79 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from jsonattrs.models import Attribute, AttributeType, Schema
+
+from organization.tests.factories import ProjectFactory
+from party.models import Party
+
+from .utils.cases import UserTestCase
+from ..schemas import get_attributes, lookup_instance_schemas, lookup_schemas
+
+
+class SchemaCacheTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create(current_questionnaire='abc')
+        self.content_type = ContentType.objects.get(app_label='party',
+                                                    model='party')
+        self.selectors = (self.project.organization.id, self.project.id,
+                          'abc')
+        self.org_schema = Schema.objects.create(
+            content_type=self.content_type,
+            selectors=(self.project.organization.id, ))
+        self.schema = Schema.objects.create(
+            content_type=self.content_type, selectors=self.selectors)
+        self.text_type = AttributeType.objects.get(name='text')
+        self.add_attribute(self.org_schema, 'org_field', index=0)
+        self.add_attribute(self.schema, 'field', index=0, required=True)
+        self.add_attribute(self.schema, 'hidden', index=1, omit=True)
+
+    def add_attribute(self, schema, name, **kwargs):
+        return Attribute.objects.create(
+            schema=schema, name=name, long_name=name,
+            attr_type=self.text_type, **kwargs)
+
+    def test_lookup_schemas(self):
+        with self.assertNumQueries(2):
+            schemas = lookup_schemas(self.content_type, self.selectors)
+        assert schemas == [self.org_schema, self.schema]
+
+        with self.assertNumQueries(0):
+            assert lookup_schemas(self.content_type, self.selectors) == (
+                schemas)
+            assert [a.name for a in schemas[1].attributes.all()] == [
+                'field', 'hidden']
+            assert schemas[1].attributes.all()[0].attr_type == self.text_type
+            assert Schema.objects.lookup(
+                content_type=self.content_type,
+                selectors=self.selectors) is schemas
+
+    def test_lookup_schemas_with_missing_selector(self):
+        assert lookup_schemas(self.content_type, (None, )) is None
+
+    def test_lookup_instance_schemas(self):
+        party = Party.objects.create(project=self.project, name='Party',
+                                     attributes={'field': 'value'})
+        # jsonattrs cached the schemas when the party was created, and
+        # only their attributes are fetched.
+        with self.assertNumQueries(1):
+            assert lookup_instance_schemas(party) == [self.org_schema,
+                                                      self.schema]
+        with self.assertNumQueries(0):
+            lookup_instance_schemas(party)
+
+    def test_get_attributes(self):
+        attrs, required, default = get_attributes(self.content_type,
+                                                  self.selectors)
+        assert list(attrs.keys()) == ['org_field', 'field']
+        assert required == {'field'}
+
+        with self.assertNumQueries(0):
+            assert get_attributes(self.content_type, self.selectors)[0] is (
+                attrs)
+
+    def test_attribute_changes_invalidate_cache(self):
+        lookup_schemas(self.content_type, self.selectors)
+        self.add_attribute(self.schema, 'new_field', index=2)
+
+        attrs, _, _ = get_attributes(self.content_type, self.selectors)
+        assert list(attrs.keys()) == ['org_field', 'field', 'new_field']
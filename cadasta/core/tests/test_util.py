@@ -0,0 +1,16 @@
+from django.test import TestCase
+
+from ..util import ID_FIELD_LENGTH, alphabet, random_id, random_ids
+
+
+class RandomIdsTest(TestCase):
+    def test_random_ids(self):
+        ids = random_ids(100)
+        assert len(set(ids)) == 100
+        for id in ids:
+            assert len(id) == ID_FIELD_LENGTH
+            assert set(id) <= set(alphabet)
+
+    def test_random_id(self):
+        assert len(random_id()) == ID_FIELD_LENGTH
+        assert random_id() != random_id()
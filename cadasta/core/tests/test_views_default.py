@@ -1,10 +1,13 @@
 import json
 from skivvy import ViewTestCase
 
+from django.db import connection
 from django.http import HttpRequest
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from accounts.tests.factories import UserFactory
+from core.permissions import clear_request_cache
 from core.tests.utils.cases import UserTestCase
 from tutelary.models import Role
 from organization.tests.factories import OrganizationFactory, ProjectFactory
@@ -46,6 +49,7 @@ class DashboardTest(ViewTestCase, UserTestCase, TestCase):
         ProjectFactory.create(
             name='Private Project',
             access='private', organization=self.org, extent=extent)
+        self.extent = extent
 
     def _render_geojson(self, projects):
         return json.dumps(ProjectGeometrySerializer(projects, many=True).data)
@@ -89,6 +93,23 @@ class DashboardTest(ViewTestCase, UserTestCase, TestCase):
         assert response.content == expected_content
         assert response.status_code == 200
 
+    def test_number_of_queries_does_not_depend_on_organizations(self):
+        user = UserFactory.create()
+        OrganizationRole.objects.create(organization=self.org, user=user)
+
+        def count_queries():
+            clear_request_cache()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.request(user=user)
+            assert response.status_code == 200
+            return len(queries)
+
+        expected = count_queries()
+        for org in OrganizationFactory.create_batch(10):
+            ProjectFactory.create(organization=org, access='private',
+                                  extent=self.extent)
+        assert count_queries() == expected
+
 
 class ServerErrorTest(TestCase):
     def setUp(self):
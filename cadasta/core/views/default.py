@@ -2,9 +2,8 @@ import json
 
 from core.views.generic import TemplateView
 from django.shortcuts import redirect
-from organization.models import Organization, Project
+from organization.models import Project
 from organization.serializers import ProjectGeometrySerializer
-from tutelary.models import Role
 
 
 class IndexPage(TemplateView):
@@ -25,23 +24,8 @@ class Dashboard(TemplateView):
         return context
 
     def get(self, request, *args, **kwargs):
-        projects = []
-        superuser = Role.objects.filter(name='superuser')
-        if len(superuser) and hasattr(self.request.user, 'assigned_policies'):
-            if superuser[0] in self.request.user.assigned_policies():
-                projects = Project.objects.filter(extent__isnull=False)
-        if projects == []:
-            if hasattr(self.request.user, 'organizations'):
-                user_orgs = self.request.user.organizations.all()
-                if len(user_orgs) > 0:
-                    for org in Organization.objects.all():
-                        if org in user_orgs:
-                            projects.extend(org.projects.filter(
-                                access='private',
-                                extent__isnull=False))
-            projects.extend(Project.objects.filter(
-                access='public',
-                extent__isnull=False))
+        projects = Project.objects.visible_to(self.request.user).filter(
+            extent__isnull=False).select_related('organization')
         context = self.get_context_data(projects=projects)
         return super(TemplateView, self).render_to_response(context)
 
@@ -1,6 +1,7 @@
 from django.shortcuts import redirect
 
-from tutelary.models import Role
+from ..permissions import is_superuser
+from ..schemas import lookup_instance_schemas
 
 
 class ArchiveMixin:
@@ -24,15 +25,29 @@ class SuperUserCheckMixin:
     @property
     def is_superuser(self):
         if self.is_su is None:
-            role = Role.objects.filter(name='superuser')
-            self.is_su = False
-            if len(role) > 0:
-                if hasattr(self.request.user, 'assigned_policies'):
-                    if role[0] in self.request.user.assigned_policies():
-                        self.is_su = True
+            self.is_su = is_superuser(self.request.user)
         return self.is_su
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         context['is_superuser'] = self.is_superuser
         return context
+
+
+class JsonAttrsMixin:
+    """Adds the labels and values of the object's attributes to the
+    context, like jsonattrs' mixin, reading the attributes from the
+    schema cache."""
+
+    def get_context_data(self, *args, **kwargs):
+        context = super().get_context_data(*args, **kwargs)
+
+        obj = self.object
+        field = self.attributes_field
+        obj_attrs = getattr(obj, field)
+
+        schemas = lookup_instance_schemas(obj) or []
+        context[field] = [(a.long_name, obj_attrs.get(a.name, '—'))
+                          for s in schemas for a in s.attributes.all()
+                          if not a.omit]
+        return context
@@ -10,3 +10,14 @@ ROLE_CHOICES = (('PU', _('Project User')),
 
 ACCESS_CHOICES = [("public", _("Public")),
                   ("private", _("Private"))]
+
+EXPORT_TYPE_CHOICES = (('all', _('All data')),
+                       ('xls', _('XLS')),
+                       ('shp', _('SHP')),
+                       ('gpkg', _('GeoPackage')),
+                       ('res', _('Resources')))
+
+EXPORT_STATUS_CHOICES = (('PE', _('Pending')),
+                         ('RU', _('Running')),
+                         ('DO', _('Done')),
+                         ('FA', _('Failed')))
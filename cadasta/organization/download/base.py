@@ -1,10 +1,15 @@
-from jsonattrs.models import Schema
+from django.core.exceptions import FieldDoesNotExist
+
+from core.schemas import lookup_schemas
 
 
 class Exporter():
+    chunk_size = 1000
+
     def __init__(self, project):
         self.project = project
         self._schema_attrs = {}
+        self._query_plans = {}
 
     def get_schema_attrs(self, content_type):
         content_type_key = '{}.{}'.format(content_type.app_label,
@@ -16,34 +21,100 @@ class Exporter():
                 self.project.id,
                 self.project.current_questionnaire
             ]
-            schemas = Schema.objects.lookup(
-                content_type=content_type, selectors=selectors
-            )
-
-            attrs = []
-            if schemas:
-                attrs = [
-                    a for s in schemas
-                    for a in s.attributes.all() if not a.omit
-                ]
+            schemas = lookup_schemas(content_type, selectors)
+
+            attrs = [attr
+                     for schema in schemas or []
+                     for attr in schema.attributes.all()
+                     if not attr.omit]
             self._schema_attrs[content_type_key] = attrs
 
         return self._schema_attrs[content_type_key]
 
-    def get_values(self, item, model_attrs, schema_attrs):
-        values = []
+    def resolve_attr(self, model, attr):
+        # Splits e.g. 'geometry.ewkt' into the values() lookup 'geometry'
+        # and the attributes ['ewkt'] read from the fetched value.
+        parts = attr.split('.')
+        lookup = []
+        while parts:
+            try:
+                field = model._meta.get_field(parts[0])
+            except FieldDoesNotExist:
+                break
+            lookup.append(field.name)
+            parts.pop(0)
+            if not field.is_relation or not parts:
+                break
+            model = field.related_model
+        return '__'.join(lookup), parts
+
+    def get_query_plan(self, model, model_attrs, with_attributes=False):
+        key = (model, tuple(model_attrs), with_attributes)
+        if key not in self._query_plans:
+            self._query_plans[key] = QueryPlan(self, model, model_attrs,
+                                               with_attributes)
+        return self._query_plans[key]
+
+    def iterate_values(self, queryset, fields):
+        # Keyset pagination on the primary key: only one chunk of rows is
+        # held in memory at a time, however large the project is. Rows are
+        # tuples of the primary key followed by ``fields``.
+        pk = queryset.model._meta.pk.name
+        queryset = queryset.order_by(pk).values_list(pk, *fields)
+        last_pk = None
+        while True:
+            chunk = queryset
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            rows = list(chunk[:self.chunk_size])
+            for row in rows:
+                yield row
+            if len(rows) < self.chunk_size:
+                break
+            last_pk = rows[-1][0]
+
+    def iterate_rows(self, queryset, model_attrs, schema_attrs):
+        plan = self.get_query_plan(queryset.model, model_attrs,
+                                   with_attributes=bool(schema_attrs))
+        for row in self.iterate_values(queryset, plan.fields):
+            yield plan.build_row(row, schema_attrs)
+
+
+class QueryPlan():
+    """The values_list() fields needed to export ``model_attrs`` of a
+    model, and how to turn a fetched tuple back into output values."""
+
+    def __init__(self, exporter, model, model_attrs, with_attributes):
+        # Fetched rows start with the primary key, followed by ``fields``.
+        columns = [model._meta.pk.name]
+        self.getters = []
         for attr in model_attrs:
-            if '.' in attr:
-                attr_items = attr.split('.')
-                value = None
-                for a in attr_items:
-                    value = (getattr(item, a)
-                             if not value else getattr(value, a))
-                values.append(value)
-            else:
-                values.append(getattr(item, attr))
-
-        for attr in schema_attrs:
-            values.append(item.attributes.get(attr.name, ''))
+            lookup, attrs = exporter.resolve_attr(model, attr)
+            if lookup not in columns:
+                columns.append(lookup)
+            self.getters.append((columns.index(lookup), attrs))
+        self.fields = columns[1:]
+
+        self.attributes_index = None
+        if with_attributes:
+            self.fields.append('attributes')
+            self.attributes_index = len(self.fields)
+
+    def get(self, row, model_attr_index):
+        index, attrs = self.getters[model_attr_index]
+        value = row[index]
+        for a in attrs:
+            if value is None:
+                break
+            value = getattr(value, a)
+        return value
+
+    def build_row(self, row, schema_attrs):
+        values = [self.get(row, i) for i in range(len(self.getters))]
+
+        if self.attributes_index is not None:
+            attributes = row[self.attributes_index] or {}
+            values.extend(attributes.get(attr.name, '')
+                          for attr in schema_attrs)
 
         return values
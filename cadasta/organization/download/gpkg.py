@@ -0,0 +1,162 @@
+import os
+from osgeo import ogr, osr
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+
+from .base import Exporter
+
+MIME_TYPE = 'application/geopackage+sqlite3'
+
+# OGR field types for jsonattrs attribute types; anything else is
+# written as a string.
+FIELD_TYPES = {
+    'integer': ogr.OFTInteger,
+    'decimal': ogr.OFTReal,
+    'boolean': ogr.OFTInteger,
+    'date': ogr.OFTDate,
+    'dateTime': ogr.OFTDateTime,
+    'time': ogr.OFTTime,
+}
+
+TRUE_VALUES = ('true', 'yes', '1')
+
+
+def convert_value(value, attr_type=None):
+    """Converts ``value`` of an attribute of the jsonattrs type
+    ``attr_type``, or of a column if ``None``, to the value of its OGR
+    field. Values that do not parse are written as NULL."""
+    if value is None or value == '':
+        return None
+    if attr_type == 'boolean':
+        if isinstance(value, str):
+            return 1 if value.lower() in TRUE_VALUES else 0
+        return int(bool(value))
+    try:
+        if attr_type == 'integer':
+            return int(value)
+        elif attr_type == 'decimal':
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+def field_name(attr_name, taken):
+    """Returns the name of the field of the attribute ``attr_name``,
+    prefixed while it is in ``taken``, the lowercase names of the fields
+    created so far, and adds it to ``taken``. Field names are
+    case-insensitive."""
+    name = attr_name
+    while name.lower() in taken:
+        name = 'attr_' + name
+    taken.add(name.lower())
+    return name
+
+
+class GeoPackageExporter(Exporter):
+    driver_name = 'GPKG'
+    extension = 'gpkg'
+    mime_type = MIME_TYPE
+    layers = ('locations', 'parties', 'relationships')
+
+    @classmethod
+    def available(cls):
+        return ogr.GetDriverByName(cls.driver_name) is not None
+
+    def get_layer_spec(self, name):
+        if name == 'locations':
+            return (self.project.spatial_units.all(),
+                    ContentType.objects.get(app_label='spatial',
+                                            model='spatialunit'),
+                    (('id', 'id'), ('type', 'type')))
+        elif name == 'parties':
+            return (self.project.parties.all(),
+                    ContentType.objects.get(app_label='party',
+                                            model='party'),
+                    (('id', 'id'), ('name', 'name'), ('type', 'type')))
+        elif name == 'relationships':
+            return (self.project.tenure_relationships.all(),
+                    ContentType.objects.get(app_label='party',
+                                            model='tenurerelationship'),
+                    (('id', 'id'), ('party_id', 'party_id'),
+                     ('spatial_unit_id', 'spatial_unit_id'),
+                     ('tenure_type', 'tenure_type.label')))
+
+    def create_layer(self, datasource, name, columns, schema_attrs,
+                     geom_type):
+        srs = osr.SpatialReference()
+        srs.ImportFromEPSG(4326)
+        layer = datasource.CreateLayer(name, srs, geom_type=geom_type)
+
+        attr_types = []
+        # The feature ID is a field too.
+        taken = {'fid'}
+        for column in columns:
+            layer.CreateField(ogr.FieldDefn(column, ogr.OFTString))
+            taken.add(column.lower())
+            attr_types.append(None)
+        for attr in schema_attrs:
+            attr_type = attr.attr_type.name
+            layer.CreateField(ogr.FieldDefn(
+                field_name(attr.name, taken),
+                FIELD_TYPES.get(attr_type, ogr.OFTString)))
+            attr_types.append(attr_type)
+
+        return layer, attr_types
+
+    def write_layer(self, datasource, name):
+        queryset, content_type, columns = self.get_layer_spec(name)
+        schema_attrs = self.get_schema_attrs(content_type)
+        is_spatial = name == 'locations'
+
+        layer, attr_types = self.create_layer(
+            datasource, name, [c[0] for c in columns], schema_attrs,
+            ogr.wkbUnknown if is_spatial else ogr.wkbNone)
+        defn = layer.GetLayerDefn()
+
+        plan = self.get_query_plan(queryset.model, [c[1] for c in columns],
+                                   with_attributes=bool(schema_attrs))
+        fields = plan.fields + (['geometry'] if is_spatial else [])
+        geometry_index = len(fields)
+
+        # Inserting all features in a single transaction is much faster
+        # than GeoPackage's default of one transaction per feature.
+        layer.StartTransaction()
+        for row in self.iterate_values(queryset, fields):
+            feature = ogr.Feature(defn)
+            values = plan.build_row(row, schema_attrs)
+            for i, (value, attr_type) in enumerate(zip(values,
+                                                       attr_types)):
+                value = convert_value(value, attr_type)
+                if value is not None:
+                    feature.SetField(i, value)
+
+            if is_spatial and row[geometry_index] is not None:
+                feature.SetGeometry(ogr.CreateGeometryFromWkb(
+                    bytes(row[geometry_index].wkb)))
+
+            layer.CreateFeature(feature)
+            feature.Destroy()
+        layer.CommitTransaction()
+
+    def make_download(self, f_name):
+        path = os.path.join(settings.MEDIA_ROOT,
+                            'temp/{}.{}'.format(f_name, self.extension))
+        driver = ogr.GetDriverByName(self.driver_name)
+        datasource = driver.CreateDataSource(path)
+
+        for name in self.layers:
+            self.write_layer(datasource, name)
+
+        datasource.Destroy()
+        return path, self.mime_type
+
+
+class FlatGeobufExporter(GeoPackageExporter):
+    """Writes project locations to a FlatGeobuf file. FlatGeobuf holds a
+    single layer, and needs GDAL 3.1 or later."""
+
+    driver_name = 'FlatGeobuf'
+    extension = 'fgb'
+    mime_type = 'application/octet-stream'
+    layers = ('locations',)
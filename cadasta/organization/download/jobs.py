@@ -0,0 +1,154 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from core.permissions import clear_request_cache
+from party.models import Party, TenureRelationship
+from resources.models import ContentObject, Resource
+from spatial.models import SpatialUnit
+
+from ..models import ExportJob
+
+logger = logging.getLogger('organization.exports')
+
+_executor = None
+
+
+def get_data_version(project):
+    """Returns the time of the last change to the data of ``project``.
+
+    Creates, updates and deletes all leave a history record, so the latest
+    history date of the exported models changes whenever the export would.
+    """
+    dates = [project.last_updated]
+    for model, project_field in ((SpatialUnit, 'project'),
+                                 (Party, 'project'),
+                                 (TenureRelationship, 'project'),
+                                 (Resource, 'project'),
+                                 (ContentObject, 'resource__project')):
+        dates.append(model.history.filter(
+            **{project_field: project.id}
+        ).aggregate(date=Max('history_date'))['date'])
+
+    return max(d for d in dates if d is not None).isoformat()
+
+
+def is_stale(job):
+    """Whether the pending or running ``job`` has not made progress for
+    EXPORT_JOB_TIMEOUT seconds, which happens when the process running it
+    was stopped."""
+    timeout = timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    return job.last_updated < timezone.now() - timeout
+
+
+def fail_stale_job(job):
+    ExportJob.objects.filter(
+        id=job.id, status=job.status, last_updated=job.last_updated
+    ).update(status=ExportJob.FAILED, error='Timed out',
+             last_updated=timezone.now())
+
+
+def get_or_create_job(project, user, type):
+    data_version = get_data_version(project)
+    jobs = ExportJob.objects.filter(
+        project=project, type=type, data_version=data_version
+    ).exclude(status=ExportJob.FAILED)
+
+    for job in jobs:
+        if job.status == ExportJob.DONE:
+            if os.path.exists(job.path):
+                return job
+        elif is_stale(job):
+            fail_stale_job(job)
+        else:
+            return job
+
+    job = ExportJob.objects.create(project=project, user=user, type=type,
+                                   data_version=data_version)
+    submit_job(job)
+    job.refresh_from_db()
+    return job
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.EXPORT_JOB_WORKERS)
+    return _executor
+
+
+def submit_job(job):
+    mode = settings.EXPORT_JOB_MODE
+    if mode == 'sync':
+        run_job(job.id)
+    elif mode == 'thread':
+        # The worker thread uses its own connection, so it can only see
+        # the job once the request's transaction is committed.
+        transaction.on_commit(
+            lambda: get_executor().submit(run_job_in_thread, job.id))
+    # In 'worker' mode, jobs are picked up by the runexportworker command.
+
+
+def run_job_in_thread(job_id):
+    # The pool's threads are reused, so the permission decisions cached
+    # by an earlier job must not be reused by this one.
+    clear_request_cache()
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+
+def run_job(job_id):
+    # Claiming the job with a conditional update makes sure that it is
+    # only run once when several workers are polling.
+    claimed = ExportJob.objects.filter(
+        id=job_id, status=ExportJob.PENDING
+    ).update(status=ExportJob.RUNNING, last_updated=timezone.now())
+    if not claimed:
+        return
+
+    from ..forms import DownloadForm
+
+    job = ExportJob.objects.select_related('project', 'user').get(id=job_id)
+
+    def progress(done, total):
+        # Updating last_updated shows that the job is still running, see
+        # is_stale.
+        ExportJob.objects.filter(id=job.id).update(
+            progress=int(100 * done / total), last_updated=timezone.now())
+
+    form = DownloadForm(job.project, job.user, data={'type': job.type})
+    if not form.is_valid():
+        logger.error('Export job {} has invalid options: {}'.format(
+            job.id, form.errors.as_json()))
+        job.status = ExportJob.FAILED
+        job.error = ' '.join(message for messages in form.errors.values()
+                             for message in messages)
+        job.save()
+        return
+
+    try:
+        job.path, job.mime_type = form.get_file(progress=progress)
+        job.status = ExportJob.DONE
+        job.progress = 100
+    except Exception as e:
+        logger.exception('Export job {} failed'.format(job.id))
+        job.status = ExportJob.FAILED
+        job.error = str(e)
+    job.save()
+
+
+def run_pending_jobs():
+    job_ids = ExportJob.objects.filter(
+        status=ExportJob.PENDING
+    ).order_by('created').values_list('id', flat=True)
+    for job_id in job_ids:
+        run_job(job_id)
+    return len(job_ids)
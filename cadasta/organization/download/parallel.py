@@ -0,0 +1,120 @@
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from zipfile import ZipFile
+
+from django.conf import settings
+from django.db import connection
+
+from .resources import ResourceExporter
+from .shape import ShapeExporter
+from .xls import XLSExporter
+
+logger = logging.getLogger('organization.exports')
+
+EXPORTERS = {
+    'res': ResourceExporter,
+    'xls': XLSExporter,
+    'shp': ShapeExporter,
+}
+
+
+def run_exporter(type, project, f_name):
+    start = time.perf_counter()
+    path, mime = EXPORTERS[type](project).make_download(f_name)
+    return path, mime, time.perf_counter() - start
+
+
+def run_exporter_in_thread(type, project, f_name):
+    # Each thread opens its own database connection; close it before the
+    # thread is reused for the next exporter.
+    try:
+        return run_exporter(type, project, f_name)
+    finally:
+        connection.close()
+
+
+class AllDataExporter():
+    """Runs the resource, XLS and SHP exporters concurrently and packs
+    their outputs into a single archive.
+
+    The exporters run in threads rather than forked processes: the
+    exports themselves run in worker threads of the web server, and a
+    process forked while another thread holds a lock (of the logging
+    handlers, the database driver or the cache) can deadlock. Most of
+    the time of the exporters is spent in queries, OGR and compression,
+    which do not hold the GIL.
+    """
+
+    def __init__(self, project):
+        self.project = project
+        self.timings = {}
+
+    @property
+    def parallel(self):
+        # The threads use their own connections, which do not see the
+        # changes of an open transaction.
+        return (settings.EXPORT_PARALLEL_WORKERS > 0 and
+                not connection.in_atomic_block)
+
+    def run_stages(self, f_name, progress=None):
+        stages = [(type, '{}-{}'.format(f_name, type))
+                  for type in ('res', 'xls', 'shp')]
+        results = {}
+
+        if self.parallel:
+            with ThreadPoolExecutor(
+                    max_workers=settings.EXPORT_PARALLEL_WORKERS) as pool:
+                futures = {
+                    pool.submit(run_exporter_in_thread, type, self.project,
+                                name): type
+                    for type, name in stages
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    if progress:
+                        progress(len(results), len(stages) + 1)
+        else:
+            for type, name in stages:
+                results[type] = run_exporter(type, self.project, name)
+                if progress:
+                    progress(len(results), len(stages) + 1)
+
+        for type, result in results.items():
+            self.timings[type] = result[2]
+        return results
+
+    def make_download(self, f_name, progress=None):
+        start = time.perf_counter()
+        results = self.run_stages(f_name, progress=progress)
+
+        archive_start = time.perf_counter()
+        path, mime, _ = results['res']
+        xls_path = results['xls'][0]
+        shp_path = results['shp'][0]
+
+        # The resource archive becomes the final archive, so resource
+        # files are not zipped twice; the other outputs are removed once
+        # they have been added to it.
+        with ZipFile(path, 'a') as myzip:
+            myzip.write(xls_path, arcname='data.xlsx')
+            myzip.write(shp_path, arcname='data-shp.zip')
+
+        os.remove(xls_path)
+        os.remove(shp_path)
+        shp_dir = os.path.splitext(shp_path)[0]
+        if os.path.isdir(shp_dir):
+            shutil.rmtree(shp_dir)
+
+        now = time.perf_counter()
+        self.timings['archive'] = now - archive_start
+        self.timings['total'] = now - start
+        logger.info('Exported all data of project {}: {}'.format(
+            self.project.slug,
+            ', '.join('{} {:.2f}s'.format(stage, self.timings[stage])
+                      for stage in ('res', 'xls', 'shp', 'archive', 'total'))
+        ))
+
+        return path, mime
@@ -20,8 +20,8 @@ class ShapeExporter(Exporter):
             csvwriter = csv.writer(csvfile)
             csvwriter.writerow(fields)
 
-            for item in queryset:
-                values = self.get_values(item, model_attrs, schema_attrs)
+            for values in self.iterate_rows(queryset, model_attrs,
+                                            schema_attrs):
                 csvwriter.writerow(values)
 
     def write_relationships(self, filename):
@@ -46,25 +46,30 @@ class ShapeExporter(Exporter):
                                                model='spatialunit')
         model_attrs = ('id', 'type')
         schema_attrs = self.get_schema_attrs(content_type)
+        queryset = self.project.spatial_units.all()
+        plan = self.get_query_plan(queryset.model, model_attrs,
+                                   with_attributes=bool(schema_attrs))
+        geometry_index = len(plan.fields) + 1
 
         with open(filename, 'w+', newline='') as csvfile:
             csvwriter = csv.writer(csvfile)
             csvwriter.writerow(list(model_attrs) +
                                [a.name for a in schema_attrs])
 
-            for su in self.project.spatial_units.all():
-                geom = ogr.CreateGeometryFromWkt(su.geometry.wkt)
+            for row in self.iterate_values(queryset,
+                                           plan.fields + ['geometry']):
+                su_id, geometry = row[0], row[geometry_index]
+                geom = ogr.CreateGeometryFromWkt(geometry.wkt)
                 layer_type = geom.GetGeometryType() - 1
                 layer = layers[layer_type]
 
                 feature = ogr.Feature(layer.GetLayerDefn())
-                feature.SetGeometry(ogr.CreateGeometryFromWkt(su.geometry.wkt))
-                feature.SetField('id', su.id)
+                feature.SetGeometry(geom)
+                feature.SetField('id', su_id)
                 layer.CreateFeature(feature)
                 feature.Destroy()
 
-                values = self.get_values(su, model_attrs, schema_attrs)
-                csvwriter.writerow(values)
+                csvwriter.writerow(plan.build_row(row, schema_attrs))
 
     def create_datasource(self, dst_dir, f_name):
         if not os.path.exists(dst_dir):
@@ -17,8 +17,7 @@ class XLSExporter(Exporter):
         worksheet.append(model_attrs + [a.name for a in schema_attrs])
 
         # write data
-        for i, item in enumerate(queryset):
-            values = self.get_values(item, model_attrs, schema_attrs)
+        for values in self.iterate_rows(queryset, model_attrs, schema_attrs):
             worksheet.append(values)
 
     def write_locations(self):
@@ -47,8 +46,7 @@ class XLSExporter(Exporter):
 
     def make_download(self, f_name):
         path = os.path.join(settings.MEDIA_ROOT, 'temp/{}.xlsx'.format(f_name))
-        self.workbook = Workbook()
-        self.workbook.remove_sheet(self.workbook['Sheet'])
+        self.workbook = Workbook(write_only=True)
 
         self.write_locations()
         self.write_parties()
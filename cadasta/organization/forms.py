@@ -1,5 +1,4 @@
 import time
-from zipfile import ZipFile
 
 from accounts.models import User
 from buckets.widgets import S3FileUploadWidget
@@ -16,7 +15,10 @@ from leaflet.forms.widgets import LeafletWidget
 from questionnaires.models import Questionnaire
 from tutelary.models import check_perms
 
-from .choices import ADMIN_CHOICES, ROLE_CHOICES
+from .choices import ADMIN_CHOICES, ROLE_CHOICES, EXPORT_TYPE_CHOICES
+from .download.gpkg import GeoPackageExporter
+from .download.jobs import get_or_create_job
+from .download.parallel import AllDataExporter
 from .download.resources import ResourceExporter
 from .download.shape import ShapeExporter
 from .download.xls import XLSExporter
@@ -426,8 +428,7 @@ class ProjectEditPermissions(PermissionsForm, forms.Form):
 
 
 class DownloadForm(forms.Form):
-    CHOICES = (('all', 'All data'), ('xls', 'XLS'), ('shp', 'SHP'),
-               ('res', 'Resources'))
+    CHOICES = EXPORT_TYPE_CHOICES
     type = forms.ChoiceField(choices=CHOICES, initial='xls')
 
     def __init__(self, project, user, *args, **kwargs):
@@ -435,7 +436,11 @@ class DownloadForm(forms.Form):
         self.project = project
         self.user = user
 
-    def get_file(self):
+    def get_job(self):
+        return get_or_create_job(self.project, self.user,
+                                 self.cleaned_data['type'])
+
+    def get_file(self, progress=None):
         t = round(time.time() * 1000)
 
         file_name = '{}-{}-{}'.format(self.project.id, self.user.id, t)
@@ -450,17 +455,11 @@ class DownloadForm(forms.Form):
         elif type == 'res':
             e = ResourceExporter(self.project)
             path, mime = e.make_download(file_name + '-res')
+        elif type == 'gpkg':
+            e = GeoPackageExporter(self.project)
+            path, mime = e.make_download(file_name + '-gpkg')
         elif type == 'all':
-            res_exporter = ResourceExporter(self.project)
-            xls_exporter = XLSExporter(self.project)
-            shp_exporter = ShapeExporter(self.project)
-            path, mime = res_exporter.make_download(file_name + '-res')
-            data_path, _ = xls_exporter.make_download(file_name + '-xls')
-            shp_path, _ = shp_exporter.make_download(file_name + '-shp')
-
-            with ZipFile(path, 'a') as myzip:
-                myzip.write(data_path, arcname='data.xlsx')
-                myzip.write(shp_path, arcname='data-shp.zip')
-                myzip.close()
+            e = AllDataExporter(self.project)
+            path, mime = e.make_download(file_name, progress=progress)
 
         return path, mime
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import Benchmark, create_project_records, run_in_rollback
+from resources.utils.io import ensure_dirs
+
+from ...download.xls import XLSExporter
+
+
+class Command(BaseCommand):
+    help = """Benchmarks the XLS export on generated projects. Nothing
+            is written to the database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records',
+                            nargs='+',
+                            type=int,
+                            dest='records',
+                            default=[10000, 100000, 1000000],
+                            help="""Numbers of locations, parties and
+                            relationships to export.""")
+
+    def run(self, count):
+        project = create_project_records(count)
+        exporter = XLSExporter(project)
+        with Benchmark('xls export', count * 3) as bench:
+            exporter.make_download('benchmark-{}-xls'.format(count))
+        self.stdout.write(str(bench))
+
+    def handle(self, *args, **options):
+        ensure_dirs()
+        for count in sorted(options['records']):
+            run_in_rollback(self.run, count)
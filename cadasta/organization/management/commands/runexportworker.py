@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...download.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = """Runs pending project data export jobs. Use with
+            EXPORT_JOB_MODE = 'worker'."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval',
+                            type=float,
+                            dest='interval',
+                            default=2,
+                            help="Seconds to wait between polls.")
+        parser.add_argument('--once',
+                            action='store_true',
+                            dest='once',
+                            default=False,
+                            help="Run pending jobs once and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs()
+            if count:
+                self.stdout.write('Ran {} export job(s).'.format(count))
+            if options['once']:
+                break
+            time.sleep(options['interval'])
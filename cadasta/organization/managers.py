@@ -0,0 +1,24 @@
+"""Custom managers for organizations and projects."""
+
+from django.db import models
+
+from core.permissions import is_superuser
+
+
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Projects that ``user`` may see in project lists.
+
+        Superusers see all projects, organization members see the private
+        projects of their organizations, and everybody sees public
+        projects. This is a single query however many organizations there
+        are.
+        """
+        if is_superuser(user):
+            return self.all()
+
+        visible = models.Q(access='public')
+        if user.is_authenticated():
+            visible |= models.Q(organization__in=user.organizations.all())
+        return self.filter(visible)
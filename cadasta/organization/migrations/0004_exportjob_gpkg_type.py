@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0003_exportjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='type',
+            field=models.CharField(choices=[('all', 'All data'), ('xls', 'XLS'), ('shp', 'SHP'), ('gpkg', 'GeoPackage'), ('res', 'Resources')], max_length=4),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0004_exportjob_gpkg_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStatistics',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='organization.Project')),
+                ('num_locations', models.IntegerField(default=0)),
+                ('num_parties', models.IntegerField(default=0)),
+                ('num_relationships', models.IntegerField(default=0)),
+                ('num_resources', models.IntegerField(default=0)),
+                ('last_updated', models.DateTimeField(null=True)),
+                ('xmin', models.FloatField(null=True)),
+                ('ymin', models.FloatField(null=True)),
+                ('xmax', models.FloatField(null=True)),
+                ('ymax', models.FloatField(null=True)),
+                ('extent_stale', models.BooleanField(default=False)),
+            ],
+        ),
+    ]
@@ -16,8 +16,11 @@ from tutelary.models import Policy
 from core.models import RandomIDModel, SlugModel
 from geography.models import WorldBorder
 from resources.mixins import ResourceModelMixin
+from .managers import ProjectQuerySet
 from .validators import validate_contact
-from .choices import ROLE_CHOICES, ACCESS_CHOICES
+from .choices import (ROLE_CHOICES, ACCESS_CHOICES, EXPORT_TYPE_CHOICES,
+                      EXPORT_STATUS_CHOICES)
+from .pages import invalidate_pages
 from . import messages
 
 
@@ -172,6 +175,8 @@ class Project(ResourceModelMixin, SlugModel, RandomIDModel):
         max_length=24, null=True, blank=True
     )
 
+    objects = ProjectQuerySet.as_manager()
+
     history = HistoricalRecords()
 
     class Meta:
@@ -279,6 +284,14 @@ def check_extent(sender, instance, **kwargs):
         reassign_project_extent(instance)
 
 
+@receiver(models.signals.post_save, sender=Organization)
+@receiver(models.signals.post_delete, sender=Organization)
+@receiver(models.signals.post_save, sender=Project)
+@receiver(models.signals.post_delete, sender=Project)
+def invalidate_page_cache(sender, **kwargs):
+    invalidate_pages()
+
+
 class ProjectRole(RandomIDModel):
     project = models.ForeignKey(Project)
     user = models.ForeignKey('accounts.User')
@@ -332,3 +345,84 @@ def assign_project_permissions(sender, instance, **kwargs):
         assigned_policies.append(project_manager)
 
     instance.user.assign_policies(*assigned_policies)
+
+
+class ExportJob(RandomIDModel):
+    PENDING = 'PE'
+    RUNNING = 'RU'
+    DONE = 'DO'
+    FAILED = 'FA'
+
+    project = models.ForeignKey(Project, related_name='export_jobs')
+    user = models.ForeignKey('accounts.User')
+    type = models.CharField(max_length=4, choices=EXPORT_TYPE_CHOICES)
+    # Timestamp of the last change to the project data when the job was
+    # requested; finished jobs are reused while it stays the same.
+    data_version = models.CharField(max_length=50)
+    status = models.CharField(max_length=2, choices=EXPORT_STATUS_CHOICES,
+                              default=PENDING)
+    progress = models.PositiveSmallIntegerField(default=0)
+    path = models.CharField(max_length=500, null=True, blank=True)
+    mime_type = models.CharField(max_length=100, null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('-created',)
+        index_together = ('project', 'type', 'data_version')
+
+    def __str__(self):
+        return "<ExportJob: {project} {type} {status}>".format(
+            project=self.project.slug, type=self.type,
+            status=self.get_status_display())
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+
+class ProjectStatistics(models.Model):
+    """Counts of the records of a project and the extent of its
+    locations, kept up to date as records are added and removed, see
+    organization.statistics."""
+
+    project = models.OneToOneField(Project, primary_key=True,
+                                   related_name='statistics')
+    num_locations = models.IntegerField(default=0)
+    num_parties = models.IntegerField(default=0)
+    num_relationships = models.IntegerField(default=0)
+    num_resources = models.IntegerField(default=0)
+    # Time of the last change to the records of the project.
+    last_updated = models.DateTimeField(null=True)
+    # Bounding box of the project's locations. It only ever grows as
+    # locations are added; when locations are changed or removed, it is
+    # marked as stale and computed again when it is next read.
+    xmin = models.FloatField(null=True)
+    ymin = models.FloatField(null=True)
+    xmax = models.FloatField(null=True)
+    ymax = models.FloatField(null=True)
+    extent_stale = models.BooleanField(default=False)
+
+    @property
+    def extent(self):
+        if self.xmin is None:
+            return None
+        return (self.xmin, self.ymin, self.xmax, self.ymax)
+
+    @property
+    def has_content(self):
+        return (self.num_locations > 0 or self.num_parties > 0 or
+                self.num_resources > 0)
+
+
+@receiver(models.signals.post_save, sender=Project)
+def create_statistics(sender, instance, created, raw=False, **kwargs):
+    # A new project has no records, so its statistics are known from the
+    # start and record_change always finds them. The statistics of older
+    # projects are computed when they are first read.
+    if created and not raw:
+        ProjectStatistics.objects.create(project=instance)
@@ -0,0 +1,108 @@
+"""Cache of the organization and project pages rendered for anonymous
+visitors.
+
+Anonymous visitors only see public content, and all of them see the same
+pages, so the pages rendered for one of them are served to the others
+without running the view or querying the database. Cached pages are
+keyed by a version that changes whenever organizations, projects or
+permissions change. Pages that show the records of a project also
+depend on the version of the project, which changes whenever the
+project's statistics change, see organization.statistics.record_change.
+
+The CSRF token of the visitor the page was rendered for is replaced by a
+placeholder in the cached page, and by the token of each visitor it is
+served to.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.translation import get_language
+
+from core import permissions
+from core.cache import get_version, increment_version
+
+VERSION_KEY = 'organization.pages.version'
+
+CSRF_PLACEHOLDER = b'organization.pages.csrf_token'
+
+
+def project_version_key(project_id):
+    return 'organization.pages.version:{}'.format(project_id)
+
+
+def invalidate_pages():
+    increment_version(VERSION_KEY)
+    # Pages rendered before the change is committed still show the old
+    # data; the version is changed again so that they are not used.
+    transaction.on_commit(lambda: increment_version(VERSION_KEY))
+
+
+def invalidate_project_pages(project_id):
+    key = project_version_key(project_id)
+    increment_version(key)
+    transaction.on_commit(lambda: increment_version(key))
+
+
+def get_project_versions(project_ids):
+    """Returns the versions of the projects with ``project_ids``, for
+    ``set_page``."""
+    return {version_key: get_version(version_key)
+            for version_key in map(project_version_key, project_ids)}
+
+
+def get_project_version(project_id):
+    """Returns a version that changes whenever the project or its records
+    change, for the fragment caches of project pages."""
+    return '{}.{}'.format(get_version(VERSION_KEY),
+                          get_version(project_version_key(project_id)))
+
+
+def is_cacheable(request):
+    # Pages showing messages are rendered for the visitor they are for.
+    return (request.method == 'GET' and
+            not request.user.is_authenticated() and
+            not len(get_messages(request)))
+
+
+def page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return 'organization.pages:{}:{}:{}:{}'.format(
+        get_version(VERSION_KEY), get_version(permissions.VERSION_KEY),
+        get_language(), path)
+
+
+def get_page(request, key):
+    """Returns the response cached under ``key`` for ``request``, or
+    ``None`` if the page is not cached or a project it depends on
+    changed."""
+    page = cache.get(key)
+    if page is None:
+        return None
+    if any(get_version(version_key) != version
+           for version_key, version in page['versions'].items()):
+        return None
+
+    return HttpResponse(
+        page['content'].replace(CSRF_PLACEHOLDER,
+                                get_token(request).encode()),
+        content_type=page['content_type'])
+
+
+def set_page(request, key, response, versions=None):
+    """Renders ``response`` and caches it under ``key``, the key of the
+    page when the request started. The page is dropped when any of the
+    projects changes from the ``versions`` it had when the request
+    started, see get_project_versions."""
+    response.render()
+    page = {
+        'content': response.content.replace(get_token(request).encode(),
+                                            CSRF_PLACEHOLDER),
+        'content_type': response['Content-Type'],
+        'versions': versions or {},
+    }
+    cache.set(key, page, settings.PAGE_CACHE_TIMEOUT)
@@ -13,7 +13,8 @@ from django_countries.serializer_fields import CountryField
 from core.serializers import DetailSerializer, FieldSelectorSerializer
 from accounts.models import User
 from accounts.serializers import UserSerializer
-from .models import Organization, Project, OrganizationRole, ProjectRole
+from .models import (Organization, Project, OrganizationRole, ProjectRole,
+                     ProjectStatistics)
 
 
 class OrganizationSerializer(DetailSerializer, FieldSelectorSerializer,
@@ -101,6 +102,16 @@ class ProjectSerializer(DetailSerializer, serializers.ModelSerializer):
         )
 
 
+class ProjectStatisticsSerializer(serializers.ModelSerializer):
+    extent = serializers.ReadOnlyField()
+
+    class Meta:
+        model = ProjectStatistics
+        fields = ('num_locations', 'num_parties', 'num_relationships',
+                  'num_resources', 'last_updated', 'extent')
+        read_only_fields = fields
+
+
 class NestedProjectSerializer(DetailSerializer, FieldSelectorSerializer,
                               serializers.ModelSerializer):
     organization = OrganizationSerializer(
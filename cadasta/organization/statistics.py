@@ -0,0 +1,100 @@
+"""Precomputed statistics of the records of projects.
+
+The statistics of a project are created with it, see
+organization.models.create_statistics, and updated with a single UPDATE
+whenever records of the project are added or removed, by the receivers
+in spatial.models, party.models and resources.models and by the bulk
+inserts of XForm submissions. The statistics of projects created before
+they were kept are computed with a few aggregate queries the first time
+they are read.
+"""
+from django.contrib.gis.db.models import Extent
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+from .models import ProjectStatistics
+from .pages import invalidate_project_pages
+
+
+def merge_extents(extents):
+    """Returns the bounding box of the ``(xmin, ymin, xmax, ymax)`` boxes
+    in ``extents``, or ``None`` if there are none."""
+    extents = [e for e in extents if e]
+    if not extents:
+        return None
+    return (min(e[0] for e in extents), min(e[1] for e in extents),
+            max(e[2] for e in extents), max(e[3] for e in extents))
+
+
+def compute_extent(project):
+    return project.spatial_units.aggregate(
+        extent=Extent('geometry'))['extent']
+
+
+def compute_statistics(project):
+    extent = compute_extent(project) or (None,) * 4
+    return {
+        'num_locations': project.spatial_units.count(),
+        'num_parties': project.parties.count(),
+        'num_relationships': project.tenure_relationships.count(),
+        'num_resources': project.resource_set.count(),
+        'last_updated': timezone.now(),
+        'xmin': extent[0], 'ymin': extent[1],
+        'xmax': extent[2], 'ymax': extent[3],
+        'extent_stale': False,
+    }
+
+
+def get_statistics(project):
+    """Returns the ProjectStatistics of ``project``, computing them if
+    they are read for the first time or if the extent is stale."""
+    try:
+        stats = ProjectStatistics.objects.get(project=project)
+    except ProjectStatistics.DoesNotExist:
+        stats = ProjectStatistics(project=project,
+                                  **compute_statistics(project))
+        try:
+            with transaction.atomic():
+                stats.save(force_insert=True)
+        except IntegrityError:
+            # Computed by a concurrent request in the meantime.
+            stats = ProjectStatistics.objects.get(project=project)
+
+    if stats.extent_stale:
+        extent = compute_extent(project) or (None,) * 4
+        stats.xmin, stats.ymin, stats.xmax, stats.ymax = extent
+        stats.extent_stale = False
+        ProjectStatistics.objects.filter(project=project).update(
+            xmin=stats.xmin, ymin=stats.ymin, xmax=stats.xmax,
+            ymax=stats.ymax, extent_stale=False)
+    return stats
+
+
+def record_change(project_id, extent=None, extent_stale=False, **counts):
+    """Updates the statistics of the project with ``project_id`` after its
+    records changed: ``counts`` are added to the counters, the extent is
+    grown to cover the ``(xmin, ymin, xmax, ymax)`` box ``extent``, or
+    marked as stale if ``extent_stale``.
+
+    Statistics that were not computed yet are left alone; they are
+    computed from the records when they are first read. The cached pages
+    showing the project's records are dropped either way.
+    """
+    invalidate_project_pages(project_id)
+    updates = {field: F(field) + count for field, count in counts.items()}
+    updates['last_updated'] = timezone.now()
+    if extent_stale:
+        updates['extent_stale'] = True
+    elif extent:
+        # LEAST and GREATEST ignore NULLs, so the first extent of a
+        # project replaces the empty one.
+        for field, func, value in (('xmin', Least, extent[0]),
+                                   ('ymin', Least, extent[1]),
+                                   ('xmax', Greatest, extent[2]),
+                                   ('ymax', Greatest, extent[3])):
+            updates[field] = func(
+                field, Value(value, output_field=FloatField()))
+    ProjectStatistics.objects.filter(project_id=project_id).update(
+        **updates)
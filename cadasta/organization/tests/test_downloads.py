@@ -1,13 +1,19 @@
+import io
 import pytest
 import time
 import os
 import csv
+from osgeo import ogr
 from openpyxl import load_workbook, Workbook
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from zipfile import ZipFile
 
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 
 from jsonattrs.models import Attribute, AttributeType, Schema
 
@@ -19,13 +25,19 @@ from resources.tests.factories import ResourceFactory
 from resources.tests.utils import clear_temp  # noqa
 from resources.models import ContentObject
 from core.tests.utils.cases import UserTestCase
+from accounts.tests.factories import UserFactory
 from party.tests.factories import TenureRelationshipFactory, PartyFactory
-from party.models import TenureRelationshipType
+from party.models import TenureRelationship, TenureRelationshipType
+from spatial.models import SpatialUnit
 
+from ..download import jobs
 from ..download.base import Exporter
+from ..download.gpkg import GeoPackageExporter, convert_value, field_name
+from ..download.parallel import AllDataExporter
 from ..download.xls import XLSExporter
 from ..download.resources import ResourceExporter
 from ..download.shape import ShapeExporter
+from ..models import ExportJob
 
 
 class BaseExporterTest(UserTestCase, TestCase):
@@ -73,7 +85,27 @@ class BaseExporterTest(UserTestCase, TestCase):
         attrs = exporter.get_schema_attrs(content_type)
         assert len(attrs) == 2
 
-    def test_get_values(self):
+    def test_resolve_attr(self):
+        project = ProjectFactory.build()
+        exporter = Exporter(project)
+        model = TenureRelationship
+        assert exporter.resolve_attr(model, 'id') == ('id', [])
+        assert exporter.resolve_attr(model, 'party_id') == ('party', [])
+        assert (exporter.resolve_attr(model, 'tenure_type.label') ==
+                ('tenure_type__label', []))
+        assert (exporter.resolve_attr(SpatialUnit, 'geometry.ewkt') ==
+                ('geometry', ['ewkt']))
+
+    def test_iterate_values(self):
+        project = ProjectFactory.create()
+        units = SpatialUnitFactory.create_batch(5, project=project)
+        exporter = Exporter(project)
+        exporter.chunk_size = 2
+        rows = list(exporter.iterate_values(project.spatial_units.all(),
+                                            ['type']))
+        assert rows == sorted((su.id, su.type) for su in units)
+
+    def test_iterate_rows(self):
         project = ProjectFactory.create(current_questionnaire='123abc')
         exporter = Exporter(project)
         content_type = ContentType.objects.get(app_label='party',
@@ -95,10 +127,67 @@ class BaseExporterTest(UserTestCase, TestCase):
                                                 attributes={'key': 'text'})
         model_attrs = ('id', 'party_id', 'spatial_unit_id',
                        'tenure_type.label')
-        schema_attrs = [attr]
-        values = exporter.get_values(item, model_attrs, schema_attrs)
-        assert values == [item.id, item.party_id, item.spatial_unit_id,
-                          'Leasehold', 'text']
+        rows = list(exporter.iterate_rows(project.tenure_relationships.all(),
+                                          model_attrs, [attr]))
+        assert rows == [[item.id, item.party_id, item.spatial_unit_id,
+                         'Leasehold', 'text']]
+
+    def test_get_query_plan(self):
+        project = ProjectFactory.build()
+        exporter = Exporter(project)
+        model_attrs = ('id', 'party_id', 'spatial_unit_id',
+                       'tenure_type.label', 'tenure_type.id')
+        plan = exporter.get_query_plan(TenureRelationship, model_attrs,
+                                       with_attributes=True)
+        assert plan.fields == ['party', 'spatial_unit', 'tenure_type__label',
+                               'tenure_type', 'attributes']
+        assert plan.build_row(
+            ('rel', 'party', 'su', 'Leasehold', 'LH', {'key': 'text'}),
+            [Attribute(name='key'), Attribute(name='other')]
+        ) == ['rel', 'party', 'su', 'Leasehold', 'LH', 'text', '']
+        assert exporter.get_query_plan(TenureRelationship, model_attrs,
+                                       with_attributes=True) is plan
+
+    def test_iterate_rows_query_count(self):
+        project = ProjectFactory.create(current_questionnaire='123abc')
+        exporter = Exporter(project)
+        content_type = ContentType.objects.get(app_label='party',
+                                               model='tenurerelationship')
+        schema = Schema.objects.create(
+            content_type=content_type,
+            selectors=(project.organization.id, project.id, '123abc', ))
+        text_type = AttributeType.objects.get(name='text')
+        for i in range(3):
+            Attribute.objects.create(
+                schema=schema,
+                name='key_{}'.format(i), long_name='Test field',
+                attr_type=text_type, index=i,
+                required=False, omit=False
+            )
+        schema_attrs = exporter.get_schema_attrs(content_type)
+        assert [a.name for a in schema_attrs] == ['key_0', 'key_1', 'key_2']
+
+        model_attrs = ('id', 'party_id', 'spatial_unit_id',
+                       'tenure_type.label')
+        relationships = project.tenure_relationships.all()
+
+        TenureRelationshipFactory.create(project=project)
+        with self.assertNumQueries(1):
+            rows = list(exporter.iterate_rows(relationships, model_attrs,
+                                              schema_attrs))
+        assert len(rows) == 1
+
+        TenureRelationshipFactory.create_batch(20, project=project)
+        with self.assertNumQueries(1):
+            rows = list(exporter.iterate_rows(relationships, model_attrs,
+                                              schema_attrs))
+        assert len(rows) == 21
+
+        exporter.chunk_size = 10
+        with self.assertNumQueries(3):
+            rows = list(exporter.iterate_rows(relationships, model_attrs,
+                                              schema_attrs))
+        assert len(rows) == 21
 
 
 @pytest.mark.usefixtures('clear_temp')
@@ -169,7 +258,7 @@ class ShapeTest(UserTestCase, TestCase):
             os.makedirs(dst_dir)
         filename = os.path.join(dst_dir, 'parties.csv')
         exporter.write_items(filename,
-                             [party],
+                             project.parties.all(),
                              content_type,
                              ('id', 'name', 'type'))
 
@@ -356,7 +445,8 @@ class XLSTest(UserTestCase, TestCase):
             project=project,
             geometry='POINT (2 2)',
             attributes={'key': 'value 2'})
-        spatialunits = [spatialunit_1, spatialunit_2]
+        spatialunit_1, spatialunit_2 = sorted(
+            [spatialunit_1, spatialunit_2], key=lambda su: su.id)
         attrs = ['id', 'geometry.ewkt']
 
         workbook = Workbook()
@@ -364,7 +454,8 @@ class XLSTest(UserTestCase, TestCase):
         worksheet.title = 'locations'
 
         exporter = XLSExporter(project)
-        exporter.write_items(worksheet, spatialunits, content_type, attrs)
+        exporter.write_items(worksheet, project.spatial_units.all(),
+                             content_type, attrs)
 
         assert worksheet['A1'].value == 'id'
         assert worksheet['B1'].value == 'geometry.ewkt'
@@ -492,3 +583,261 @@ class ResourcesTest(UserTestCase, TestCase):
             assert len(testzip.namelist()) == 2
             assert res.original_file in testzip.namelist()
             assert 'resources.xlsx' in testzip.namelist()
+
+
+@pytest.mark.usefixtures('clear_temp')
+class ExportJobTest(UserTestCase, TestCase):
+    def test_get_data_version(self):
+        project = ProjectFactory.create()
+        version = jobs.get_data_version(project)
+        assert version == project.last_updated.isoformat()
+
+        SpatialUnitFactory.create(project=project)
+        assert jobs.get_data_version(project) > version
+
+    def test_get_or_create_job(self):
+        ensure_dirs()
+        project = ProjectFactory.create()
+        user = UserFactory.create()
+
+        job = jobs.get_or_create_job(project, user, 'xls')
+        assert job.status == ExportJob.DONE
+        assert job.progress == 100
+        assert os.path.exists(job.path)
+
+        assert jobs.get_or_create_job(project, user, 'xls') == job
+        assert jobs.get_or_create_job(project, user, 'shp') != job
+
+        SpatialUnitFactory.create(project=project)
+        assert jobs.get_or_create_job(project, user, 'xls') != job
+
+    def test_get_or_create_job_with_missing_file(self):
+        ensure_dirs()
+        project = ProjectFactory.create()
+        user = UserFactory.create()
+
+        job = jobs.get_or_create_job(project, user, 'xls')
+        os.remove(job.path)
+        assert jobs.get_or_create_job(project, user, 'xls') != job
+
+    def test_get_or_create_job_with_stale_job(self):
+        project = ProjectFactory.create()
+        user = UserFactory.create()
+        data_version = jobs.get_data_version(project)
+        running = ExportJob.objects.create(
+            project=project, user=user, type='xls',
+            data_version=data_version, status=ExportJob.RUNNING)
+        assert jobs.get_or_create_job(project, user, 'xls') == running
+
+        ExportJob.objects.filter(id=running.id).update(
+            last_updated=timezone.now() - timedelta(
+                seconds=settings.EXPORT_JOB_TIMEOUT + 1))
+        with self.settings(EXPORT_JOB_MODE='worker'):
+            job = jobs.get_or_create_job(project, user, 'xls')
+        assert job != running
+        assert job.status == ExportJob.PENDING
+        running.refresh_from_db()
+        assert running.status == ExportJob.FAILED
+
+    def test_run_failing_job(self):
+        project = ProjectFactory.create()
+        user = UserFactory.create()
+        job = ExportJob.objects.create(project=project, user=user,
+                                       type='invalid', data_version='v')
+        jobs.run_job(job.id)
+
+        job.refresh_from_db()
+        assert job.status == ExportJob.FAILED
+        assert 'valid choice' in job.error
+
+    def test_run_pending_jobs(self):
+        ensure_dirs()
+        project = ProjectFactory.create()
+        user = UserFactory.create()
+        job = ExportJob.objects.create(project=project, user=user,
+                                       type='xls', data_version='v')
+        assert jobs.run_pending_jobs() == 1
+        job.refresh_from_db()
+        assert job.status == ExportJob.DONE
+        assert jobs.run_pending_jobs() == 0
+
+
+@pytest.mark.usefixtures('clear_temp')
+@pytest.mark.usefixtures('make_dirs')
+class AllDataExporterTest(UserTestCase, TestCase):
+    def test_parallel(self):
+        project = ProjectFactory.build()
+        exporter = AllDataExporter(project)
+        with self.settings(EXPORT_PARALLEL_WORKERS=0):
+            assert exporter.parallel is False
+        with self.settings(EXPORT_PARALLEL_WORKERS=3):
+            # Django test cases always run inside a transaction
+            assert exporter.parallel is False
+
+    def test_make_download(self):
+        ensure_dirs()
+        project = ProjectFactory.create()
+        res = ResourceFactory.create(project=project)
+        SpatialUnitFactory.create(project=project, geometry='POINT (1 1)')
+        exporter = AllDataExporter(project)
+
+        steps = []
+
+        def progress(done, total):
+            steps.append(done)
+
+        t = round(time.time() * 1000)
+        path, mime = exporter.make_download('all-test-' + str(t),
+                                            progress=progress)
+        assert path == os.path.join(settings.MEDIA_ROOT,
+                                    'temp/all-test-{}-res.zip'.format(t))
+        assert mime == 'application/zip'
+        assert steps == [1, 2, 3]
+        assert (set(exporter.timings.keys()) ==
+                {'res', 'xls', 'shp', 'archive', 'total'})
+
+        with ZipFile(path, 'r') as testzip:
+            assert len(testzip.namelist()) == 4
+            assert res.original_file in testzip.namelist()
+            assert 'resources.xlsx' in testzip.namelist()
+            assert 'data.xlsx' in testzip.namelist()
+            assert 'data-shp.zip' in testzip.namelist()
+
+        temp = os.listdir(os.path.join(settings.MEDIA_ROOT, 'temp'))
+        assert 'all-test-{}-xls.xlsx'.format(t) not in temp
+        assert 'all-test-{}-shp.zip'.format(t) not in temp
+        assert 'all-test-{}-shp'.format(t) not in temp
+
+
+@pytest.mark.usefixtures('clear_temp')
+@pytest.mark.usefixtures('make_dirs')
+class ParallelAllDataExporterTest(UserTestCase, TransactionTestCase):
+    # The exporters run in threads with their own connections, so the
+    # records have to be committed.
+    serialized_rollback = True
+
+    def make_download(self, project, f_name):
+        # Exports run in the export worker threads.
+        try:
+            exporter = AllDataExporter(project)
+            assert exporter.parallel is True
+            return exporter.make_download(f_name)
+        finally:
+            connection.close()
+
+    def test_make_download(self):
+        ensure_dirs()
+        project = ProjectFactory.create()
+        su = SpatialUnitFactory.create(project=project,
+                                       geometry='POINT (1 1)')
+        ResourceFactory.create(project=project)
+
+        t = round(time.time() * 1000)
+        with self.settings(EXPORT_PARALLEL_WORKERS=2):
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                path, mime = pool.submit(
+                    self.make_download, project,
+                    'all-test-{}'.format(t)).result()
+
+        assert mime == 'application/zip'
+        with ZipFile(path, 'r') as testzip:
+            assert 'data-shp.zip' in testzip.namelist()
+            assert 'resources.xlsx' in testzip.namelist()
+            with testzip.open('data.xlsx') as data:
+                workbook = load_workbook(io.BytesIO(data.read()))
+        assert workbook['locations']['A2'].value == su.id
+
+
+@pytest.mark.usefixtures('clear_temp')
+class GeoPackageTest(UserTestCase, TestCase):
+    def test_convert_value(self):
+        assert convert_value(None) is None
+        assert convert_value('', 'integer') is None
+        assert convert_value('12', 'integer') == 12
+        assert convert_value('3.5', 'integer') is None
+        assert convert_value('n/a', 'integer') is None
+        assert convert_value(True, 'boolean') == 1
+        assert convert_value('yes', 'boolean') == 1
+        assert convert_value('no', 'boolean') == 0
+        assert convert_value('1.5', 'decimal') == 1.5
+        assert convert_value('abc', 'decimal') is None
+        assert convert_value(3, 'text') == '3'
+        assert convert_value(3) == '3'
+
+    def test_field_name(self):
+        assert field_name('key', {'fid', 'id', 'type'}) == 'key'
+        assert field_name('type', {'fid', 'id', 'type'}) == 'attr_type'
+        assert field_name('ID', {'fid', 'id', 'type'}) == 'attr_ID'
+        assert field_name('fid', {'fid', 'id'}) == 'attr_fid'
+
+    def test_field_name_of_clashing_attributes(self):
+        taken = {'fid', 'id', 'type'}
+        names = [field_name(name, taken)
+                 for name in ('type', 'attr_type', 'Key', 'key')]
+        assert names == ['attr_type', 'attr_attr_type', 'Key', 'attr_key']
+        assert taken == {'fid', 'id', 'type', 'attr_type', 'attr_attr_type',
+                         'key', 'attr_key'}
+
+    def test_make_download(self):
+        ensure_dirs()
+        project = ProjectFactory.create(current_questionnaire='123abc')
+        content_type = ContentType.objects.get(app_label='spatial',
+                                               model='spatialunit')
+        schema = Schema.objects.create(
+            content_type=content_type,
+            selectors=(project.organization.id, project.id, '123abc', ))
+        for idx, (name, type) in enumerate([('text', 'text'),
+                                            ('integer', 'integer'),
+                                            ('type', 'text')]):
+            Attribute.objects.create(
+                schema=schema,
+                name=name, long_name=name,
+                attr_type=AttributeType.objects.get(name=type), index=idx,
+                required=False, omit=False
+            )
+        su = SpatialUnitFactory.create(
+            project=project,
+            geometry='POINT (1 1)',
+            type='BU',
+            attributes={'text': 'value', 'integer': '5', 'type': 'brick'})
+        SpatialUnitFactory.create(
+            project=project,
+            geometry='LINESTRING (1 1, 2 2)',
+            attributes={'text': 'value 2'})
+        party = PartyFactory.create(project=project)
+        TenureRelationshipFactory.create(project=project, party=party,
+                                         spatial_unit=su)
+
+        exporter = GeoPackageExporter(project)
+        path, mime = exporter.make_download('file')
+        assert path == os.path.join(settings.MEDIA_ROOT, 'temp/file.gpkg')
+        assert mime == 'application/geopackage+sqlite3'
+
+        ds = ogr.Open(path)
+        locations = ds.GetLayerByName('locations')
+        assert len(locations) == 2
+        defn = locations.GetLayerDefn()
+        integer_field = defn.GetFieldDefn(defn.GetFieldIndex('integer'))
+        assert integer_field.GetType() == ogr.OFTInteger
+
+        feature = locations.GetNextFeature()
+        while feature:
+            if feature.GetField('id') == su.id:
+                assert feature.geometry().ExportToWkt() == 'POINT (1 1)'
+                assert feature.GetField('text') == 'value'
+                assert feature.GetField('integer') == 5
+                assert feature.GetField('type') == 'BU'
+                assert feature.GetField('attr_type') == 'brick'
+            else:
+                assert feature.geometry().ExportToWkt() == (
+                    'LINESTRING (1 1,2 2)')
+                assert feature.GetField('integer') is None
+            feature = locations.GetNextFeature()
+
+        assert len(ds.GetLayerByName('parties')) == 1
+        relationships = ds.GetLayerByName('relationships')
+        assert len(relationships) == 1
+        feature = relationships.GetNextFeature()
+        assert feature.GetField('party_id') == party.id
+        assert feature.GetField('spatial_unit_id') == su.id
+        ds.Destroy()
@@ -927,6 +927,18 @@ class DownloadFormTest(UserTestCase, TestCase):
         assert (mime == 'application/vnd.openxmlformats-officedocument.'
                         'spreadsheetml.sheet')
 
+    def test_get_gpkg_download(self):
+        ensure_dirs()
+        data = {'type': 'gpkg'}
+        user = UserFactory.create()
+        project = ProjectFactory.create()
+        form = forms.DownloadForm(project, user, data=data)
+        assert form.is_valid() is True
+        path, mime = form.get_file()
+        assert '{}-{}'.format(project.id, user.id) in path
+        assert path.endswith('.gpkg')
+        assert mime == 'application/geopackage+sqlite3'
+
     def test_get_resources_download(self):
         ensure_dirs()
         data = {'type': 'res'}
@@ -1,13 +1,15 @@
 from django.conf import settings
 from django.test import TestCase
 
-from tutelary.models import Policy
+from django.contrib.auth.models import AnonymousUser
+from tutelary.models import Policy, Role
 
+from core.permissions import clear_request_cache
 from core.tests.utils.cases import UserTestCase
 from accounts.tests.factories import UserFactory
 from geography import load as load_countries
 from .factories import OrganizationFactory, ProjectFactory
-from ..models import OrganizationRole, ProjectRole
+from ..models import OrganizationRole, Project, ProjectRole
 
 PERMISSIONS_DIR = settings.BASE_DIR + '/permissions/'
 
@@ -147,6 +149,38 @@ class ProjectTest(TestCase):
                 prj=project.slug))
 
 
+class ProjectQuerySetTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.org = OrganizationFactory.create()
+        self.public = ProjectFactory.create(organization=self.org)
+        self.private = ProjectFactory.create(organization=self.org,
+                                             access='private')
+        self.other = ProjectFactory.create(access='private')
+        clear_request_cache()
+
+    def test_visible_to_anonymous_user(self):
+        assert list(Project.objects.visible_to(AnonymousUser())) == [
+            self.public]
+
+    def test_visible_to_user(self):
+        user = UserFactory.create()
+        assert list(Project.objects.visible_to(user)) == [self.public]
+
+    def test_visible_to_org_member(self):
+        user = UserFactory.create()
+        OrganizationRole.objects.create(organization=self.org, user=user)
+        OrganizationRole.objects.create(organization=self.org,
+                                        user=UserFactory.create())
+        assert list(Project.objects.visible_to(user).order_by('name')) == [
+            self.public, self.private]
+
+    def test_visible_to_superuser(self):
+        user = UserFactory.create()
+        user.assign_policies(Role.objects.get(name='superuser'))
+        assert Project.objects.visible_to(user).count() == 3
+
+
 class ProjectRoleTest(UserTestCase, TestCase):
     def setUp(self):
         super().setUp()
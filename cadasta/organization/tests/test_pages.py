@@ -0,0 +1,92 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.middleware.csrf import get_token
+from django.template import engines
+from django.template.response import SimpleTemplateResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from skivvy import ViewTestCase
+
+from accounts.tests.factories import UserFactory
+from core.tests.utils.cases import UserTestCase
+from spatial.tests.factories import SpatialUnitFactory
+
+from .factories import ProjectFactory
+from .. import pages
+from ..views import default
+
+
+class PageCacheTest(ViewTestCase, UserTestCase, TestCase):
+    view_class = default.ProjectDashboard
+
+    def setup_models(self):
+        self.project = ProjectFactory.create(access='public')
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.project.organization.slug,
+            'project': self.project.slug
+        }
+
+    def test_page_is_cached_for_anonymous_visitors(self):
+        response = self.request()
+        assert response.status_code == 200
+
+        with self.assertNumQueries(0):
+            cached = self.request()
+        assert cached.status_code == 200
+        assert cached.content == response.content
+
+    def test_page_is_dropped_when_project_records_change(self):
+        self.request()
+        SpatialUnitFactory.create(project=self.project)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.request()
+        assert response.status_code == 200
+        assert len(queries) > 0
+
+    def test_page_is_dropped_when_records_change_while_rendering(self):
+        request = RequestFactory().get('/dashboard/')
+        request.user = AnonymousUser()
+        key = pages.page_key(request)
+        versions = pages.get_project_versions((self.project.id,))
+        pages.invalidate_project_pages(self.project.id)
+        pages.set_page(request, key, SimpleTemplateResponse(
+            engines['django'].from_string('page')), versions)
+
+        assert pages.get_page(request, key) is None
+
+    def test_page_is_dropped_when_project_changes(self):
+        self.request()
+        self.project.access = 'private'
+        self.project.save()
+
+        response = self.request()
+        assert response.status_code == 302
+
+    def test_page_is_not_cached_for_users(self):
+        user = UserFactory.create()
+        self.request(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            self.request(user=user)
+        assert len(queries) > 0
+
+
+class CsrfTokenTest(TestCase):
+    def make_request(self):
+        request = RequestFactory().get('/organizations/')
+        request.user = AnonymousUser()
+        return request
+
+    def test_page_has_token_of_visitor(self):
+        request = self.make_request()
+        template = engines['django'].from_string('{{ csrf_token }}')
+        response = SimpleTemplateResponse(
+            template, {'csrf_token': get_token(request)})
+        pages.set_page(request, pages.page_key(request), response)
+
+        request = self.make_request()
+        cached = pages.get_page(request, pages.page_key(request))
+        assert cached.content == get_token(request).encode()
+        assert response.content != cached.content
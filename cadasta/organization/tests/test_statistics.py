@@ -0,0 +1,119 @@
+import pytest
+from django.test import TestCase
+
+from core.tests.utils.cases import UserTestCase
+from core.tests.utils.files import make_dirs  # noqa
+from party.tests.factories import PartyFactory, TenureRelationshipFactory
+from resources.tests.factories import ResourceFactory
+from spatial.tests.factories import SpatialUnitFactory
+
+from .factories import ProjectFactory
+from ..models import ProjectStatistics
+from ..statistics import get_statistics, merge_extents, record_change
+
+
+@pytest.mark.usefixtures('make_dirs')
+class ProjectStatisticsTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create()
+
+    def test_compute_statistics(self):
+        SpatialUnitFactory.create(project=self.project,
+                                  geometry='SRID=4326;POINT (1 2)')
+        SpatialUnitFactory.create(project=self.project,
+                                  geometry='SRID=4326;POINT (3 4)')
+        TenureRelationshipFactory.create(project=self.project)
+        ResourceFactory.create(project=self.project)
+
+        stats = get_statistics(self.project)
+        # The tenure relationship created a location and a party too.
+        assert stats.num_locations == 3
+        assert stats.num_parties == 1
+        assert stats.num_relationships == 1
+        assert stats.num_resources == 1
+        assert stats.extent == (1, 2, 3, 4)
+        assert stats.has_content is True
+        assert stats.last_updated is not None
+
+    def test_empty_project(self):
+        stats = get_statistics(self.project)
+        assert stats.num_locations == 0
+        assert stats.extent is None
+        assert stats.has_content is False
+
+    def test_read_statistics(self):
+        get_statistics(self.project)
+        with self.assertNumQueries(1):
+            get_statistics(self.project)
+
+    def test_update_counts(self):
+        get_statistics(self.project)
+        party = PartyFactory.create(project=self.project)
+        ResourceFactory.create(project=self.project)
+        TenureRelationshipFactory.create(project=self.project, party=party)
+
+        stats = ProjectStatistics.objects.get(project=self.project)
+        assert stats.num_parties == 1
+        assert stats.num_resources == 1
+        assert stats.num_relationships == 1
+        assert stats.num_locations == 1
+
+        party.delete()
+        stats.refresh_from_db()
+        assert stats.num_parties == 0
+        assert stats.num_relationships == 0
+
+    def test_grow_extent(self):
+        get_statistics(self.project)
+        SpatialUnitFactory.create(project=self.project,
+                                  geometry='SRID=4326;POINT (1 2)')
+        stats = ProjectStatistics.objects.get(project=self.project)
+        assert stats.extent == (1, 2, 1, 2)
+
+        SpatialUnitFactory.create(
+            project=self.project,
+            geometry='SRID=4326;LINESTRING (0 5, 2 6)')
+        stats.refresh_from_db()
+        assert stats.extent == (0, 2, 2, 6)
+        assert stats.extent_stale is False
+
+    def test_stale_extent(self):
+        SpatialUnitFactory.create(project=self.project,
+                                  geometry='SRID=4326;POINT (1 2)')
+        location = SpatialUnitFactory.create(
+            project=self.project, geometry='SRID=4326;POINT (3 4)')
+        get_statistics(self.project)
+
+        location.delete()
+        stats = ProjectStatistics.objects.get(project=self.project)
+        assert stats.num_locations == 1
+        assert stats.extent_stale is True
+
+        stats = get_statistics(self.project)
+        assert stats.extent == (1, 2, 1, 2)
+        assert stats.extent_stale is False
+        stats.refresh_from_db()
+        assert stats.extent_stale is False
+
+    def test_new_project_has_statistics(self):
+        stats = ProjectStatistics.objects.get(project=self.project)
+        assert stats.num_locations == 0
+        assert stats.extent is None
+
+        record_change(self.project.id, num_parties=1)
+        stats.refresh_from_db()
+        assert stats.num_parties == 1
+
+    def test_record_change_before_first_read(self):
+        # Projects created before the statistics were kept have none.
+        ProjectStatistics.objects.filter(project=self.project).delete()
+        record_change(self.project.id, num_parties=1)
+        assert not ProjectStatistics.objects.filter(
+            project=self.project).exists()
+
+    def test_merge_extents(self):
+        assert merge_extents([]) is None
+        assert merge_extents([None]) is None
+        assert merge_extents([(0, 1, 2, 3), None, (-1, 2, 1, 4)]) == (
+            -1, 1, 2, 4)
@@ -1,4 +1,5 @@
 import json
+from urllib.parse import parse_qs, urlparse
 
 from django.test import TestCase
 from rest_framework.exceptions import PermissionDenied
@@ -294,7 +295,7 @@ class ProjectListAPITest(APITestCase, UserTestCase, TestCase):
         ProjectFactory.create_batch(2)
         response = self.request(user=self.user)
         assert response.status_code == 200
-        assert len(response.content) == 4
+        assert len(response.content['results']) == 4
 
     def test_full_list_with_superuser(self):
         """
@@ -308,7 +309,42 @@ class ProjectListAPITest(APITestCase, UserTestCase, TestCase):
         ProjectFactory.create_batch(2)
         response = self.request(user=self.user)
         assert response.status_code == 200
-        assert len(response.content) == 4
+        assert len(response.content['results']) == 4
+
+    def test_paginated_list(self):
+        ProjectFactory.create_batch(3, organization=self.organization)
+        response = self.request(user=self.user, get_data={'page_size': 2})
+        assert response.status_code == 200
+        assert len(response.content['results']) == 2
+
+        query = parse_qs(urlparse(response.content['next']).query)
+        response = self.request(user=self.user,
+                                get_data={'page_size': 2,
+                                          'cursor': query['cursor'][0]})
+        assert response.status_code == 200
+        assert len(response.content['results']) == 1
+        assert response.content['next'] is None
+
+    def test_paginated_list_ordered_by_organization(self):
+        for name in ('C', 'A', 'B'):
+            ProjectFactory.create(
+                organization=OrganizationFactory.create(name=name))
+        response = self.request(user=self.user,
+                                get_data={'page_size': 2,
+                                          'ordering': 'organization'})
+        assert response.status_code == 200
+        orgs = [proj['organization']['name']
+                for proj in response.content['results']]
+
+        query = parse_qs(urlparse(response.content['next']).query)
+        response = self.request(user=self.user,
+                                get_data={'page_size': 2,
+                                          'ordering': 'organization',
+                                          'cursor': query['cursor'][0]})
+        assert response.status_code == 200
+        orgs += [proj['organization']['name']
+                 for proj in response.content['results']]
+        assert orgs == ['A', 'B', 'C']
 
     def test_full_list_with_unauthorized_user(self):
         """
@@ -326,7 +362,7 @@ class ProjectListAPITest(APITestCase, UserTestCase, TestCase):
         ProjectFactory.create(archived=False)
         response = self.request(user=self.user, get_data={'archived': True})
         assert response.status_code == 200
-        assert len(response.content) == 1
+        assert len(response.content['results']) == 1
 
     def test_search_filter(self):
         """
@@ -336,8 +372,9 @@ class ProjectListAPITest(APITestCase, UserTestCase, TestCase):
         ProjectFactory.create_batch(2)
         response = self.request(user=self.user, get_data={'search': 'opdp'})
         assert response.status_code == 200
-        assert len(response.content) == 1
-        assert all([proj['name'] == 'opdp' for proj in response.content])
+        assert len(response.content['results']) == 1
+        assert all([proj['name'] == 'opdp'
+                    for proj in response.content['results']])
 
     def test_ordering(self):
         ProjectFactory.create_from_kwargs([
@@ -345,8 +382,8 @@ class ProjectListAPITest(APITestCase, UserTestCase, TestCase):
         ])
         response = self.request(user=self.user, get_data={'ordering': 'name'})
         assert response.status_code == 200
-        assert len(response.content) == 3
-        names = [proj['name'] for proj in response.content]
+        assert len(response.content['results']) == 3
+        names = [proj['name'] for proj in response.content['results']]
         assert names == sorted(names)
 
     def test_reverse_ordering(self):
@@ -355,8 +392,8 @@ class ProjectListAPITest(APITestCase, UserTestCase, TestCase):
         ])
         response = self.request(user=self.user, get_data={'ordering': '-name'})
         assert response.status_code == 200
-        assert len(response.content) == 3
-        names = [proj['name'] for proj in response.content]
+        assert len(response.content['results']) == 3
+        names = [proj['name'] for proj in response.content['results']]
         assert names == sorted(names, reverse=True)
 
     # CONDITIONS:
@@ -397,7 +434,7 @@ class ProjectListAPITest(APITestCase, UserTestCase, TestCase):
         response = self.request(user=user)
         assert response.status_code == 200
         expected_names = [prjs[i].name for i in idxs]
-        pnames = [p['name'] for p in response.content]
+        pnames = [p['name'] for p in response.content['results']]
         assert(sorted(expected_names) == sorted(pnames))
 
     def test_visibility_filtering(self):
@@ -699,3 +736,38 @@ class ProjectDetailAPITest(APITestCase, UserTestCase, TestCase):
         assert response.status_code == 400
         self.project.refresh_from_db()
         assert self.project.access == 'public'
+
+
+class ProjectStatisticsAPITest(APITestCase, UserTestCase, TestCase):
+    view_class = api.ProjectStatisticsDetail
+
+    def setup_models(self):
+        self.user = UserFactory.create()
+        assign_policies(self.user)
+        self.organization = OrganizationFactory.create(slug='namati')
+        self.project = ProjectFactory.create(
+            slug='project', organization=self.organization, access='public')
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.organization.slug,
+            'project': self.project.slug
+        }
+
+    def test_get_statistics(self):
+        response = self.request(user=self.user)
+        assert response.status_code == 200
+        assert response.content['num_locations'] == 0
+        assert response.content['num_parties'] == 0
+        assert response.content['extent'] is None
+
+    def test_get_statistics_of_project_that_does_not_exist(self):
+        response = self.request(user=self.user,
+                                url_kwargs={'project': 'some-project'})
+        assert response.status_code == 404
+
+    def test_get_statistics_of_private_project(self):
+        self.project.access = 'private'
+        self.project.save()
+        response = self.request()
+        assert response.status_code == 403
@@ -3,7 +3,9 @@ import os
 import os.path
 import pytest
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.http import HttpRequest, Http404
@@ -14,17 +16,20 @@ from tutelary.models import Policy, Role, assign_user_policies
 from buckets.test.storage import FakeS3Storage
 from skivvy import ViewTestCase
 
+from core.permissions import clear_request_cache
 from core.tests.utils.cases import UserTestCase
 from core.tests.utils.files import make_dirs  # noqa
 from accounts.tests.factories import UserFactory
-from organization.models import OrganizationRole, Project, ProjectRole
+from organization.models import (ExportJob, OrganizationRole, Project,
+                                 ProjectRole)
 from questionnaires.tests.factories import QuestionnaireFactory
 from questionnaires.tests.utils import get_form
 from questionnaires.models import Questionnaire
 from resources.tests.utils import clear_temp  # noqa
 from resources.utils.io import ensure_dirs
 
-from .. import forms
+from .. import forms, pages
+from ..download import jobs
 from ..views import default
 from .factories import OrganizationFactory, ProjectFactory, clause
 
@@ -92,14 +97,15 @@ class ProjectListTest(ViewTestCase, UserTestCase, TestCase):
         assigned_policies.append(self.policy)
         self.user.assign_policies(*assigned_policies)
 
-    @property
-    def sort_key(self):
-        return lambda p: p.organization.slug + ':' + p.slug
+    def sort_projects(self, projs):
+        return Project.objects.filter(
+            id__in=[p.id for p in projs]).order_by('organization__slug',
+                                                   'slug')
 
     def setup_template_context(self):
         projs = self.projs + self.unauth_projs
         return {
-            'object_list': sorted(projs, key=self.sort_key),
+            'object_list': self.sort_projects(projs),
             'add_allowed': False,
             'is_superuser': False
         }
@@ -133,7 +139,7 @@ class ProjectListTest(ViewTestCase, UserTestCase, TestCase):
 
         assert response.status_code == 200
         assert response.content == self.render_content(
-            object_list=sorted(projs, key=self.sort_key))
+            object_list=self.sort_projects(projs))
 
     def test_get_with_org_memberships(self):
         OrganizationRole.objects.create(organization=self.ok_org1,
@@ -146,7 +152,7 @@ class ProjectListTest(ViewTestCase, UserTestCase, TestCase):
 
         assert response.status_code == 200
         assert response.content == self.render_content(
-            object_list=sorted(projs, key=self.sort_key))
+            object_list=self.sort_projects(projs))
 
     def test_get_with_superuser(self):
         superuser = UserFactory.create()
@@ -156,11 +162,27 @@ class ProjectListTest(ViewTestCase, UserTestCase, TestCase):
         response = self.request(user=superuser)
         assert response.status_code == 200
         assert response.content == self.render_content(
-            object_list=sorted(Project.objects.all(), key=self.sort_key),
+            object_list=self.sort_projects(Project.objects.all()),
             add_allowed=True,
             is_superuser=True
         )
 
+    def test_number_of_queries_does_not_depend_on_organizations(self):
+        OrganizationRole.objects.create(organization=self.ok_org1,
+                                        user=self.user)
+
+        def count_queries():
+            clear_request_cache()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.request(user=self.user)
+            assert response.status_code == 200
+            return len(queries)
+
+        expected = count_queries()
+        for org in OrganizationFactory.create_batch(10):
+            ProjectFactory.create(organization=org, access='private')
+        assert count_queries() == expected
+
 
 class ProjectDashboardTest(ViewTestCase, UserTestCase, TestCase):
     view_class = default.ProjectDashboard
@@ -189,7 +211,9 @@ class ProjectDashboardTest(ViewTestCase, UserTestCase, TestCase):
         return {
             'object': self.project,
             'project': self.project,
-            'geojson': '{"type": "FeatureCollection", "features": []}',
+            'locations_bounds': 'null',
+            'map_version': pages.get_project_version(self.project.id),
+            'page_cache_timeout': settings.PAGE_CACHE_TIMEOUT,
             'is_superuser': False,
             'is_administrator': False
         }
@@ -1018,3 +1042,78 @@ class ProjectDataDownloadTest(ViewTestCase, UserTestCase, TestCase):
         response = self.request(method='POST')
         assert response.status_code == 302
         assert '/account/login/' in response.location
+
+
+@pytest.mark.usefixtures('make_dirs')
+@pytest.mark.usefixtures('clear_temp')
+class ProjectDataDownloadJobStatusTest(ViewTestCase, UserTestCase, TestCase):
+    view_class = default.ProjectDataDownloadJobStatus
+
+    def setup_models(self):
+        ensure_dirs()
+        self.project = ProjectFactory.create()
+        self.user = UserFactory.create()
+        self.job = ExportJob.objects.create(
+            project=self.project, user=self.user, type='xls',
+            data_version='v', progress=50)
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.project.organization.slug,
+            'project': self.project.slug,
+            'job': self.job.id
+        }
+
+    def test_get_with_authorized_user(self):
+        assign_policies(self.user)
+        response = self.request(user=self.user)
+        assert response.status_code == 200
+        content = json.loads(response.content)
+        assert content['id'] == self.job.id
+        assert content['finished'] is False
+        assert content['progress'] == 50
+
+    def test_get_with_unauthorized_user(self):
+        response = self.request(user=self.user)
+        assert response.status_code == 302
+        assert ("You don't have permission to download data from this project"
+                in response.messages)
+
+    def test_get_with_unauthenticated_user(self):
+        response = self.request()
+        assert response.status_code == 302
+        assert '/account/login/' in response.location
+
+
+@pytest.mark.usefixtures('make_dirs')
+@pytest.mark.usefixtures('clear_temp')
+class ProjectDataDownloadJobFileTest(ViewTestCase, UserTestCase, TestCase):
+    view_class = default.ProjectDataDownloadJobFile
+
+    def setup_models(self):
+        ensure_dirs()
+        self.project = ProjectFactory.create()
+        self.user = UserFactory.create()
+        self.job = ExportJob.objects.create(
+            project=self.project, user=self.user, type='xls',
+            data_version='v')
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.project.organization.slug,
+            'project': self.project.slug,
+            'job': self.job.id
+        }
+
+    def test_get_finished_job(self):
+        assign_policies(self.user)
+        jobs.run_job(self.job.id)
+        response = self.request(user=self.user)
+        assert response.status_code == 200
+        assert (response.headers['content-disposition'][1] ==
+                'attachment; filename={}.xlsx'.format(self.project.slug))
+
+    def test_get_pending_job(self):
+        assign_policies(self.user)
+        with pytest.raises(Http404):
+            self.request(user=self.user)
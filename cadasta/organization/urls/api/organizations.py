@@ -27,6 +27,11 @@ urlpatterns = [
         r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/$',
         api.ProjectDetail.as_view(),
         name='project_detail'),
+    url(
+        r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/'
+        'statistics/$',
+        api.ProjectStatisticsDetail.as_view(),
+        name='project_statistics'),
     url(
         r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/users/$',
         api.ProjectUsers.as_view(),
@@ -65,6 +65,21 @@ urlpatterns = [
         r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/download/$',
         default.ProjectDataDownload.as_view(),
         name='project-download'),
+    url(
+        r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/download/'
+        r'(?P<job>[-\w]+)/$',
+        default.ProjectDataDownloadJob.as_view(),
+        name='project-download-job'),
+    url(
+        r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/download/'
+        r'(?P<job>[-\w]+)/status/$',
+        default.ProjectDataDownloadJobStatus.as_view(),
+        name='project-download-job-status'),
+    url(
+        r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/download/'
+        r'(?P<job>[-\w]+)/file/$',
+        default.ProjectDataDownloadJobFile.as_view(),
+        name='project-download-job-file'),
 
     #
     # MEMBERS
@@ -4,9 +4,11 @@ from rest_framework import generics, filters, status
 from tutelary.mixins import APIPermissionRequiredMixin
 
 from accounts.models import User
+from core.pagination import PaginatedListMixin
 
 from ..models import Organization, OrganizationRole, ProjectRole
 from .. import serializers
+from ..statistics import get_statistics
 from . import mixins
 
 
@@ -136,7 +138,9 @@ class OrganizationProjectList(APIPermissionRequiredMixin,
         )
 
 
-class ProjectList(APIPermissionRequiredMixin, mixins.ProjectQuerySetMixin,
+class ProjectList(APIPermissionRequiredMixin,
+                  PaginatedListMixin,
+                  mixins.ProjectQuerySetMixin,
                   generics.ListAPIView):
     serializer_class = serializers.ProjectSerializer
     filter_backends = (filters.DjangoFilterBackend,
@@ -186,6 +190,30 @@ class ProjectDetail(APIPermissionRequiredMixin,
             lookup_kwarg='organization').projects.all()
 
 
+class ProjectStatisticsDetail(APIPermissionRequiredMixin,
+                              mixins.ProjectMixin,
+                              generics.RetrieveAPIView):
+    """Counts of the project's records and the extent of its locations,
+    see organization.statistics."""
+
+    def get_actions(self, request):
+        if self.get_project().public():
+            return 'project.view'
+        else:
+            return 'project.view_private'
+
+    serializer_class = serializers.ProjectStatisticsSerializer
+    permission_required = {
+        'GET': get_actions,
+    }
+
+    def get_perms_objects(self):
+        return [self.get_project()]
+
+    def get_object(self):
+        return get_statistics(self.get_project())
+
+
 class ProjectUsers(APIPermissionRequiredMixin,
                    mixins.ProjectRoles,
                    generics.ListCreateAPIView):
@@ -1,4 +1,3 @@
-import json
 import os
 from collections import OrderedDict
 
@@ -8,18 +7,22 @@ import formtools.wizard.views as wizard
 from accounts.models import User
 from core.mixins import LoginPermissionRequiredMixin, PermissionRequiredMixin
 from core.views.mixins import ArchiveMixin, SuperUserCheckMixin
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.utils.translation import ugettext as _
 from questionnaires.exceptions import InvalidXLSForm
 from questionnaires.models import Questionnaire
-from spatial.serializers import SpatialUnitGeoJsonSerializer
+from spatial import tiles
 
 from . import mixins
 from .. import messages as error_messages
-from .. import forms
-from ..models import Organization, OrganizationRole, Project, ProjectRole
+from .. import forms, pages
+from ..models import (ExportJob, Organization, OrganizationRole, Project,
+                      ProjectRole)
+from ..statistics import get_statistics
 
 
 class OrganizationList(PermissionRequiredMixin, generic.ListView):
@@ -50,7 +53,8 @@ class OrganizationAdd(LoginPermissionRequiredMixin, generic.CreateView):
         return kwargs
 
 
-class OrganizationDashboard(PermissionRequiredMixin,
+class OrganizationDashboard(mixins.PageCacheMixin,
+                            PermissionRequiredMixin,
                             mixins.OrgAdminCheckMixin,
                             mixins.ProjectCreateCheckMixin,
                             generic.DetailView):
@@ -273,7 +277,8 @@ class UserActivation(LoginPermissionRequiredMixin, base_generic.View):
         return redirect('user:list')
 
 
-class ProjectList(PermissionRequiredMixin,
+class ProjectList(mixins.PageCacheMixin,
+                  PermissionRequiredMixin,
                   mixins.ProjectQuerySetMixin,
                   mixins.ProjectCreateCheckMixin,
                   generic.ListView):
@@ -286,24 +291,14 @@ class ProjectList(PermissionRequiredMixin,
     project_create_check_multiple = True
 
     def get(self, request, *args, **kwargs):
-        if (hasattr(self.request.user, 'assigned_policies') and
-                self.is_superuser):
-            projects = Project.objects.all()
-        else:
-            projects = []
-            projects.extend(Project.objects.filter(access='public'))
-            if hasattr(self.request.user, 'organizations'):
-                user_orgs = self.request.user.organizations.all()
-                for org in Organization.objects.all():
-                    if org in user_orgs:
-                        projects.extend(org.projects.filter(access='private'))
-        self.object_list = sorted(
-            projects, key=lambda p: p.organization.slug + ':' + p.slug)
+        self.object_list = self.get_queryset().select_related(
+            'organization').order_by('organization__slug', 'slug')
         context = self.get_context_data()
         return super(generic.ListView, self).render_to_response(context)
 
 
-class ProjectDashboard(PermissionRequiredMixin,
+class ProjectDashboard(mixins.PageCacheMixin,
+                       PermissionRequiredMixin,
                        mixins.ProjectAdminCheckMixin,
                        mixins.ProjectMixin,
                        generic.DetailView):
@@ -321,24 +316,26 @@ class ProjectDashboard(PermissionRequiredMixin,
 
     def get_context_data(self, **kwargs):
         context = super(ProjectDashboard, self).get_context_data(**kwargs)
-        num_locations = self.object.spatial_units.count()
-        num_parties = self.object.parties.count()
-        num_resources = self.object.resource_set.count()
-        context['has_content'] = (
-            num_locations > 0 or num_parties > 0 or num_resources > 0)
-        context['num_locations'] = num_locations
-        context['num_parties'] = num_parties
-        context['num_resources'] = num_resources
-        context['geojson'] = json.dumps(
-            SpatialUnitGeoJsonSerializer(
-                self.object.spatial_units.all(), many=True).data
-        )
+        stats = get_statistics(self.object)
+        context['has_content'] = stats.has_content
+        context['num_locations'] = stats.num_locations
+        context['num_parties'] = stats.num_parties
+        context['num_resources'] = stats.num_resources
+        context['locations_bounds'] = tiles.bounds_json(stats.extent)
+        context['map_version'] = pages.get_project_version(self.object.id)
+        context['page_cache_timeout'] = settings.PAGE_CACHE_TIMEOUT
 
         return context
 
     def get_object(self, queryset=None):
         return self.get_project()
 
+    def is_page_public(self):
+        return self.object.public()
+
+    def get_page_projects(self):
+        return (self.get_project().id,)
+
 
 PROJECT_ADD_FORMS = [('extents', forms.ProjectAddExtents),
                      ('details', forms.ProjectAddDetails),
@@ -620,9 +617,71 @@ class ProjectDataDownload(mixins.ProjectMixin,
         self.object = self.get_object()
         form = self.get_form()
         if form.is_valid():
-            path, mime_type = form.get_file()
-            filename, ext = os.path.splitext(path)
-            response = HttpResponse(open(path, 'rb'), content_type=mime_type)
-            response['Content-Disposition'] = ('attachment; filename=' +
-                                               self.object.slug + ext)
-            return response
+            job = form.get_job()
+            if job.status == ExportJob.DONE:
+                return export_file_response(job)
+            return redirect('organization:project-download-job',
+                            organization=self.object.organization.slug,
+                            project=self.object.slug,
+                            job=job.id)
+
+
+def export_file_response(job):
+    filename, ext = os.path.splitext(job.path)
+    response = HttpResponse(open(job.path, 'rb'), content_type=job.mime_type)
+    response['Content-Disposition'] = ('attachment; filename=' +
+                                       job.project.slug + ext)
+    return response
+
+
+class ProjectDataDownloadJobMixin(mixins.ProjectMixin,
+                                  LoginPermissionRequiredMixin):
+    permission_required = 'project.download'
+    permission_denied_message = error_messages.PROJ_DOWNLOAD
+
+    def get_job(self):
+        if not hasattr(self, 'job'):
+            self.job = get_object_or_404(ExportJob,
+                                         project=self.get_project(),
+                                         id=self.kwargs['job'])
+        return self.job
+
+    def get_perms_objects(self):
+        return [self.get_project()]
+
+
+class ProjectDataDownloadJob(ProjectDataDownloadJobMixin,
+                             mixins.ProjectAdminCheckMixin,
+                             generic.DetailView):
+    template_name = 'organization/project_download_job.html'
+
+    def get_object(self):
+        return self.get_project()
+
+    def get_context_data(self, *args, **kwargs):
+        context = super().get_context_data(*args, **kwargs)
+        context['job'] = self.get_job()
+        return context
+
+
+class ProjectDataDownloadJobStatus(ProjectDataDownloadJobMixin,
+                                   base_generic.View):
+    def get(self, request, *args, **kwargs):
+        job = self.get_job()
+        return JsonResponse({
+            'id': job.id,
+            'type': job.type,
+            'status': job.get_status_display(),
+            'finished': job.finished,
+            'progress': job.progress,
+            'error': job.error,
+        })
+
+
+class ProjectDataDownloadJobFile(ProjectDataDownloadJobMixin,
+                                 base_generic.View):
+    def get(self, request, *args, **kwargs):
+        job = self.get_job()
+        if job.status != ExportJob.DONE or not os.path.exists(job.path):
+            raise Http404(_("This export is not available."))
+        return export_file_response(job)
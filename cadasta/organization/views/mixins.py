@@ -1,11 +1,11 @@
 from django.conf import settings
-from django.contrib.auth.models import AnonymousUser
 from django.contrib.sites.shortcuts import get_current_site
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
 
-from tutelary.models import Role, check_perms
+from tutelary.models import check_perms
 
+from core.permissions import is_superuser
+from .. import pages
 from ..models import Organization, Project, OrganizationRole, ProjectRole
 
 
@@ -40,6 +40,36 @@ class OrganizationRoles(OrganizationMixin):
         return context
 
 
+class PageCacheMixin:
+    """Serves the page from the cache to anonymous visitors, see
+    organization.pages. It has to come before the permission mixins, so
+    that cached pages are served without checking permissions again."""
+
+    def is_page_public(self):
+        return True
+
+    def get_page_projects(self):
+        """Returns the IDs of the projects whose records are shown on the
+        page. It is called before the view runs."""
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not pages.is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = pages.page_key(request)
+        response = pages.get_page(request, key)
+        if response is None:
+            # Like the key, the versions are read before the page is
+            # rendered, so that changes committed while it is rendered
+            # drop it.
+            versions = pages.get_project_versions(self.get_page_projects())
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200 and self.is_page_public():
+                pages.set_page(request, key, response, versions)
+        return response
+
+
 class ProjectMixin:
     def get_project(self):
         if not hasattr(self, 'prj'):
@@ -71,22 +101,7 @@ class ProjectRoles(ProjectMixin):
 
 class ProjectQuerySetMixin:
     def get_queryset(self):
-        if not hasattr(self, 'su_role'):
-            self.su_role = Role.objects.get(name='superuser')
-
-        if (not isinstance(self.request.user, AnonymousUser) and
-            any([isinstance(pol, Role) and pol == self.su_role
-                 for pol in self.request.user.assigned_policies()])):
-            return Project.objects.all()
-
-        if hasattr(self.request.user, 'organizations'):
-            orgs = self.request.user.organizations.all()
-            if len(orgs) > 0:
-                return Project.objects.filter(
-                    Q(access='public') | Q(organization__in=orgs)
-                )
-
-        return Project.objects.filter(access='public')
+        return Project.objects.visible_to(self.request.user)
 
 
 class ProjectAdminCheckMixin:
@@ -97,7 +112,6 @@ class ProjectAdminCheckMixin:
     @property
     def is_administrator(self):
         if self.is_admin is None:
-            su_role = Role.objects.filter(name='superuser')
             org_admins = [
                 role.user for role in OrganizationRole.objects.filter(
                     organization=self.get_project().organization,
@@ -111,11 +125,7 @@ class ProjectAdminCheckMixin:
                 )
 
             ]
-            self.is_admin = False
-            if len(su_role) > 0:
-                if hasattr(self.request.user, 'assigned_policies'):
-                    if su_role[0] in self.request.user.assigned_policies():
-                        self.is_admin = True
+            self.is_admin = is_superuser(self.request.user)
             if (self.request.user in org_admins or
                self.request.user in proj_managers):
                 self.is_admin = True
@@ -172,7 +182,6 @@ class OrgAdminCheckMixin:
     @property
     def is_administrator(self):
         if self.is_admin is None:
-            su_role = Role.objects.filter(name='superuser')
             if hasattr(self, 'get_organization'):
                 org = self.get_organization()
             else:
@@ -183,11 +192,7 @@ class OrgAdminCheckMixin:
                     admin=True
                 )
             ]
-            self.is_admin = False
-            if len(su_role) > 0:
-                if hasattr(self.request.user, 'assigned_policies'):
-                    if su_role[0] in self.request.user.assigned_policies():
-                        self.is_admin = True
+            self.is_admin = is_superuser(self.request.user)
             if self.request.user in org_admins:
                 self.is_admin = True
         return self.is_admin
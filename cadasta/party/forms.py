@@ -1,4 +1,4 @@
-from jsonattrs.forms import AttributeModelForm
+from core.form_mixins import AttributeModelForm
 from .models import Party, TenureRelationshipType, TenureRelationship
 
 
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.postgres.operations import CreateExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('party', '0002_remove_all_types_from_tenure_relationship_type'),
+    ]
+
+    operations = [
+        CreateExtension('pg_trgm'),
+        migrations.AlterIndexTogether(
+            name='party',
+            index_together=set([('project', 'name')]),
+        ),
+        # Trigram index for name__icontains lookups, which compare
+        # UPPER(name::text).
+        migrations.RunSQL(
+            'CREATE INDEX party_party_name_trgm ON party_party '
+            'USING gin (UPPER(name::text) gin_trgm_ops)',
+            'DROP INDEX party_party_name_trgm',
+        ),
+    ]
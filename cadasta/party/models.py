@@ -5,11 +5,14 @@ from django.core.urlresolvers import reverse
 from django.conf import settings
 from django.contrib.gis.db import models
 from django.contrib.postgres.fields import JSONField
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import ugettext as _
 
 from jsonattrs.decorators import fix_model_for_attributes
 from jsonattrs.fields import JSONAttributeField
 from organization.models import Project
+from organization.statistics import record_change
 from organization.validators import validate_contact
 from simple_history.models import HistoricalRecords
 
@@ -83,6 +86,7 @@ class Party(ResourceModelMixin, RandomIDModel):
 
     class Meta:
         ordering = ('name',)
+        index_together = (('project', 'name'),)
 
     class TutelaryMeta:
         perm_type = 'party'
@@ -313,6 +317,26 @@ class TenureRelationship(ResourceModelMixin, RandomIDModel):
         )
 
 
+@receiver(post_save, sender=Party)
+def party_saved(sender, instance, created, **kwargs):
+    record_change(instance.project_id, num_parties=int(created))
+
+
+@receiver(post_delete, sender=Party)
+def party_deleted(sender, instance, **kwargs):
+    record_change(instance.project_id, num_parties=-1)
+
+
+@receiver(post_save, sender=TenureRelationship)
+def tenure_relationship_saved(sender, instance, created, **kwargs):
+    record_change(instance.project_id, num_relationships=int(created))
+
+
+@receiver(post_delete, sender=TenureRelationship)
+def tenure_relationship_deleted(sender, instance, **kwargs):
+    record_change(instance.project_id, num_relationships=-1)
+
+
 class TenureRelationshipType(models.Model):
     """Defines allowable tenure types."""
 
@@ -26,6 +26,24 @@ class PartyUrlTest(TestCase):
         assert resolved.kwargs['organization'] == 'habitat'
         assert resolved.kwargs['project'] == '123abc'
 
+    def test_project_party_search(self):
+        actual = reverse(
+            version_ns('party:search'),
+            kwargs={
+                'organization': 'habitat',
+                'project': '123abc',
+            }
+        )
+        expected = version_url(
+            '/organizations/habitat/projects/123abc/parties/search/')
+        assert actual == expected
+
+        resolved = resolve(version_url(
+            '/organizations/habitat/projects/123abc/parties/search/'))
+        assert resolved.func.__name__ == api.PartySearch.__name__
+        assert resolved.kwargs['organization'] == 'habitat'
+        assert resolved.kwargs['project'] == '123abc'
+
     def test_project_party_detail(self):
         actual = reverse(
             version_ns('party:detail'),
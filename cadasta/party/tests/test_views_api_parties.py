@@ -1,9 +1,11 @@
 """Test cases for party api views."""
 
 import json
+from urllib.parse import parse_qs, urlparse
 
 from django.test import TestCase
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APIRequestFactory, force_authenticate
 from tutelary.models import Policy, assign_user_policies
 from skivvy import APITestCase
 
@@ -64,8 +66,33 @@ class PartyListAPITest(APITestCase, UserTestCase, TestCase):
         PartyFactory.create_batch(2, project=self.prj)
         response = self.request(user=self.user)
         assert response.status_code == 200
-        assert len(response.content) == 2
-        assert 'users' not in response.content[0]
+        assert len(response.content['results']) == 2
+        assert 'users' not in response.content['results'][0]
+
+    def test_paginated_list(self):
+        PartyFactory.create_batch(3, project=self.prj)
+        response = self.request(user=self.user, get_data={'page_size': 2})
+        assert response.status_code == 200
+        assert len(response.content['results']) == 2
+        assert response.content['previous'] is None
+
+        query = parse_qs(urlparse(response.content['next']).query)
+        response = self.request(user=self.user,
+                                get_data={'page_size': 2,
+                                          'cursor': query['cursor'][0]})
+        assert response.status_code == 200
+        assert len(response.content['results']) == 1
+        assert response.content['next'] is None
+
+    def test_unpaginated_list(self):
+        PartyFactory.create_batch(3, project=self.prj)
+        request = APIRequestFactory().get('/', {'paginate': 'false'})
+        force_authenticate(request, user=self.user)
+        response = self.view_class.as_view()(
+            request, **self.setup_url_kwargs())
+        assert response.status_code == 200
+        content = json.loads(b''.join(response.streaming_content).decode())
+        assert len(content) == 3
 
     def test_full_list_with_unauthorized_user(self):
         PartyFactory.create(project=self.prj)
@@ -82,7 +109,7 @@ class PartyListAPITest(APITestCase, UserTestCase, TestCase):
         response = self.request(user=self.user,
                                 get_data={'name': 'Test Party One'})
         assert response.status_code == 200
-        assert len(response.content) == 1
+        assert len(response.content['results']) == 1
 
     def test_type_filter(self):
         PartyFactory.create_from_kwargs([
@@ -92,7 +119,7 @@ class PartyListAPITest(APITestCase, UserTestCase, TestCase):
         ])
         response = self.request(user=self.user, get_data={'type': 'GR'})
         assert response.status_code == 200
-        assert len(response.content) == 1
+        assert len(response.content['results']) == 1
 
     def test_ordering(self):
         PartyFactory.create_from_kwargs([
@@ -102,8 +129,8 @@ class PartyListAPITest(APITestCase, UserTestCase, TestCase):
         ])
         response = self.request(user=self.user, get_data={'ordering': 'name'})
         assert response.status_code == 200
-        assert len(response.content) == 3
-        names = [party['name'] for party in response.content]
+        assert len(response.content['results']) == 3
+        names = [party['name'] for party in response.content['results']]
         assert names == sorted(names)
 
     def test_reverse_ordering(self):
@@ -114,8 +141,8 @@ class PartyListAPITest(APITestCase, UserTestCase, TestCase):
         ])
         response = self.request(user=self.user, get_data={'ordering': '-name'})
         assert response.status_code == 200
-        assert len(response.content) == 3
-        names = [party['name'] for party in response.content]
+        assert len(response.content['results']) == 3
+        names = [party['name'] for party in response.content['results']]
         assert names == sorted(names, reverse=True)
 
     def test_get_full_list_organization_does_not_exist(self):
@@ -131,6 +158,61 @@ class PartyListAPITest(APITestCase, UserTestCase, TestCase):
         assert response.content['detail'] == "Project not found."
 
 
+class PartySearchAPITest(APITestCase, UserTestCase, TestCase):
+    view_class = api.PartySearch
+
+    def setup_models(self):
+        self.user = UserFactory.create()
+        assign_policies(self.user)
+        self.org = OrganizationFactory.create()
+        self.prj = ProjectFactory.create(
+            organization=self.org, add_users=[self.user])
+        PartyFactory.create_from_kwargs([
+            {'name': 'Ann Smith', 'project': self.prj, 'type': 'IN'},
+            {'name': 'Bob Smithers', 'project': self.prj, 'type': 'IN'},
+            {'name': 'Smith Holdings', 'project': self.prj, 'type': 'CO'},
+            {'name': 'Carol Jones', 'project': self.prj, 'type': 'IN'},
+        ])
+        PartyFactory.create(name='Dan Smith')
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.org.slug,
+            'project': self.prj.slug
+        }
+
+    def test_search(self):
+        response = self.request(user=self.user, get_data={'q': 'smith'})
+        assert response.status_code == 200
+        assert [p['text'] for p in response.content['results']] == [
+            'Ann Smith', 'Bob Smithers', 'Smith Holdings']
+        assert response.content['results'][2]['type'] == 'Corporation'
+        assert response.content['more'] is False
+
+    def test_search_without_query(self):
+        response = self.request(user=self.user)
+        assert response.status_code == 200
+        assert len(response.content['results']) == 4
+
+    def test_search_pages(self):
+        response = self.request(user=self.user,
+                                get_data={'q': 'smith', 'limit': 2})
+        assert [p['text'] for p in response.content['results']] == [
+            'Ann Smith', 'Bob Smithers']
+        assert response.content['more'] is True
+
+        response = self.request(user=self.user,
+                                get_data={'q': 'smith', 'limit': 2,
+                                          'offset': 2})
+        assert [p['text'] for p in response.content['results']] == [
+            'Smith Holdings']
+        assert response.content['more'] is False
+
+    def test_search_with_unauthorized_user(self):
+        response = self.request(get_data={'q': 'smith'})
+        assert response.status_code == 403
+
+
 class PartyCreateAPITest(APITestCase, UserTestCase, TestCase):
     view_class = api.PartyList
 
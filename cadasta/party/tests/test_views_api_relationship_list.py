@@ -1,10 +1,13 @@
 import json
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from tutelary.models import Policy
 from skivvy import APITestCase
 
 from accounts.tests.factories import UserFactory
+from core.permissions import clear_request_cache
 from core.tests.utils.cases import UserTestCase
 from organization.tests.factories import ProjectFactory
 from spatial.tests import factories as spatial_factories
@@ -98,3 +101,76 @@ class SpatialUnitsRelationshipListAPITest(APITestCase, UserTestCase, TestCase):
 
         assert response.status_code == 400
         assert response.content['detail'] == "Relationship class is unknown"
+
+    def count_queries(self, **url_kwargs):
+        clear_request_cache()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.request(user=self.user, url_kwargs=url_kwargs)
+        assert response.status_code == 200
+        return len(queries)
+
+    def test_queries_of_spatial_unit(self):
+        su = spatial_factories.SpatialUnitFactory.create(project=self.prj)
+        self.SR.create(project=self.prj, su1=su)
+        self.TR.create(project=self.prj, spatial_unit=su)
+        expected = self.count_queries(spatial_id=su.id)
+
+        for i in range(5):
+            self.SR.create(project=self.prj, su1=su)
+            self.SR.create(project=self.prj, su2=su)
+            self.TR.create(project=self.prj, spatial_unit=su)
+        assert self.count_queries(spatial_id=su.id) == expected
+
+    def test_queries_of_party(self):
+        party = party_factories.PartyFactory.create(project=self.prj)
+        self.PR.create(project=self.prj, party1=party)
+        self.TR.create(project=self.prj, party=party)
+        expected = self.count_queries(party_id=party.id)
+
+        for i in range(5):
+            self.PR.create(project=self.prj, party1=party)
+            self.PR.create(project=self.prj, party2=party)
+            self.TR.create(project=self.prj, party=party)
+        assert self.count_queries(party_id=party.id) == expected
+
+    def test_omit_geometries(self):
+        su1 = spatial_factories.SpatialUnitFactory.create(
+            project=self.prj, geometry='SRID=4326;POINT (1 1)')
+        su2 = spatial_factories.SpatialUnitFactory.create(
+            project=self.prj, geometry='SRID=4326;POINT (2 2)')
+        self.SR.create(project=self.prj, su1=su1, su2=su2)
+        self.TR.create(project=self.prj, spatial_unit=su1)
+
+        response = self.request(user=self.user,
+                                url_kwargs={'spatial_id': su1.id})
+        assert response.content[0]['su2']['geometry'] is not None
+
+        response = self.request(user=self.user,
+                                url_kwargs={'spatial_id': su1.id},
+                                get_data={'geometry': 'false'})
+        assert response.status_code == 200
+        assert len(response.content) == 2
+        assert response.content[0]['su1']['geometry'] is None
+        assert response.content[0]['su2']['geometry'] is None
+        assert response.content[1]['spatial_unit']['geometry'] is None
+
+    def test_simplify_geometries(self):
+        coords = ', '.join('{} {}'.format(i / 100, (i % 2) / 100000)
+                           for i in range(101))
+        su1 = spatial_factories.SpatialUnitFactory.create(
+            project=self.prj,
+            geometry='SRID=4326;LINESTRING ({})'.format(coords))
+        su2 = spatial_factories.SpatialUnitFactory.create(project=self.prj)
+        self.SR.create(project=self.prj, su1=su1, su2=su2)
+
+        response = self.request(user=self.user,
+                                url_kwargs={'spatial_id': su2.id},
+                                get_data={'simplify': '0.001'})
+        assert response.status_code == 200
+        geometry = response.content[0]['su1']['geometry']
+        assert geometry['coordinates'] == [[0, 0], [1, 0]]
+
+        response = self.request(user=self.user,
+                                url_kwargs={'spatial_id': su2.id},
+                                get_data={'simplify': '-1'})
+        assert response.status_code == 400
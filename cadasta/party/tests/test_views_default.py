@@ -663,7 +663,6 @@ class PartyRelationshipDetailTest(ViewTestCase, UserTestCase, TestCase):
         return {'object': self.project,
                 'relationship': self.relationship,
                 'location': self.relationship.spatial_unit,
-                'geojson': '{"type": "FeatureCollection", "features": []}',
                 'attributes': (('Test field', 'test', ), )}
 
     def setup_url_kwargs(self):
@@ -736,8 +735,7 @@ class PartyRelationshipEditTest(ViewTestCase, UserTestCase, TestCase):
         return {'object': self.project,
                 'relationship': self.relationship,
                 'location': self.relationship.spatial_unit,
-                'form': form,
-                'geojson': '{"type": "FeatureCollection", "features": []}'}
+                'form': form}
 
     def setup_url_kwargs(self):
         return {
@@ -825,8 +823,7 @@ class PartyRelationshipDeleteTest(ViewTestCase, UserTestCase, TestCase):
     def setup_template_context(self):
         return {'object': self.project,
                 'relationship': self.relationship,
-                'location': self.relationship.spatial_unit,
-                'geojson': '{"type": "FeatureCollection", "features": []}'}
+                'location': self.relationship.spatial_unit}
 
     def setup_url_kwargs(self):
         return {
@@ -920,8 +917,7 @@ class PartyRelationshipResourceAddTest(ViewTestCase, UserTestCase, TestCase):
         return {'object': self.project,
                 'relationship': self.relationship,
                 'location': self.relationship.spatial_unit,
-                'form': form,
-                'geojson': '{"type": "FeatureCollection", "features": []}'}
+                'form': form}
 
     def setup_url_kwargs(self):
         return {
@@ -1027,8 +1023,7 @@ class PartyRelationshipResourceNewTest(ViewTestCase, UserTestCase, TestCase):
         return {'object': self.project,
                 'location': self.relationship.spatial_unit,
                 'relationship': self.relationship,
-                'form': form,
-                'geojson': '{"type": "FeatureCollection", "features": []}'}
+                'form': form}
 
     def setup_post_data(self):
         path = os.path.dirname(settings.BASE_DIR)
@@ -7,6 +7,10 @@ urlpatterns = [
         r'^$',
         api.PartyList.as_view(),
         name='list'),
+    url(
+        r'^search/$',
+        api.PartySearch.as_view(),
+        name='search'),
     url(
         r'^(?P<party>[-\w]+)/$',
         api.PartyDetail.as_view(),
@@ -1,5 +1,6 @@
 """Party API."""
 
+from django.conf import settings
 from django.db.models import Q
 from django.utils.translation import gettext as _
 from rest_framework import generics, filters, status
@@ -7,16 +8,21 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from tutelary.mixins import APIPermissionRequiredMixin
 
-from party.models import (PartyRelationship,
+from core.pagination import PaginatedListMixin
+
+from party.models import (Party, PartyRelationship,
                           TenureRelationship)
 from spatial.models import SpatialRelationship
 from party import serializers
 from spatial.serializers import SpatialRelationshipReadSerializer
 from . import mixins
 from organization.views.mixins import ProjectMixin
+from spatial.functions import SimplifyPreserveTopology
+from spatial.views.mixins import SimplifyGeometryMixin
 
 
 class PartyList(APIPermissionRequiredMixin,
+                PaginatedListMixin,
                 mixins.PartyQuerySetMixin,
                 generics.ListCreateAPIView):
 
@@ -36,6 +42,54 @@ class PartyList(APIPermissionRequiredMixin,
         return [self.get_project()]
 
 
+class PartySearch(APIPermissionRequiredMixin,
+                  mixins.PartyQuerySetMixin,
+                  generics.GenericAPIView):
+    """Parties of the project whose names contain the `q` parameter, for
+    typeahead fields. Results are pages of `limit` parties starting at
+    `offset`, in the format of select2, and are not counted: `more` tells
+    whether there is another page."""
+
+    permission_required = 'party.list'
+
+    def get_perms_objects(self):
+        return [self.get_project()]
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            limit = 0
+        if limit <= 0:
+            return settings.PARTY_SEARCH_LIMIT
+        return min(limit, settings.PARTY_SEARCH_MAX_LIMIT)
+
+    def get_offset(self):
+        try:
+            return max(int(self.request.query_params['offset']), 0)
+        except (KeyError, ValueError):
+            return 0
+
+    def get(self, request, *args, **kwargs):
+        limit = self.get_limit()
+        offset = self.get_offset()
+
+        queryset = self.get_queryset()
+        query = request.query_params.get('q', '').strip()
+        if query:
+            # Served by the trigram index on the names of parties.
+            queryset = queryset.filter(name__icontains=query)
+        parties = list(queryset.order_by('name', 'id').values_list(
+            'id', 'name', 'type')[offset:offset + limit + 1])
+
+        types = dict(Party.TYPE_CHOICES)
+        return Response({
+            'results': [{'id': id, 'text': name, 'type': types[type]}
+                        for id, name, type in parties[:limit]],
+            'more': len(parties) > limit,
+        })
+
+
 class PartyDetail(APIPermissionRequiredMixin,
                   mixins.PartyQuerySetMixin,
                   generics.RetrieveUpdateDestroyAPIView):
@@ -53,11 +107,53 @@ class PartyDetail(APIPermissionRequiredMixin,
 
 class RelationshipList(APIPermissionRequiredMixin,
                        ProjectMixin,
+                       SimplifyGeometryMixin,
                        APIView):
+    """Relationships of a location or a party. Each relationship class is
+    read with a single query that joins the records at both ends.
+
+    The geometries of locations are left out with `geometry=false`, or
+    simplified with the `simplify` or `zoom` parameters, see
+    SimplifyGeometryMixin."""
 
     permission_required = (
         'spatial_rel.list', 'party_rel.list', 'tenure_rel.list')
 
+    def include_geometry(self):
+        return self.request.query_params.get(
+            'geometry', '').lower() != 'false'
+
+    def get_locations(self, queryset, *fields):
+        """Joins the locations at ``fields`` of the relationships in
+        ``queryset``, leaving out or simplifying their geometries."""
+        queryset = queryset.select_related(*fields)
+        if not self.include_geometry():
+            return queryset.defer(*(f + '__geometry' for f in fields))
+
+        tolerance = self.get_simplify_tolerance()
+        if tolerance:
+            queryset = queryset.defer(
+                *(f + '__geometry' for f in fields)
+            ).annotate(**{
+                f + '_simplified_geometry': SimplifyPreserveTopology(
+                    f + '__geometry', tolerance)
+                for f in fields})
+        return queryset
+
+    def set_geometries(self, relationships, *fields):
+        include_geometry = self.include_geometry()
+        for relationship in relationships:
+            for field in fields:
+                location = getattr(relationship, field)
+                if not include_geometry:
+                    # Set in place of the deferred field, so that it is
+                    # not loaded while serializing.
+                    location.geometry = None
+                elif hasattr(relationship, field + '_simplified_geometry'):
+                    location.simplified_geometry = getattr(
+                        relationship, field + '_simplified_geometry')
+        return relationships
+
     def get(self, request, *args, **kwargs):
 
         acceptable_classes = ('spatial', 'party', 'tenure')
@@ -72,11 +168,15 @@ class RelationshipList(APIPermissionRequiredMixin,
             (rel_class is None or rel_class == 'spatial')
         ):
             manager = SpatialRelationship.objects
-            spatial_rels = (
-                manager.filter(
-                    Q(su1=kwargs['spatial_id']) |
-                    Q(su2=kwargs['spatial_id'])
-                )
+            spatial_rels = self.set_geometries(
+                self.get_locations(
+                    manager.filter(
+                        Q(su1=kwargs['spatial_id']) |
+                        Q(su2=kwargs['spatial_id'])
+                    ),
+                    'su1', 'su2'
+                ),
+                'su1', 'su2'
             )
         serialized_spatial_rels = SpatialRelationshipReadSerializer(
             spatial_rels, many=True).data
@@ -91,21 +191,26 @@ class RelationshipList(APIPermissionRequiredMixin,
                 manager.filter(
                     Q(party1=kwargs['party_id']) |
                     Q(party2=kwargs['party_id'])
-                )
+                ).select_related('party1', 'party2')
             )
         serialized_party_rels = serializers.PartyRelationshipReadSerializer(
             party_rels, many=True).data
 
         tenure_rels = []
         if rel_class is None or rel_class == 'tenure':
-            manager = TenureRelationship.objects
+            entity = {}
             if 'spatial_id' in kwargs:
-                tenure_rels = (
-                    manager.filter(spatial_unit=kwargs['spatial_id'])
-                )
+                entity = {'spatial_unit': kwargs['spatial_id']}
             elif 'party_id' in kwargs:
-                tenure_rels = (
-                    manager.filter(party=kwargs['party_id'])
+                entity = {'party': kwargs['party_id']}
+            if entity:
+                manager = TenureRelationship.objects
+                tenure_rels = self.set_geometries(
+                    self.get_locations(
+                        manager.filter(**entity).select_related('party'),
+                        'spatial_unit'
+                    ),
+                    'spatial_unit'
                 )
         serialized_tenure_rels = serializers.TenureRelationshipReadSerializer(
             tenure_rels, many=True).data
@@ -1,8 +1,8 @@
 from core.views import generic
 import django.views.generic as base_generic
 from django.core.urlresolvers import reverse
-from jsonattrs.mixins import JsonAttrsMixin
 from core.mixins import LoginPermissionRequiredMixin
+from core.views.mixins import JsonAttrsMixin
 
 from organization.views import mixins as organization_mixins
 from resources.forms import AddResourceFromLibraryForm
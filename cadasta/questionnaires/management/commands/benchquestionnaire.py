@@ -0,0 +1,125 @@
+import itertools
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from jsonattrs.models import Attribute, AttributeType, Schema
+
+from core.benchmarks import Benchmark, run_in_rollback
+from core.util import random_id
+from organization.models import Organization, Project
+
+from ...managers import ATTRIBUTE_GROUPS, create_children
+from ...models import Question, QuestionGroup, QuestionOption, Questionnaire
+
+QUESTION_TYPES = ('text', 'integer', 'decimal', 'date', 'select one')
+CHOICES = [{'name': str(i), 'label': 'Choice {}'.format(i)}
+           for i in range(5)]
+
+
+def build_survey(count):
+    """Returns the pyxform JSON children of a survey with ``count``
+    questions, in groups of 20, the first few of which are attribute
+    groups."""
+    children = []
+    attr_groups = itertools.chain(ATTRIBUTE_GROUPS.keys(),
+                                  itertools.repeat(None))
+    for start, attr_group in zip(range(0, count, 20), attr_groups):
+        questions = []
+        for i in range(start, min(start + 20, count)):
+            type = QUESTION_TYPES[i % len(QUESTION_TYPES)]
+            question = {'name': 'question_{}'.format(i),
+                        'label': 'Question {}'.format(i),
+                        'type': type,
+                        'bind': {'required': 'yes' if i % 3 else 'no'}}
+            if type == 'select one':
+                question['choices'] = CHOICES
+            questions.append(question)
+        children.append({
+            'name': attr_group or 'group_{}'.format(start),
+            'label': 'Group {}'.format(start),
+            'type': 'group',
+            'children': questions,
+        })
+    return children
+
+
+def legacy_create_children(children, questionnaire, question_group=None):
+    """Creates the survey one object at a time, as the questionnaire
+    import used to."""
+    for c in children:
+        if c.get('type') == 'group':
+            for attr_group, model in ATTRIBUTE_GROUPS.items():
+                if c['name'].startswith(attr_group):
+                    content_type = ContentType.objects.get(**model)
+                    legacy_create_attrs_schema(c, content_type,
+                                               questionnaire.project)
+            group = QuestionGroup.objects.create(
+                questionnaire=questionnaire, name=c['name'],
+                label=c['label'])
+            legacy_create_children(c['children'], questionnaire, group)
+        else:
+            question = Question.objects.build_from_dict(
+                dict=c, questionnaire=questionnaire,
+                question_group=question_group)
+            question.save()
+            for o in c.get('choices', []):
+                QuestionOption.objects.create(question=question, **o)
+
+
+def legacy_create_attrs_schema(c, content_type, project):
+    schema = Schema.objects.create(
+        content_type=content_type,
+        selectors=(project.organization.pk, project.pk,
+                   project.current_questionnaire))
+    for index, field in enumerate(c['children'], 1):
+        Attribute.objects.create(
+            schema=schema, name=field['name'], long_name=field['label'],
+            attr_type=AttributeType.objects.get(
+                name=field['type'].replace(' ', '_')),
+            index=index,
+            choices=[choice['name'] for choice in field.get('choices', [])],
+            required=field['bind']['required'] == 'yes')
+
+
+class Command(BaseCommand):
+    help = """Compares creating the questions, options and attributes of
+            a generated questionnaire one object at a time with the bulk
+            questionnaire import. Nothing is written to the database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions',
+                            nargs='+',
+                            type=int,
+                            dest='questions',
+                            default=[300],
+                            help="""Numbers of questions in the
+                                    questionnaire.""")
+
+    def create_questionnaire(self):
+        org = Organization.objects.create(name='Benchmark ' + random_id())
+        project = Project.objects.create(name='Benchmark', organization=org)
+        questionnaire = Questionnaire.objects.create(
+            project=project, filename='benchmark', title='Benchmark',
+            id_string=random_id(), xls_form='benchmark.xlsx',
+            xml_form='benchmark.xml')
+        project.current_questionnaire = questionnaire.id
+        project.save()
+        return questionnaire
+
+    def run(self, count):
+        children = build_survey(count)
+
+        questionnaire = self.create_questionnaire()
+        with Benchmark('one at a time', count) as bench:
+            legacy_create_children(children, questionnaire)
+        self.stdout.write(str(bench))
+
+        questionnaire = self.create_questionnaire()
+        with Benchmark('bulk import', count) as bench:
+            create_children(children, project=questionnaire.project,
+                            kwargs={'questionnaire': questionnaire})
+        self.stdout.write(str(bench))
+
+    def handle(self, *args, **options):
+        for count in sorted(options['questions']):
+            run_in_rollback(self.run, count)
@@ -4,18 +4,19 @@ import os
 import re
 from datetime import datetime
 
-from lxml import etree
-
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.db import models, transaction
 from django.utils.translation import ugettext as _
 from jsonattrs.models import Attribute, AttributeType, Schema
-from pyxform.builder import create_survey_element_from_dict
 from pyxform.errors import PyXFormError
-from pyxform.xls2json import parse_file_to_json
 from questionnaires.exceptions import InvalidXLSForm
 
+from core.models import create_historical_records
+from core.schemas import invalidate_schemas
+
+from . import xlsform
+
 ATTRIBUTE_GROUPS = {
     'location_attributes': {
         'app_label': 'spatial',
@@ -41,91 +42,165 @@ ATTRIBUTE_GROUPS = {
 
 
 def create_children(children, errors=[], project=None, kwargs={}):
-    if children:
-        for c in children:
-            if c.get('type') == 'group':
-                model_name = 'QuestionGroup'
-
-                # parse attribute group
-                attribute_group = c.get('name')
-                for attr_group in ATTRIBUTE_GROUPS.keys():
-                    if attribute_group.startswith(attr_group):
-                        app_label = ATTRIBUTE_GROUPS[attr_group]['app_label']
-                        model = ATTRIBUTE_GROUPS[attr_group]['model']
-                        content_type = ContentType.objects.get(
-                            app_label=app_label, model=model)
-                        create_attrs_schema(
-                            project=project, dict=c,
-                            content_type=content_type, errors=errors
-                        )
-            else:
-                model_name = 'Question'
-
-            model = apps.get_model('questionnaires', model_name)
-            model.objects.create_from_dict(dict=c, errors=errors, **kwargs)
+    builder = QuestionnaireBuilder(project=project, errors=errors, **kwargs)
+    builder.add_children(children)
+    builder.save()
 
 
 def create_options(options, question, errors=[]):
-    if options:
-        for o in options:
-            QuestionOption = apps.get_model('questionnaires', 'QuestionOption')
-            QuestionOption.objects.create(question=question, **o)
-    else:
-        errors.append(_("Please provide at least one option for field"
-                        " '{field_name}'".format(field_name=question.name)))
+    builder = QuestionnaireBuilder(errors=errors)
+    builder.add_options(options, question)
+    builder.save()
 
 
 def create_attrs_schema(project=None, dict=None, content_type=None, errors=[]):
-    fields = []
-    selectors = (project.organization.pk, project.pk,
-                 project.current_questionnaire)
-    # check if the attribute group has a relevant bind statement,
-    # eg ${party_type}='IN'
-    # this enables conditional attribute schema creation
-    bind = dict.get('bind', None)
-    if bind:
-        relevant = bind.get('relevant', None)
-        if relevant:
-            clauses = relevant.split('=')
-            selector = re.sub("'", '', clauses[1])
-            selectors += (selector,)
-
-    schema_obj = Schema.objects.create(content_type=content_type,
-                                       selectors=selectors)
-
-    for c in dict.get('children'):
-        field = {}
-        field['name'] = c.get('name')
-        field['long_name'] = c.get('label')
-        # HACK: pyxform strips underscores from xform field names
-        field['attr_type'] = c.get('type').replace(' ', '_')
-        if c.get('default'):
-            field['default'] = c.get('default', '')
-        if c.get('omit'):
-            field['omit'] = c.get('omit')
-        bind = c.get('bind')
+    builder = QuestionnaireBuilder(project=project, errors=errors)
+    builder.add_attrs_schema(dict, content_type)
+    builder.save()
+
+
+class QuestionnaireBuilder:
+    """
+    Collects the question groups, questions, options, attribute schemas
+    and attributes of a pyxform survey in one walk over its JSON, and
+    saves each kind of object with one bulk insert.
+
+    Content types and attribute types are looked up once per builder.
+    """
+
+    def __init__(self, questionnaire=None, question_group=None,
+                 project=None, errors=[]):
+        self.questionnaire = questionnaire
+        self.question_group = question_group
+        self.project = project
+        self.errors = errors
+
+        self.question_groups = []
+        # Questions and options are linked to their group and question
+        # once those have ids, see save().
+        self.questions = []
+        self.options = []
+        self.schemas = []
+        self.attributes = []
+        self._attr_types = None
+
+    def get_content_type(self, attr_group):
+        return ContentType.objects.get_by_natural_key(
+            ATTRIBUTE_GROUPS[attr_group]['app_label'],
+            ATTRIBUTE_GROUPS[attr_group]['model'])
+
+    def get_attr_type(self, name):
+        if self._attr_types is None:
+            self._attr_types = {attr_type.name: attr_type
+                                for attr_type in AttributeType.objects.all()}
+        try:
+            return self._attr_types[name]
+        except KeyError:
+            raise AttributeType.DoesNotExist(
+                "AttributeType matching query does not exist.")
+
+    def add_children(self, children, question_group=None):
+        question_group = question_group or self.question_group
+        for c in children or []:
+            if c.get('type') == 'group':
+                # parse attribute group
+                attribute_group = c.get('name')
+                for attr_group in ATTRIBUTE_GROUPS.keys():
+                    if attribute_group.startswith(attr_group):
+                        self.add_attrs_schema(
+                            c, self.get_content_type(attr_group))
+
+                QuestionGroup = apps.get_model('questionnaires',
+                                               'QuestionGroup')
+                group = QuestionGroup.objects.build_from_dict(
+                    dict=c, questionnaire=self.questionnaire)
+                self.question_groups.append(group)
+                self.add_children(c.get('children'), group)
+            else:
+                Question = apps.get_model('questionnaires', 'Question')
+                question = Question.objects.build_from_dict(
+                    dict=c, questionnaire=self.questionnaire)
+                self.questions.append((question, question_group))
+                if question.has_options:
+                    self.add_options(c.get('choices'), question)
+
+    def add_options(self, options, question):
+        if options:
+            QuestionOption = apps.get_model('questionnaires',
+                                            'QuestionOption')
+            for o in options:
+                self.options.append((QuestionOption(**o), question))
+        else:
+            self.errors.append(
+                _("Please provide at least one option for field"
+                  " '{field_name}'".format(field_name=question.name)))
+
+    def add_attrs_schema(self, dict, content_type):
+        project = self.project or self.questionnaire.project
+        selectors = (project.organization.pk, project.pk,
+                     project.current_questionnaire)
+        # check if the attribute group has a relevant bind statement,
+        # eg ${party_type}='IN'
+        # this enables conditional attribute schema creation
+        bind = dict.get('bind', None)
         if bind:
-            field['required'] = True if bind.get(
-                'required', 'no') == 'yes' else False
-        if c.get('choices'):
-            field['choices'] = [choice.get('name')
-                                for choice in c.get('choices')]
-        fields.append(field)
-
-    for field, index in zip(fields, itertools.count(1)):
-        long_name = field.get('long_name', field['name'])
-        attr_type = AttributeType.objects.get(name=field['attr_type'])
-        choices = field.get('choices', [])
-        default = field.get('default', '')
-        required = field.get('required', False)
-        omit = True if field.get('omit', '') == 'yes' else False
-        Attribute.objects.create(
-            schema=schema_obj,
-            name=field['name'], long_name=long_name,
-            attr_type=attr_type, index=index,
-            choices=choices, default=default,
-            required=required, omit=omit
-        )
+            relevant = bind.get('relevant', None)
+            if relevant:
+                clauses = relevant.split('=')
+                selector = re.sub("'", '', clauses[1])
+                selectors += (selector,)
+
+        schema = Schema(content_type=content_type, selectors=selectors)
+        self.schemas.append(schema)
+
+        for c, index in zip(dict.get('children'), itertools.count(1)):
+            bind = c.get('bind')
+            self.attributes.append((Attribute(
+                name=c.get('name'),
+                long_name=c.get('label'),
+                # HACK: pyxform strips underscores from xform field names
+                attr_type=self.get_attr_type(c.get('type').replace(' ', '_')),
+                index=index,
+                choices=[choice.get('name')
+                         for choice in c.get('choices') or []],
+                default=c.get('default') or '',
+                required=bool(bind) and bind.get('required', 'no') == 'yes',
+                omit=c.get('omit') == 'yes'
+            ), schema))
+
+    def save(self, user=None):
+        with transaction.atomic():
+            self.insert('QuestionGroup', self.question_groups, user)
+
+            for question, question_group in self.questions:
+                question.question_group = question_group
+            self.insert('Question',
+                        [question for question, group in self.questions],
+                        user)
+
+            for option, question in self.options:
+                option.question = question
+            self.insert('QuestionOption',
+                        [option for option, question in self.options],
+                        user)
+
+            # Schemas get their ids from the database, which bulk_create
+            # does not return, but there are only a few of them.
+            for schema in self.schemas:
+                schema.save()
+            for attribute, schema in self.attributes:
+                attribute.schema = schema
+            Attribute.objects.bulk_create(
+                [attribute for attribute, schema in self.attributes])
+
+        if self.attributes:
+            invalidate_schemas()
+
+    def insert(self, model_name, instances, user=None):
+        if instances:
+            model = apps.get_model('questionnaires', model_name)
+            model.bulk_insert(instances)
+            create_historical_records(model, instances, user)
 
 
 class QuestionnaireManager(models.Manager):
@@ -140,7 +215,8 @@ class QuestionnaireManager(models.Manager):
                     original_file=original_file,
                     project=project
                 )
-                json = parse_file_to_json(instance.xls_form.file.name)
+                json, xml = xlsform.parse_xls_form(
+                    instance.xls_form.file.name)
                 instance.filename = json.get('name')
                 instance.title = json.get('title')
                 instance.id_string = json.get('id_string')
@@ -151,12 +227,7 @@ class QuestionnaireManager(models.Manager):
                     instance.filename, instance.id_string, instance.version
                 )
 
-                survey = create_survey_element_from_dict(json)
-                xml_form = survey.xml().toxml()
-                # insert version attr into the xform instance root node
-                xml = self.insert_version_attribute(
-                    xml_form, instance.filename, instance.version
-                )
+                xml = xlsform.stamp_version(xml, instance.version)
                 name = os.path.join(instance.xml_form.field.upload_to,
                                     os.path.basename(instance.filename))
                 url = instance.xml_form.storage.save(
@@ -175,6 +246,10 @@ class QuestionnaireManager(models.Manager):
                     kwargs={'questionnaire': instance}
                 )
 
+                # Processes that cached the schemas while the new ones
+                # were being created must drop them once they are visible.
+                transaction.on_commit(invalidate_schemas)
+
                 # all these errors handled by PyXForm so turning off for now
                 # if errors:
                 #     raise InvalidXLSForm(errors)
@@ -189,27 +264,21 @@ class QuestionnaireManager(models.Manager):
         return hashlib.md5(string.encode()).hexdigest()
 
     def insert_version_attribute(self, xform, root_node, version):
-        ns = {'xf': 'http://www.w3.org/2002/xforms'}
-        root = etree.fromstring(xform)
-        inst = root.find(
-            './/xf:instance/xf:{root_node}'.format(
-                root_node=root_node
-            ), namespaces=ns
-        )
-        inst.set('version', str(version))
-        xml = etree.tostring(
-            root, method='xml', encoding='utf-8', pretty_print=True
-        )
-        return xml
+        return xlsform.insert_version_attribute(xform, root_node, version)
 
 
 class QuestionGroupManager(models.Manager):
 
-    def create_from_dict(self, dict=None, questionnaire=None, errors=[]):
+    def build_from_dict(self, dict=None, questionnaire=None):
         instance = self.model(questionnaire=questionnaire)
 
         instance.name = dict.get('name')
         instance.label = dict.get('label')
+        return instance
+
+    def create_from_dict(self, dict=None, questionnaire=None, errors=[]):
+        instance = self.build_from_dict(dict=dict,
+                                        questionnaire=questionnaire)
         instance.save()
 
         create_children(
@@ -227,8 +296,7 @@ class QuestionGroupManager(models.Manager):
 
 class QuestionManager(models.Manager):
 
-    def create_from_dict(self, errors=[], **kwargs):
-        dict = kwargs.pop('dict')
+    def build_from_dict(self, dict=None, **kwargs):
         instance = self.model(**kwargs)
 
         type_dict = {name: code for code, name in instance.TYPE_CHOICES}
@@ -246,6 +314,11 @@ class QuestionManager(models.Manager):
         instance.label = dict.get('label')
         instance.required = dict.get('required', False)
         instance.constraint = dict.get('constraint')
+        return instance
+
+    def create_from_dict(self, errors=[], **kwargs):
+        dict = kwargs.pop('dict')
+        instance = self.build_from_dict(dict=dict, **kwargs)
         instance.save()
 
         if instance.has_options:
@@ -5,15 +5,18 @@ from lxml import etree
 
 from buckets.test.storage import FakeS3Storage
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from jsonattrs.models import AttributeType, Schema
 from organization.tests.factories import ProjectFactory
 from questionnaires.exceptions import InvalidXLSForm
 from core.tests.utils.files import make_dirs  # noqa
 
 from . import factories
 from .. import models
-from ..managers import create_children, create_options
+from ..managers import (QuestionnaireBuilder, create_children,
+                        create_options)
 
 path = os.path.dirname(settings.BASE_DIR)
 
@@ -59,6 +62,79 @@ class CreateChildrenTest(TestCase):
             question_group__isnull=False).count() == 1
 
 
+class QuestionnaireBuilderTest(TestCase):
+
+    def get_children(self, count):
+        return [{
+            'name': 'party_attributes_default',
+            'label': 'Party attributes',
+            'type': 'group',
+            'children': [{
+                'name': 'field_{}'.format(i),
+                'label': 'Field {}'.format(i),
+                'type': 'select one',
+                'bind': {'required': 'yes'},
+                'choices': [{'name': 'a', 'label': 'A'},
+                            {'name': 'b', 'label': 'B'}]
+            } for i in range(count)]
+        }, {
+            'name': 'intro',
+            'label': 'Introduction',
+            'type': 'note'
+        }]
+
+    def test_save(self):
+        questionnaire = factories.QuestionnaireFactory.create()
+        builder = QuestionnaireBuilder(project=questionnaire.project,
+                                       questionnaire=questionnaire)
+        builder.add_children(self.get_children(2))
+        builder.save()
+
+        group = models.QuestionGroup.objects.get(questionnaire=questionnaire)
+        assert group.name == 'party_attributes_default'
+        assert group.history.count() == 1
+        assert models.Question.objects.filter(
+            questionnaire=questionnaire).count() == 3
+        assert group.questions.count() == 2
+        question = group.questions.get(name='field_0')
+        assert question.type == 'S1'
+        assert question.history.count() == 1
+        assert sorted(question.options.values_list('name', flat=True)) == [
+            'a', 'b']
+
+        schema = Schema.objects.get(
+            content_type__model='party',
+            selectors=[questionnaire.project.organization.id,
+                       questionnaire.project.id, questionnaire.id])
+        attrs = list(schema.attributes.all())
+        assert [a.name for a in attrs] == ['field_0', 'field_1']
+        assert [a.index for a in attrs] == [1, 2]
+        assert attrs[0].attr_type.name == 'select_one'
+        assert attrs[0].choices == ['a', 'b']
+        assert attrs[0].required is True
+
+    def test_number_of_queries_does_not_depend_on_size(self):
+        def count_queries(count):
+            questionnaire = factories.QuestionnaireFactory.create()
+            with CaptureQueriesContext(connection) as queries:
+                create_children(self.get_children(count),
+                                project=questionnaire.project,
+                                kwargs={'questionnaire': questionnaire})
+            return len(queries)
+
+        # Caches the content type of the attribute group.
+        count_queries(1)
+        assert count_queries(2) == count_queries(20)
+
+    def test_unknown_attribute_type(self):
+        questionnaire = factories.QuestionnaireFactory.create()
+        children = self.get_children(1)
+        children[0]['children'][0]['type'] = 'unknown'
+        with pytest.raises(AttributeType.DoesNotExist):
+            create_children(children, project=questionnaire.project,
+                            kwargs={'questionnaire': questionnaire})
+
+
 class CreateOptionsTest(TestCase):
 
     def test_create_options(self):
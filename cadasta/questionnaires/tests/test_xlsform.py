@@ -0,0 +1,40 @@
+import os
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+from lxml import etree
+from pyxform.xls2json import parse_file_to_json
+
+from .. import xlsform
+
+path = os.path.dirname(settings.BASE_DIR)
+XLS_FORM = path + '/questionnaires/tests/files/xls-form.xlsx'
+
+
+class ParseXLSFormTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_parse_xls_form(self):
+        json, xml = xlsform.parse_xls_form(XLS_FORM)
+        assert json['name'] == 'xls-form'
+        assert json['id_string'] == 'question_types'
+        assert b'version="__version__"' in xml
+
+    def test_parse_xls_form_is_cached(self):
+        with patch('questionnaires.xlsform.parse_file_to_json',
+                   wraps=parse_file_to_json) as parse:
+            first = xlsform.parse_xls_form(XLS_FORM)
+            second = xlsform.parse_xls_form(XLS_FORM)
+        assert parse.call_count == 1
+        assert first == second
+
+    def test_stamp_version(self):
+        json, xml = xlsform.parse_xls_form(XLS_FORM)
+        root = etree.fromstring(xlsform.stamp_version(xml, 2016072518593012))
+        ns = {'xf': 'http://www.w3.org/2002/xforms'}
+        node = root.find('.//xf:instance/xf:xls-form', namespaces=ns)
+        assert node.get('version') == '2016072518593012'
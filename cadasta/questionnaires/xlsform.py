@@ -0,0 +1,67 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from lxml import etree
+from pyxform.builder import create_survey_element_from_dict
+from pyxform.xls2json import parse_file_to_json
+
+# Stands in for the questionnaire version in cached XForm XML.
+VERSION_PLACEHOLDER = '__version__'
+
+
+def insert_version_attribute(xform, root_node, version):
+    """Sets the version attribute of the instance root node of ``xform``,
+    and returns the XML as bytes."""
+    ns = {'xf': 'http://www.w3.org/2002/xforms'}
+    root = etree.fromstring(xform)
+    inst = root.find(
+        './/xf:instance/xf:{root_node}'.format(
+            root_node=root_node
+        ), namespaces=ns
+    )
+    inst.set('version', str(version))
+    xml = etree.tostring(
+        root, method='xml', encoding='utf-8', pretty_print=True
+    )
+    return xml
+
+
+def get_cache_key(path):
+    # pyxform names the form after the file, so forms with the same
+    # content but different file names are parsed separately.
+    content_hash = hashlib.sha256()
+    content_hash.update(os.path.basename(path).encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            content_hash.update(chunk)
+    return 'questionnaires.xlsform:{}'.format(content_hash.hexdigest())
+
+
+def parse_xls_form(path):
+    """Returns the pyxform JSON of the XLSForm at ``path`` and the XForm
+    XML built from it, with VERSION_PLACEHOLDER as the version.
+
+    Both are cached by the name and content of the file. Forms that
+    pyxform rejects raise PyXFormError and are not cached.
+    """
+    key = get_cache_key(path)
+    parsed = cache.get(key)
+    if parsed is None:
+        json = parse_file_to_json(path)
+        survey = create_survey_element_from_dict(json)
+        xml = insert_version_attribute(survey.xml().toxml(),
+                                       json.get('name'),
+                                       VERSION_PLACEHOLDER)
+        parsed = (json, xml)
+        cache.set(key, parsed, settings.XLSFORM_CACHE_TIMEOUT)
+    return parsed
+
+
+def stamp_version(xml, version):
+    """Replaces the version placeholder in XForm XML from
+    ``parse_xls_form``."""
+    return xml.replace(
+        'version="{}"'.format(VERSION_PLACEHOLDER).encode(),
+        'version="{}"'.format(version).encode(), 1)
@@ -0,0 +1,112 @@
+"""Generation of thumbnails and other derivatives of resource files.
+
+Derivatives are generated after the resource is saved, in an in-process
+worker pool by default, so that uploads do not wait for images to be
+decoded and resized or for GPX files to be imported. The storage names
+of the thumbnails of the current file are recorded on the resource's
+``file_versions`` under ``DERIVATIVES_KEY``.
+"""
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from core.permissions import clear_request_cache
+
+from .utils import thumbnail
+
+logger = logging.getLogger('resources.derivatives')
+
+DERIVATIVES_KEY = 'derivatives'
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.RESOURCE_DERIVATIVE_WORKERS)
+    return _executor
+
+
+def size_label(size):
+    return '{}x{}'.format(*size)
+
+
+def derivative_name(resource, size):
+    """Returns the storage name of the derivative of ``resource``'s file
+    for ``size``, which ``Resource.thumbnail`` relies on."""
+    file_name = resource.file.url.split('/')[-1]
+    name = file_name[:file_name.rfind('.')]
+    ext = file_name.split('.')[-1]
+    if resource.file.field.upload_to:
+        name = resource.file.field.upload_to + '/' + name
+    return '{}-{}.{}'.format(name, size_label(size), ext)
+
+
+def submit(create, resource):
+    """Calls ``create(resource)`` according to RESOURCE_DERIVATIVE_MODE."""
+    mode = settings.RESOURCE_DERIVATIVE_MODE
+    if mode == 'sync':
+        create(resource)
+    else:
+        # The worker thread uses its own connection, so it can only see
+        # the resource once the request's transaction is committed.
+        resource_id, url = resource.id, resource.file.url
+        transaction.on_commit(lambda: get_executor().submit(
+            run_in_thread, create, resource_id, url))
+
+
+def submit_derivatives(resource):
+    submit(create_derivatives, resource)
+
+
+def run_in_thread(create, resource_id, url):
+    # The models import this module.
+    from .models import Resource
+
+    # The pool's threads are reused, so the permission decisions cached
+    # by an earlier job must not be reused by this one.
+    clear_request_cache()
+    try:
+        resource = Resource.objects.filter(id=resource_id).first()
+        # Skip files that were replaced before the job ran; the new file
+        # has a job of its own.
+        if resource is not None and resource.file.url == url:
+            create(resource)
+    except Exception:
+        logger.exception('{} of resource {} failed'.format(
+            create.__name__, resource_id))
+    finally:
+        connection.close()
+
+
+def create_derivatives(resource):
+    """Creates the thumbnails of ``resource``'s image in all of
+    RESOURCE_THUMBNAIL_SIZES, from a single decode of the image."""
+    sizes = settings.RESOURCE_THUMBNAIL_SIZES
+    thumbs, format = thumbnail.make_sizes(resource.file.open(), sizes)
+
+    derivatives = {}
+    for size, thumb in zip(sizes, thumbs):
+        buffer = io.BytesIO()
+        thumb.save(buffer, format=format)
+        derivatives[size_label(size)] = resource.file.storage.save(
+            derivative_name(resource, size), buffer.getvalue())
+
+    record_derivatives(resource, derivatives)
+    return derivatives
+
+
+def record_derivatives(resource, derivatives):
+    file_versions = dict(resource.file_versions or {})
+    file_versions[DERIVATIVES_KEY] = derivatives
+    resource.file_versions = file_versions
+    # Updating the row directly does not send the save signals again, and
+    # leaves the row alone if its file was replaced in the meantime.
+    type(resource).objects.filter(
+        id=resource.id, file=resource.file.url
+    ).update(file_versions=file_versions)
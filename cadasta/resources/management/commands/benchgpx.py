@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+from django.contrib.gis.gdal import DataSource
+from django.contrib.gis.geos import GeometryCollection
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import Benchmark
+
+from ...processors.gpx import KEEP_LAYERS, GPXProcessor
+
+GPX_HEADER = b'<?xml version="1.0" encoding="UTF-8"?>\n' \
+             b'<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1">\n'
+
+
+def write_gpx(file, count):
+    """Writes a GPX file with a single track of ``count`` points, like a
+    long recording of a GPS device."""
+    file.write(GPX_HEADER)
+    file.write(b'<trk><name>Benchmark</name><trkseg>\n')
+    for i in range(count):
+        file.write(
+            '<trkpt lat="{:.6f}" lon="{:.6f}"><ele>{:.1f}</ele>'
+            '<time>2016-01-01T00:00:00Z</time></trkpt>\n'.format(
+                52 + (i % 1000) / 100000, -7 + i / 1000000, i % 100
+            ).encode())
+    file.write(b'</trkseg></trk>\n</gpx>\n')
+
+
+def read_with_ogr(path):
+    """Reads the layers the way GPXProcessor used to, with OGR building
+    each layer in memory."""
+    layers = {}
+    for layer in DataSource(path):
+        if layer.name in KEEP_LAYERS:
+            layers[layer.name] = GeometryCollection(
+                layer.get_geoms(geos=True))
+    return layers
+
+
+class Command(BaseCommand):
+    help = """Compares reading generated GPX tracks with OGR with the
+            streaming GPXProcessor. Peak RSS only grows, so the streaming
+            processor runs first."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records',
+                            nargs='+',
+                            type=int,
+                            dest='records',
+                            default=[100000],
+                            help="""Numbers of track points.""")
+
+    def run(self, count):
+        fd, path = tempfile.mkstemp(suffix='.gpx')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                write_gpx(file, count)
+
+            with Benchmark('streaming GPXProcessor', count) as bench:
+                GPXProcessor(path).get_layers()
+            self.stdout.write(str(bench))
+
+            with Benchmark('OGR layers', count) as bench:
+                read_with_ogr(path)
+            self.stdout.write(str(bench))
+        finally:
+            os.remove(path)
+
+    def handle(self, *args, **options):
+        for count in sorted(options['records']):
+            self.run(count)
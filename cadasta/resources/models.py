@@ -1,4 +1,3 @@
-import os
 from datetime import datetime
 
 import magic
@@ -13,18 +12,21 @@ from django.db import models
 from django.dispatch import receiver
 from django.utils.translation import ugettext as _
 from jsonattrs.fields import JSONAttributeField
+from organization.statistics import record_change
 from simple_history.models import HistoricalRecords
 from tutelary.decorators import permissioned_model
 
-from . import messages
+from . import derivatives, messages
 from .exceptions import InvalidGPXFile
 from .managers import ResourceManager
 from .processors.gpx import GPXProcessor
-from .utils import io, thumbnail
 from .validators import ACCEPTED_TYPES, validate_file_type
 
 content_types = models.Q(app_label='organization', model='project')
 
+# Number of bytes of an uploaded file that libmagic looks at.
+MIME_CHECK_BYTES = 8192
+
 
 @permissioned_model
 class Resource(RandomIDModel):
@@ -112,6 +114,8 @@ def archive_file(sender, instance, **kwargs):
         if not instance.file_versions:
             instance.file_versions = {}
         instance.file_versions[now] = instance._original_url
+        # The derivatives of the replaced file are of no use anymore.
+        instance.file_versions.pop(derivatives.DERIVATIVES_KEY, None)
     instance._original_url = instance.file.url
 
     # Detach the resource when it is archived
@@ -119,59 +123,52 @@ def archive_file(sender, instance, **kwargs):
         ContentObject.objects.filter(resource=instance).delete()
 
 
+@receiver(models.signals.post_save, sender=Resource)
+def resource_saved(sender, instance, created, **kwargs):
+    record_change(instance.project_id, num_resources=int(created))
+
+
+@receiver(models.signals.post_delete, sender=Resource)
+def resource_deleted(sender, instance, **kwargs):
+    record_change(instance.project_id, num_resources=-1)
+
+
 @receiver(models.signals.post_save, sender=Resource)
 def create_thumbnails(sender, instance, created, **kwargs):
     if created or instance._original_url != instance.file.url:
         if 'image' in instance.mime_type:
-            io.ensure_dirs()
-            file_name = instance.file.url.split('/')[-1]
-            name = file_name[:file_name.rfind('.')]
-            ext = file_name.split('.')[-1]
-            write_path = os.path.join(settings.MEDIA_ROOT,
-                                      'temp',
-                                      name + '-128x128.' + ext)
-
-            size = 128, 128
-
-            file = instance.file.open()
-            thumb = thumbnail.make(file, size)
-            thumb.save(write_path)
-            if instance.file.field.upload_to:
-                name = instance.file.field.upload_to + '/' + name
-            instance.file.storage.save(name + '-128x128.' + ext,
-                                       open(write_path, 'rb').read())
+            derivatives.submit_derivatives(instance)
 
 
 @receiver(models.signals.post_save, sender=Resource)
 def create_spatial_resource(sender, instance, created, **kwargs):
     if created or instance._original_url != instance.file.url:
         if 'xml' in instance.mime_type:
-            io.ensure_dirs()
-            file_name = instance.file.url.split('/')[-1]
-            write_path = os.path.join(settings.MEDIA_ROOT,
-                                      'temp', file_name)
-            file = instance.file.open().read()
-            with open(write_path, 'wb') as f:
-                f.write(file)
             # need to double check the mime-type here as browser detection
             # of gpx mime type is not reliable
+            head = instance.file.open().read(MIME_CHECK_BYTES)
             mime = magic.Magic(mime=True)
-            mime_type = str(mime.from_file(write_path), 'utf-8')
+            mime_type = str(mime.from_buffer(head), 'utf-8')
             if mime_type in ('application/xml', 'text/xml'):
-                processor = GPXProcessor(write_path)
-                layers = processor.get_layers()
-                for layer in layers.keys():
-                    if len(layers[layer]) > 0:
-                        SpatialResource.objects.create(
-                            resource=instance, name=layer, geom=layers[layer])
+                derivatives.submit(import_gpx_layers, instance)
             else:
-                os.remove(write_path)
                 raise InvalidGPXFile(
                     _('Invalid GPX mime type: {error}'.format(
                         error=mime_type))
                 )
 
 
+def import_gpx_layers(resource):
+    """Creates a spatial resource for each non-empty layer of the GPX
+    file of ``resource``, streaming the file from storage."""
+    layers = GPXProcessor(resource.file.open()).get_layers()
+    SpatialResource.bulk_insert([
+        SpatialResource(resource=resource, name=name, geom=geom,
+                        attributes={})
+        for name, geom in layers.items() if len(geom) > 0
+    ])
+
+
 class ContentObject(RandomIDModel):
     resource = models.ForeignKey(Resource, related_name='content_objects')
 
@@ -1,19 +1,82 @@
-from django.contrib.gis.gdal import DataSource
-from django.contrib.gis.geos import GeometryCollection
+from xml.etree.ElementTree import iterparse
+
+from django.conf import settings
+from django.contrib.gis.geos import (GeometryCollection, LineString,
+                                     MultiLineString, Point)
 
 KEEP_LAYERS = ['tracks', 'routes', 'waypoints']
 
 
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
 class GPXProcessor:
+    """Reads the waypoints, routes and tracks of a GPX file.
+
+    The file is parsed incrementally, and elements are dropped as soon as
+    their coordinates are read, so only the coordinates are held in
+    memory. Lines are cut into pieces of at most GPX_SEGMENT_POINTS
+    points, which are simplified with GPX_SIMPLIFY_TOLERANCE (in degrees)
+    as soon as they are complete.
+    """
 
     def __init__(self, gpx_file):
-        self.ds = DataSource(gpx_file)
+        self.gpx_file = gpx_file
+
+    def make_lines(self, points):
+        """Returns the lines of a route or track segment, cut into pieces
+        that share their end points."""
+        size = max(settings.GPX_SEGMENT_POINTS, 2)
+        tolerance = settings.GPX_SIMPLIFY_TOLERANCE
+        lines = []
+        for start in range(0, len(points) - 1, size - 1):
+            line = LineString(points[start:start + size], srid=4326)
+            if tolerance:
+                line = line.simplify(tolerance, preserve_topology=True)
+            lines.append(line)
+        return lines
+
+    def iter_features(self):
+        """Yields the layer name and geometry of each waypoint, route and
+        track of the file."""
+        points = []
+        segments = []
+        root = None
+        for event, elem in iterparse(self.gpx_file, events=('start', 'end')):
+            if root is None:
+                root = elem
+            if event == 'start':
+                continue
+
+            name = local_name(elem.tag)
+            if name in ('rtept', 'trkpt'):
+                points.append((float(elem.get('lon')), float(elem.get('lat'))))
+                elem.clear()
+            elif name == 'trkseg':
+                segments.extend(self.make_lines(points))
+                points = []
+                elem.clear()
+            elif name == 'wpt':
+                yield 'waypoints', Point(float(elem.get('lon')),
+                                         float(elem.get('lat')), srid=4326)
+            elif name == 'rte':
+                lines = self.make_lines(points)
+                points = []
+                if lines:
+                    yield 'routes', (lines[0] if len(lines) == 1 else
+                                     MultiLineString(lines, srid=4326))
+            elif name == 'trk':
+                if segments:
+                    yield 'tracks', MultiLineString(segments, srid=4326)
+                segments = []
+
+            if name in ('wpt', 'rte', 'trk'):
+                root.clear()
 
     def get_layers(self):
-        layers = {}
-        for layer in self.ds:
-            name = layer.name
-            if name in KEEP_LAYERS:
-                # geom = self._get_features(layer)
-                layers[name] = GeometryCollection(layer.get_geoms(geos=True))
-        return layers
+        layers = {name: [] for name in KEEP_LAYERS}
+        for name, geom in self.iter_features():
+            layers[name].append(geom)
+        return {name: GeometryCollection(geoms, srid=4326)
+                for name, geoms in layers.items()}
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from buckets.test.storage import FakeS3Storage
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from core.tests.utils.cases import UserTestCase
+from core.tests.utils.files import make_dirs  # noqa
+from .factories import ResourceFactory
+from .utils import clear_temp  # noqa
+from ..derivatives import (DERIVATIVES_KEY, create_derivatives,
+                           run_in_thread)
+
+path = os.path.dirname(settings.BASE_DIR)
+storage_path = os.path.join(settings.MEDIA_ROOT, 's3/uploads/resources')
+
+
+@pytest.mark.usefixtures('make_dirs')
+@pytest.mark.usefixtures('clear_temp')
+class DerivativesTest(UserTestCase, TestCase):
+    def upload(self, name):
+        file = open(path + '/resources/tests/files/image.jpg', 'rb').read()
+        return FakeS3Storage().save('resources/' + name, file)
+
+    @override_settings(RESOURCE_THUMBNAIL_SIZES=((128, 128), (32, 32)))
+    def test_create_derivatives(self):
+        resource = ResourceFactory.create(file=self.upload('deriv.jpg'),
+                                          mime_type='image/jpeg')
+
+        assert os.path.isfile(os.path.join(storage_path,
+                                           'deriv-128x128.jpg'))
+        assert os.path.isfile(os.path.join(storage_path, 'deriv-32x32.jpg'))
+        resource.refresh_from_db()
+        assert set(resource.file_versions[DERIVATIVES_KEY]) == {
+            '128x128', '32x32'}
+
+    def test_replaced_file_drops_derivatives(self):
+        resource = ResourceFactory.create(file=self.upload('deriv_old.jpg'),
+                                          mime_type='image/jpeg')
+        resource.refresh_from_db()
+        assert DERIVATIVES_KEY in resource.file_versions
+
+        resource.file = self.upload('deriv_new.jpg')
+        resource.save()
+        assert DERIVATIVES_KEY not in resource.file_versions
+        assert len(resource.file_versions) == 1
+
+    @patch('resources.derivatives.connection')
+    def test_run_in_thread_skips_replaced_file(self, connection):
+        resource = ResourceFactory.create(file=self.upload('deriv_skip.jpg'),
+                                          mime_type='text/plain')
+        run_in_thread(create_derivatives, resource.id,
+                      'https://example.com/replaced.jpg')
+
+        assert not os.path.isfile(os.path.join(storage_path,
+                                               'deriv_skip-128x128.jpg'))
+        assert connection.close.called
+
+
+@pytest.mark.usefixtures('make_dirs')
+@pytest.mark.usefixtures('clear_temp')
+@override_settings(RESOURCE_DERIVATIVE_MODE='thread')
+class ThreadDerivativesTest(UserTestCase, TransactionTestCase):
+    # The worker threads use their own connections, so the resources
+    # have to be committed.
+    serialized_rollback = True
+
+    def create_resource(self, name, file_name, mime_type):
+        file = open(path + '/resources/tests/files/' + file_name, 'rb').read()
+        url = FakeS3Storage().save('resources/' + name, file)
+        # Shutting the pool down waits for the jobs submitted to it.
+        executor = ThreadPoolExecutor(max_workers=1)
+        with patch('resources.derivatives._executor', executor):
+            resource = ResourceFactory.create(file=url, mime_type=mime_type)
+            executor.shutdown(wait=True)
+        resource.refresh_from_db()
+        return resource
+
+    def test_create_derivatives(self):
+        resource = self.create_resource('deriv_thread.jpg', 'image.jpg',
+                                        'image/jpeg')
+        assert os.path.isfile(os.path.join(storage_path,
+                                           'deriv_thread-128x128.jpg'))
+        assert DERIVATIVES_KEY in resource.file_versions
+
+    def test_import_gpx_layers(self):
+        resource = self.create_resource('deriv_thread.xml', 'deramola.xml',
+                                        'text/xml')
+        spatial_resources = resource.spatial_resources.all()
+        assert spatial_resources.count() == 1
+        assert spatial_resources[0].name == 'waypoints'
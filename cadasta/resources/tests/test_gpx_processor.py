@@ -1,8 +1,9 @@
+import io
 import os
 
 from django.conf import settings
-from django.contrib.gis.geos import GeometryCollection
-from django.test import TestCase
+from django.contrib.gis.geos import GeometryCollection, MultiLineString
+from django.test import TestCase, override_settings
 
 from ..processors.gpx import GPXProcessor
 
@@ -43,3 +44,33 @@ class GPXProcessorTest(TestCase):
         routes = layers['routes']
         assert type(routes) is GeometryCollection
         assert len(routes) == 1
+
+    @override_settings(GPX_SEGMENT_POINTS=50, GPX_SIMPLIFY_TOLERANCE=0)
+    def test_segment_tracks(self):
+        file_path = path + '/resources/tests/files/tracks.gpx'
+        tracks = GPXProcessor(file_path).get_layers()['tracks']
+        assert len(tracks) == 1
+        assert type(tracks[0]) is MultiLineString
+        # 193 points in lines of 50 points that share their end points
+        assert [len(line) for line in tracks[0]] == [50, 50, 50, 46]
+
+    @override_settings(GPX_SIMPLIFY_TOLERANCE=0.001)
+    def test_simplify_tracks(self):
+        points = ''.join('<trkpt lat="0" lon="{}"></trkpt>'.format(i / 1000)
+                         for i in range(1000))
+        gpx = io.BytesIO(
+            '<gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>'
+            '{}</trkseg></trk></gpx>'.format(points).encode())
+        tracks = GPXProcessor(gpx).get_layers()['tracks']
+        assert len(tracks[0][0]) == 2
+
+    def test_gpx_1_0(self):
+        gpx = io.BytesIO(
+            b'<gpx xmlns="http://www.topografix.com/GPX/1/0">'
+            b'<wpt lat="52.1" lon="-7.6"><name>A</name></wpt>'
+            b'<rte><rtept lat="52.1" lon="-7.6"/>'
+            b'<rtept lat="52.2" lon="-7.7"/></rte></gpx>')
+        layers = GPXProcessor(gpx).get_layers()
+        assert layers['waypoints'][0].coords == (-7.6, 52.1)
+        assert layers['routes'][0].coords == ((-7.6, 52.1), (-7.7, 52.2))
+        assert len(layers['tracks']) == 0
@@ -29,3 +29,16 @@ class ThumbnailTest(TestCase):
         thumb = thumbnail.make(image, (100, 100))
         assert thumb.size[0] == 100
         assert thumb.size[1] == 100
+
+    def test_make_sizes(self):
+        image = path + '/resources/tests/files/image.jpg'
+        thumbs, format = thumbnail.make_sizes(image, ((100, 100), (40, 40)))
+        assert [thumb.size for thumb in thumbs] == [(100, 100), (40, 40)]
+        assert format == 'JPEG'
+
+    def test_open_scaled(self):
+        image = path + '/resources/tests/files/image.jpg'
+        full = Image.open(image)
+        scaled = thumbnail.open_scaled(image, 10)
+        assert scaled.size[0] <= full.size[0]
+        assert min(scaled.size) >= 10
@@ -94,9 +94,9 @@ class ProjectResourcesTest(APITestCase, UserTestCase, TestCase):
     def test_list_resources(self):
         response = self.request(user=self.user)
         assert response.status_code == 200
-        assert len(response.content) == 2
+        assert len(response.content['results']) == 2
 
-        returned_ids = [r['id'] for r in response.content]
+        returned_ids = [r['id'] for r in response.content['results']]
         assert all(res.id in returned_ids for res in self.resources)
 
     def test_get_full_list_organization_does_not_exist(self):
@@ -113,7 +113,7 @@ class ProjectResourcesTest(APITestCase, UserTestCase, TestCase):
     def test_get_full_list_with_unauthorized_user(self):
         response = self.request(user=UserFactory.create())
         assert response.status_code == 200
-        assert len(response.content) == 0
+        assert len(response.content['results']) == 0
 
     def test_add_resource(self):
         response = self.request(method='POST', user=self.user)
@@ -161,7 +161,7 @@ class ProjectResourcesTest(APITestCase, UserTestCase, TestCase):
                         'project': prj.slug},
             get_data={'search': 'image'})
         assert response.status_code == 200
-        assert len(response.content) == 2
+        assert len(response.content['results']) == 2
 
     def test_filter_unarchived(self):
         prj = ProjectFactory.create()
@@ -176,7 +176,7 @@ class ProjectResourcesTest(APITestCase, UserTestCase, TestCase):
                         'project': prj.slug},
             get_data={'archived': False})
         assert response.status_code == 200
-        assert len(response.content) == 1
+        assert len(response.content['results']) == 1
 
     def test_filter_archived_with_nonunarchiver(self):
         prj = ProjectFactory.create()
@@ -192,7 +192,7 @@ class ProjectResourcesTest(APITestCase, UserTestCase, TestCase):
                         'project': prj.slug},
             get_data={'archived': True})
         assert response.status_code == 200
-        assert len(response.content) == 0
+        assert len(response.content['results']) == 0
 
     def test_filter_archived_with_unarchiver(self):
         prj = ProjectFactory.create()
@@ -213,7 +213,7 @@ class ProjectResourcesTest(APITestCase, UserTestCase, TestCase):
                         'project': prj.slug},
             get_data={'archived': True})
         assert response.status_code == 200
-        assert len(response.content) == 2
+        assert len(response.content['results']) == 2
 
     def test_ordering(self):
         prj = ProjectFactory.create()
@@ -229,8 +229,8 @@ class ProjectResourcesTest(APITestCase, UserTestCase, TestCase):
                         'project': prj.slug},
             get_data={'ordering': 'name'})
         assert response.status_code == 200
-        assert len(response.content) == 3
-        names = [resource['name'] for resource in response.content]
+        assert len(response.content['results']) == 3
+        names = [resource['name'] for resource in response.content['results']]
         assert(names == sorted(names))
 
     def test_reverse_ordering(self):
@@ -246,8 +246,8 @@ class ProjectResourcesTest(APITestCase, UserTestCase, TestCase):
                         'project': prj.slug},
             get_data={'ordering': '-name'})
         assert response.status_code == 200
-        assert len(response.content) == 3
-        names = [resource['name'] for resource in response.content]
+        assert len(response.content['results']) == 3
+        names = [resource['name'] for resource in response.content['results']]
         assert(names == sorted(names, reverse=True))
 
 
@@ -437,17 +437,18 @@ class ProjectSpatialResourcesTest(APITestCase, UserTestCase, TestCase):
     def test_list_spatial_resources(self):
         response = self.request(user=self.user)
         assert response.status_code == 200
-        assert len(response.content) == 1
-        assert response.content[0]['id'] == self.resource.id
-        assert response.content[0]['spatial_resources'] is not None
-        assert response.content[0]['spatial_resources'][0]['name'] == 'tracks'
-        assert response.content[0]['spatial_resources'][0][
+        assert len(response.content['results']) == 1
+        resource = response.content['results'][0]
+        assert resource['id'] == self.resource.id
+        assert resource['spatial_resources'] is not None
+        assert resource['spatial_resources'][0]['name'] == 'tracks'
+        assert resource['spatial_resources'][0][
             'geom']['type'] == 'GeometryCollection'
-        assert response.content[0]['spatial_resources'][0]['geom'][
+        assert resource['spatial_resources'][0]['geom'][
             'geometries'][0]['type'] == 'MultiLineString'
 
     def test_list_spatial_resources_with_unauthorized_user(self):
         response = self.request(user=UserFactory.create())
         assert response.status_code == 200
-        assert len(response.content) == 0
-        assert response.content == []
+        assert len(response.content['results']) == 0
+        assert response.content['results'] == []
@@ -35,3 +35,32 @@ def make(img, size):
     cropped_img = crop(copy)
     cropped_img.thumbnail(size, Image.ANTIALIAS)
     return cropped_img
+
+
+def open_scaled(img, side):
+    """Opens the image ``img`` for square thumbnails of at most ``side``
+    pixels.
+
+    JPEGs are decoded with ``draft``, which lets the decoder scale them
+    down by a power of two while decoding, as long as the center crop of
+    the result is still at least ``side`` pixels wide."""
+    im = Image.open(img)
+    if im.format == 'JPEG':
+        scale = side / min(im.size)
+        im.draft(im.mode, (int(im.size[0] * scale) + 1,
+                           int(im.size[1] * scale) + 1))
+    im.load()
+    return im
+
+
+def make_sizes(img, sizes):
+    """Returns a thumbnail of the image ``img`` for each of ``sizes``,
+    decoding the image only once, and the format of the image."""
+    im = open_scaled(img, max(max(size) for size in sizes))
+    cropped_img = crop(im)
+    thumbs = []
+    for size in sizes:
+        thumb = cropped_img.copy()
+        thumb.thumbnail(size, Image.ANTIALIAS)
+        thumbs.append(thumb)
+    return thumbs, im.format
@@ -1,9 +1,12 @@
 from rest_framework import filters, generics
 from tutelary.mixins import APIPermissionRequiredMixin
+
+from core.pagination import PaginatedListMixin
 from . import mixins
 
 
 class ProjectResources(APIPermissionRequiredMixin,
+                       PaginatedListMixin,
                        mixins.ProjectResourceMixin,
                        generics.ListCreateAPIView):
     filter_backends = (filters.DjangoFilterBackend,
@@ -50,6 +53,7 @@ class ProjectResourcesDetail(APIPermissionRequiredMixin,
 
 
 class ProjectSpatialResources(APIPermissionRequiredMixin,
+                              PaginatedListMixin,
                               mixins.ProjectSpatialResourceMixin,
                               generics.ListAPIView):
 
@@ -3,10 +3,11 @@ from django.contrib.gis import forms as gisforms
 from django.utils.translation import ugettext as _
 from django.contrib.contenttypes.models import ContentType
 
-from jsonattrs.models import Schema, compose_schemas
-from jsonattrs.forms import form_field_from_name, AttributeModelForm
+from jsonattrs.forms import form_field_from_name
 
 from leaflet.forms.widgets import LeafletWidget
+from core.form_mixins import AttributeModelForm
+from core.schemas import get_attributes
 from core.util import ID_FIELD_LENGTH
 from party.models import Party, TenureRelationship, TenureRelationshipType
 from .models import SpatialUnit
@@ -59,7 +60,7 @@ class TenureRelationshipForm(forms.Form):
     def __init__(self, project, spatial_unit, schema_selectors=(),
                  *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['id'].widget = SelectPartyWidget(project.id)
+        self.fields['id'].widget = SelectPartyWidget(project)
         self.fields['party_type'].choices = (
             [('', _("Please select a party type"))] +
             list(Party.TYPE_CHOICES))
@@ -97,10 +98,7 @@ class TenureRelationshipForm(forms.Form):
     def create_model_fields(self, model, field_prefix, selectors,
                             new_item=False):
         content_type = ContentType.objects.get_for_model(model)
-        schemas = Schema.objects.lookup(
-            content_type=content_type, selectors=selectors
-        )
-        attrs, _, _ = compose_schemas(*schemas)
+        attrs, _, _ = get_attributes(content_type, selectors)
         for name, attr in attrs.items():
             fieldname = field_prefix + '::' + name
             atype = attr.attr_type
@@ -0,0 +1,16 @@
+from django.contrib.gis.db.models.functions import GeoFunc
+
+
+class SimplifyPreserveTopology(GeoFunc):
+    """Simplifies a geometry with the Douglas-Peucker algorithm, without
+    creating invalid geometries. ``tolerance`` is in the units of the
+    geometry's spatial reference system."""
+
+    function = 'ST_SimplifyPreserveTopology'
+
+    def __init__(self, expression, tolerance, **extra):
+        expressions = [
+            expression,
+            self._handle_param(tolerance, 'tolerance', (int, float)),
+        ]
+        super().__init__(*expressions, **extra)
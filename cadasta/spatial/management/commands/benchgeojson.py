@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import Benchmark, create_project_records, run_in_rollback
+
+from ...serializers import SpatialUnitGeoJsonSerializer, serialize_locations
+
+
+class Command(BaseCommand):
+    help = """Compares SpatialUnitGeoJsonSerializer with the bulk GeoJSON
+            serialization on generated projects. Nothing is written to
+            the database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records',
+                            nargs='+',
+                            type=int,
+                            dest='records',
+                            default=[50000],
+                            help="""Numbers of locations to serialize.""")
+
+    def run(self, count):
+        project = create_project_records(count)
+        locations = project.spatial_units.all()
+
+        with Benchmark('geojson serializer', count) as bench:
+            json.dumps(SpatialUnitGeoJsonSerializer(locations, many=True).data)
+        self.stdout.write(str(bench))
+
+        with Benchmark('bulk geojson', count) as bench:
+            serialize_locations(locations, project)
+        self.stdout.write(str(bench))
+
+    def handle(self, *args, **options):
+        for count in sorted(options['records']):
+            run_in_rollback(self.run, count)
@@ -0,0 +1,86 @@
+import math
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import Benchmark, BATCH_SIZE, run_in_rollback
+from core.util import random_id
+from organization.models import Organization, Project
+
+from ... import topology
+from ...models import SpatialUnit
+
+# Parcels are squares of PARCEL_SIZE degrees, laid out in blocks of
+# BLOCK_SIDE by BLOCK_SIDE parcels.
+PARCEL_SIZE = 0.001
+BLOCK_SIDE = 10
+
+
+def square(xmin, ymin, size):
+    return ('SRID=4326;POLYGON(({0} {1}, {2} {1}, {2} {3}, {0} {3}, '
+            '{0} {1}))'.format(xmin, ymin, xmin + size, ymin + size))
+
+
+class Command(BaseCommand):
+    help = """Compares checking 'is-contained-in' relationships one at a
+            time with the set-based checks of spatial.topology on
+            generated projects of parcels in blocks. Nothing is written
+            to the database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records',
+                            nargs='+',
+                            type=int,
+                            dest='records',
+                            default=[100000],
+                            help="""Numbers of parcels to check.""")
+
+    def create_parcels(self, count):
+        org = Organization.objects.create(name='Benchmark ' + random_id())
+        project = Project.objects.create(name='Benchmark', organization=org)
+
+        side = math.ceil(math.sqrt(count) / BLOCK_SIDE) * BLOCK_SIDE
+        block_size = PARCEL_SIZE * BLOCK_SIDE
+        blocks = {}
+        for bx in range(side // BLOCK_SIDE):
+            for by in range(side // BLOCK_SIDE):
+                blocks[bx, by] = SpatialUnit(
+                    id=random_id(), project=project, type='CB',
+                    geometry=square(bx * block_size, by * block_size,
+                                    block_size),
+                    attributes={})
+        SpatialUnit.objects.bulk_create(blocks.values(),
+                                        batch_size=BATCH_SIZE)
+
+        pairs = []
+        for i in range(count):
+            x, y = i % side, i // side
+            parcel = SpatialUnit(
+                id=random_id(), project=project, type='PA',
+                geometry=square(x * PARCEL_SIZE, y * PARCEL_SIZE,
+                                PARCEL_SIZE),
+                attributes={})
+            pairs.append((blocks[x // BLOCK_SIDE, y // BLOCK_SIDE], parcel))
+        SpatialUnit.objects.bulk_create([parcel for _, parcel in pairs],
+                                        batch_size=BATCH_SIZE)
+        return project, pairs
+
+    def run(self, count):
+        project, pairs = self.create_parcels(count)
+
+        with Benchmark('one query per relationship', count) as bench:
+            for block, parcel in pairs:
+                len(SpatialUnit.objects.filter(id=block.id).filter(
+                    geometry__contains=parcel.geometry))
+        self.stdout.write(str(bench))
+
+        with Benchmark('batch check', count) as bench:
+            topology.contained_pairs(pairs)
+        self.stdout.write(str(bench))
+
+        with Benchmark('project containment pairs', count) as bench:
+            topology.containment_pairs(project)
+        self.stdout.write(str(bench))
+
+    def handle(self, *args, **options):
+        for count in sorted(options['records']):
+            run_in_rollback(self.run, count)
@@ -14,6 +14,10 @@ SPATIAL_DELETE = _(
 SPATIAL_ADD_RESOURCE = _("You don't have permission to add resources "
                          "to this location.")
 
+INVALID_BBOX = _("bbox must be four numbers: west,south,east,north.")
+INVALID_SIMPLIFY = _("simplify must be a non-negative number.")
+INVALID_ZOOM = _("zoom must be a whole number between 0 and {max_zoom}.")
+
 SPATIAL_REL_LIST = _("You don't have permission to view location "
                      "relationships of this project.")
 SPATIAL_REL_CREATE = _("You don't have permission to add location "
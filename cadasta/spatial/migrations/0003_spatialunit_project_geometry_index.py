@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.postgres.operations import CreateExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spatial', '0002_auto_20160712_1513'),
+    ]
+
+    operations = [
+        CreateExtension('btree_gist'),
+        # GiST index on the project and the geometry, so that the spatial
+        # joins of spatial.topology only visit the locations of one
+        # project.
+        migrations.RunSQL(
+            'CREATE INDEX spatial_spatialunit_project_geometry '
+            'ON spatial_spatialunit USING gist (project_id, geometry)',
+            'DROP INDEX spatial_spatialunit_project_geometry',
+        ),
+    ]
@@ -5,15 +5,17 @@ from django.db import models
 from django.utils.translation import ugettext as _
 from django.dispatch import receiver
 from organization.models import Project
+from organization.statistics import record_change
 from party import managers
 from tutelary.decorators import permissioned_model
 from simple_history.models import HistoricalRecords
 from shapely.geometry import Point, Polygon, LineString
 from shapely.wkt import dumps
 
-from . import messages
+from . import messages, topology
 from .choices import TYPE_CHOICES
 from .exceptions import SpatialRelationshipError
+from .tiles import invalidate_tiles
 from resources.mixins import ResourceModelMixin
 from jsonattrs.fields import JSONAttributeField
 from jsonattrs.decorators import fix_model_for_attributes
@@ -146,37 +148,57 @@ def check_extent(sender, instance, **kwargs):
         reassign_spatial_geometry(instance)
 
 
+@receiver(models.signals.post_save, sender=SpatialUnit)
+@receiver(models.signals.post_delete, sender=SpatialUnit)
+def invalidate_project_tiles(sender, instance, **kwargs):
+    invalidate_tiles(instance.project_id)
+
+
+@receiver(models.signals.post_save, sender=SpatialUnit)
+def location_saved(sender, instance, created, **kwargs):
+    if created:
+        extent = None
+        if instance.geometry is not None:
+            extent = instance.geometry.extent
+        record_change(instance.project_id, num_locations=1, extent=extent)
+    else:
+        # The geometry may have been moved away from the project's extent.
+        record_change(instance.project_id, extent_stale=True)
+
+
+@receiver(models.signals.post_delete, sender=SpatialUnit)
+def location_deleted(sender, instance, **kwargs):
+    record_change(instance.project_id, num_locations=-1, extent_stale=True)
+
+
 class SpatialRelationshipManager(managers.BaseRelationshipManager):
     """Check conditions based on spatial unit type before creating
     object. If conditions aren't met, exceptions are raised.
 
     """
 
+    def check_containment(self, relationships):
+        """Checks that the parent location of each 'is-contained-in'
+        relationship in ``relationships``, given as dicts of their fields,
+        contains the other location, with one query for all of them."""
+        # The child is checked with its geometry as it is in memory, so
+        # it may be unsaved or have unsaved changes.
+        pairs = [
+            (r['su1'], r['su2']) for r in relationships
+            if (r.get('type') == 'C' and
+                r['su1'].geometry is not None and
+                r['su2'].geometry is not None and
+                r['su1'].geometry.geom_type == 'Polygon')
+        ]
+        if pairs and len(topology.contained_pairs(pairs)) < len(pairs):
+            raise SpatialRelationshipError(
+                """That selected location is not geographically
+                contained within the parent location""")
+
     def create(self, *args, **kwargs):
-        su1 = kwargs['su1']
-        su2 = kwargs['su2']
-        project = kwargs['project']
-        if (su1.geometry is not None and
-                su2.geometry is not None):
-
-            if (kwargs['type'] == 'C' and
-                    su1.geometry.geom_type == 'Polygon'):
-                result = SpatialUnit.objects.filter(
-                    id=su1.id
-                ).filter(
-                    geometry__contains=su2.geometry
-                )
-
-                if len(result) != 0:
-                    self.check_project_constraints(
-                        project=project, left=su1, right=su2)
-                    return super().create(**kwargs)
-                else:
-                    raise SpatialRelationshipError(
-                        """That selected location is not geographically
-                        contained within the parent location""")
+        self.check_containment([kwargs])
         self.check_project_constraints(
-            project=project, left=su1, right=su2)
+            project=kwargs['project'], left=kwargs['su1'], right=kwargs['su2'])
         return super().create(**kwargs)
 
 
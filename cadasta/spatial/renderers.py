@@ -0,0 +1,25 @@
+from rest_framework import renderers
+
+
+class GeoJSONTileRenderer(renderers.JSONRenderer):
+    """
+    Renderer for GeoJSON tiles, which are already serialized when they
+    are read from the tile cache.
+    """
+
+    format = 'geojson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MVTRenderer(GeoJSONTileRenderer):
+    """
+    Renderer for Mapbox vector tiles. Error responses are rendered as
+    JSON.
+    """
+
+    media_type = 'application/vnd.mapbox-vector-tile'
+    format = 'mvt'
@@ -1,8 +1,12 @@
+import json
+from django.contrib.gis.db.models.functions import AsGeoJSON
 from django.utils.translation import ugettext as _
 from django.core.urlresolvers import reverse
 from rest_framework import serializers
 from rest_framework_gis import serializers as geo_serializers
 
+from .choices import TYPE_CHOICES
+from .functions import SimplifyPreserveTopology
 from .models import SpatialUnit, SpatialRelationship
 from core.serializers import DetailSerializer, FieldSelectorSerializer
 from organization.serializers import NestedProjectSerializer
@@ -21,12 +25,65 @@ class SpatialUnitSerializer(DetailSerializer, FieldSelectorSerializer,
         read_only_fields = ('id', 'project',)
         detail_only_fields = ('project',)
 
+    def to_representation(self, instance):
+        # The list API may replace geometries by simplified ones, see
+        # SpatialUnitList.get_queryset.
+        if hasattr(instance, 'simplified_geometry'):
+            instance.geometry = instance.simplified_geometry
+        return super().to_representation(instance)
+
     def create(self, validated_data):
         project = self.context['project']
         return SpatialUnit.objects.create(
             project_id=project.id, **validated_data)
 
 
+TYPE_LABELS = dict(TYPE_CHOICES)
+
+URL_PLACEHOLDER = 'location-id'
+
+
+def location_url_template(project):
+    """Returns a format string for the detail URLs of the locations of
+    ``project``, which only resolves the URL once."""
+    url = reverse(
+        'locations:detail',
+        kwargs={'organization': project.organization.slug,
+                'project': project.slug,
+                'location': URL_PLACEHOLDER})
+    prefix, suffix = url.rsplit(URL_PLACEHOLDER, 1)
+    return prefix + '{}' + suffix
+
+
+def serialize_locations(queryset, project, simplify=None):
+    """Returns the GeoJSON FeatureCollection of SpatialUnitGeoJsonSerializer
+    for the locations of ``project`` in ``queryset``, as a JSON string.
+    Geometries are simplified with the tolerance ``simplify`` (in degrees)
+    if it is given.
+
+    Geometries are serialized by the database and the rows are read with
+    a single ``values_list()`` query, so no model instances are created.
+    """
+    url = location_url_template(project)
+    geometry = 'geometry'
+    if simplify:
+        geometry = SimplifyPreserveTopology(geometry, simplify)
+    locations = queryset.annotate(
+        geojson=AsGeoJSON(geometry)
+    ).values_list('id', 'type', 'geojson')
+
+    features = ', '.join(
+        '{{"type": "Feature", "id": {}, "geometry": {}, '
+        '"properties": {{"type": {}, "url": {}}}}}'.format(
+            json.dumps(id), geometry or 'null',
+            json.dumps(str(TYPE_LABELS.get(type, type))),
+            json.dumps(url.format(id)))
+        for id, type, geometry in locations.iterator()
+    )
+    return '{{"type": "FeatureCollection", "features": [{}]}}'.format(
+        features)
+
+
 class SpatialUnitGeoJsonSerializer(geo_serializers.GeoFeatureModelSerializer):
     url = serializers.SerializerMethodField()
     type = serializers.SerializerMethodField()
@@ -37,12 +94,15 @@ class SpatialUnitGeoJsonSerializer(geo_serializers.GeoFeatureModelSerializer):
         fields = ('id', 'type', 'url')
 
     def get_url(self, location):
-        project = location.project
-        return reverse(
-            'locations:detail',
-            kwargs={'organization': project.organization.slug,
-                    'project': project.slug,
-                    'location': location.id})
+        # With many=True all locations are serialized by the same child
+        # serializer, so each project's URL is only resolved once.
+        if not hasattr(self, '_url_templates'):
+            self._url_templates = {}
+        template = self._url_templates.get(location.project_id)
+        if template is None:
+            template = location_url_template(location.project)
+            self._url_templates[location.project_id] = template
+        return template.format(location.id)
 
     def get_type(self, location):
         return location.get_type_display()
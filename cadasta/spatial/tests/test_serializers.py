@@ -1,3 +1,4 @@
+import json
 import pytest
 from django.test import TestCase
 from rest_framework.serializers import ValidationError
@@ -130,3 +131,55 @@ class SpatialUnitGeoJsonSerializerTest(TestCase):
         location = SpatialUnitFactory.build(type='CB')
         serializer = serializers.SpatialUnitGeoJsonSerializer(location)
         assert serializer.get_type(location) == 'Community boundary'
+
+    def test_get_url_resolves_project_once(self):
+        project = ProjectFactory.create()
+        SpatialUnitFactory.create_batch(3, project=project)
+        serializer = serializers.SpatialUnitGeoJsonSerializer(
+            project.spatial_units.all(), many=True)
+
+        # One query for the locations, and one each for the project and
+        # its organization.
+        with self.assertNumQueries(3):
+            features = serializer.data['features']
+        assert len(features) == 3
+
+
+class SerializeLocationsTest(TestCase):
+    def test_location_url_template(self):
+        project = ProjectFactory.create()
+        template = serializers.location_url_template(project)
+        assert template.format('abc123') == (
+            '/organizations/{}/projects/{}/records/locations/abc123/'.format(
+                project.organization.slug, project.slug))
+
+    def test_serialize_locations(self):
+        project = ProjectFactory.create()
+        SpatialUnitFactory.create(project=project, type='PA',
+                                  geometry='SRID=4326;POINT (1 1)')
+        SpatialUnitFactory.create(project=project, type='CB')
+        locations = project.spatial_units.order_by('id')
+
+        with self.assertNumQueries(1):
+            data = json.loads(
+                serializers.serialize_locations(locations, project))
+
+        expected = serializers.SpatialUnitGeoJsonSerializer(
+            locations, many=True).data
+        assert data['type'] == 'FeatureCollection'
+        assert len(data['features']) == 2
+        for feature, expected in zip(data['features'],
+                                     expected['features']):
+            assert feature['id'] == expected['id']
+            assert feature['properties'] == dict(expected['properties'])
+            if expected['geometry'] is None:
+                assert feature['geometry'] is None
+            else:
+                assert feature['geometry']['coordinates'] == list(
+                    expected['geometry']['coordinates'])
+
+    def test_serialize_no_locations(self):
+        project = ProjectFactory.create()
+        data = json.loads(serializers.serialize_locations(
+            project.spatial_units.all(), project))
+        assert data == {'type': 'FeatureCollection', 'features': []}
@@ -0,0 +1,132 @@
+import json
+import math
+import pytest
+
+from django.db import connection
+from django.test import TestCase
+from core.tests.utils.cases import UserTestCase
+from organization.tests.factories import ProjectFactory
+
+from .factories import SpatialUnitFactory
+from .. import tiles
+
+
+class TileBoundsTest(TestCase):
+    def test_valid_tile(self):
+        assert tiles.valid_tile(0, 0, 0) is True
+        assert tiles.valid_tile(2, 3, 3) is True
+        assert tiles.valid_tile(2, 4, 0) is False
+        assert tiles.valid_tile(2, 0, 4) is False
+        assert tiles.valid_tile(99, 0, 0) is False
+
+    def test_mercator_bounds(self):
+        extent = tiles.MERCATOR_EXTENT
+        assert tiles.mercator_bounds(0, 0, 0) == (
+            -extent, -extent, extent, extent)
+        assert tiles.mercator_bounds(1, 0, 0) == (-extent, 0, 0, extent)
+        assert tiles.mercator_bounds(1, 1, 1) == (0, -extent, extent, 0)
+
+    def test_lonlat_bounds(self):
+        west, south, east, north = tiles.lonlat_bounds(0, 0, 0)
+        assert (west, east) == (-180, 180)
+        assert round(south, 4) == -85.0511
+        assert round(north, 4) == 85.0511
+
+        west, south, east, north = tiles.lonlat_bounds(1, 1, 0)
+        assert (west, east) == (0, 180)
+        assert round(south, 10) == 0
+
+
+class TilesTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create()
+        self.east = SpatialUnitFactory.create(
+            project=self.project, type='PA',
+            geometry='SRID=4326;POINT (1 1)')
+        self.west = SpatialUnitFactory.create(
+            project=self.project, type='BU',
+            geometry='SRID=4326;POINT (-100 40)')
+        SpatialUnitFactory.create(geometry='SRID=4326;POINT (1 1)')
+
+    def test_render_geojson(self):
+        data = json.loads(
+            tiles.render_geojson(self.project, 1, 1, 0).decode())
+        assert data['type'] == 'FeatureCollection'
+        assert len(data['features']) == 1
+
+        feature = data['features'][0]
+        assert feature['id'] == self.east.id
+        assert feature['geometry'] == {'type': 'Point',
+                                       'coordinates': [1, 1]}
+        assert feature['properties'] == {
+            'type': 'Parcel',
+            'url': '/organizations/{}/projects/{}/records/locations/{}/'
+                   ''.format(self.project.organization.slug,
+                             self.project.slug, self.east.id)
+        }
+
+        data = json.loads(
+            tiles.render_geojson(self.project, 0, 0, 0).decode())
+        assert (sorted(f['id'] for f in data['features']) ==
+                sorted([self.east.id, self.west.id]))
+
+    def test_render_geojson_simplifies_geometries(self):
+        # A line with a bump much smaller than a pixel at zoom 0, but
+        # larger than one at GEOJSON_FULL_ZOOM.
+        line = SpatialUnitFactory.create(
+            project=self.project,
+            geometry='SRID=4326;LINESTRING (10 10, 10.0001 10.00001, '
+                     '10.0002 10)')
+
+        def coordinates(z):
+            n = 2 ** z
+            x = int((10.0001 + 180) / 360 * n)
+            y = int((1 - math.asinh(math.tan(math.radians(10))) / math.pi) /
+                    2 * n)
+            data = json.loads(
+                tiles.render_geojson(self.project, z, x, y).decode())
+            return next(f['geometry']['coordinates']
+                        for f in data['features'] if f['id'] == line.id)
+
+        assert len(coordinates(0)) == 2
+        assert len(coordinates(tiles.GEOJSON_FULL_ZOOM)) == 3
+        assert tiles.simplify_tolerance(tiles.GEOJSON_FULL_ZOOM) is None
+
+    def test_render_mvt(self):
+        if not tiles.mvt_supported():
+            pytest.skip("ST_AsMVT requires PostGIS 2.4")
+        assert len(tiles.render_mvt(self.project, 1, 1, 0)) > 0
+        assert tiles.render_mvt(self.project, 1, 1, 1) == b''
+
+    def test_get_tile_is_cached(self):
+        tile = tiles.get_tile(self.project, 1, 1, 0, 'geojson')
+        with self.assertNumQueries(0):
+            assert tiles.get_tile(self.project, 1, 1, 0, 'geojson') == tile
+
+    def test_save_invalidates_tiles(self):
+        tiles.get_tile(self.project, 1, 1, 0, 'geojson')
+        SpatialUnitFactory.create(project=self.project,
+                                  geometry='SRID=4326;POINT (2 2)')
+        data = json.loads(
+            tiles.get_tile(self.project, 1, 1, 0, 'geojson').decode())
+        assert len(data['features']) == 2
+
+    def test_delete_invalidates_tiles(self):
+        tiles.get_tile(self.project, 1, 1, 0, 'geojson')
+        self.east.delete()
+        data = json.loads(
+            tiles.get_tile(self.project, 1, 1, 0, 'geojson').decode())
+        assert data['features'] == []
+
+    def test_invalidate_tiles_on_commit(self):
+        tiles.invalidate_tiles(self.project.id)
+        version = tiles.get_version(self.project.id)
+        # Test cases never commit; run the callback like a commit would.
+        connection.run_on_commit[-1][1]()
+        assert tiles.get_version(self.project.id) != version
+
+    def test_get_bounds(self):
+        assert json.loads(tiles.get_bounds(self.project)) == [
+            [1, -100], [40, 1]]
+        assert tiles.get_bounds(ProjectFactory.create()) == 'null'
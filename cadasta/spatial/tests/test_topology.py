@@ -0,0 +1,99 @@
+import pytest
+from django.test import TestCase
+
+from core.tests.utils.cases import UserTestCase
+from organization.tests.factories import ProjectFactory
+
+from .factories import SpatialUnitFactory
+from .. import topology
+from ..exceptions import SpatialRelationshipError
+from ..models import SpatialRelationship
+
+
+def square(xmin, ymin, xmax, ymax):
+    return ('SRID=4326;POLYGON(({0} {1}, {2} {1}, {2} {3}, {0} {3}, '
+            '{0} {1}))'.format(xmin, ymin, xmax, ymax))
+
+
+class TopologyTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create()
+        self.block = SpatialUnitFactory.create(
+            project=self.project, type='CB', geometry=square(0, 0, 10, 10))
+        self.parcel = SpatialUnitFactory.create(
+            project=self.project, geometry=square(1, 1, 2, 2))
+        self.building = SpatialUnitFactory.create(
+            project=self.project, type='BU',
+            geometry='SRID=4326;POINT (1.5 1.5)')
+        self.outside = SpatialUnitFactory.create(
+            project=self.project, geometry=square(20, 20, 21, 21))
+        # Locations of other projects are never paired.
+        SpatialUnitFactory.create(geometry=square(1, 1, 2, 2))
+
+    def test_containment_pairs(self):
+        pairs = topology.containment_pairs(self.project)
+        assert sorted(pairs) == sorted([
+            (self.block.id, self.parcel.id),
+            (self.block.id, self.building.id),
+            (self.parcel.id, self.building.id),
+        ])
+
+    def test_containment_pairs_of_some_locations(self):
+        pairs = topology.containment_pairs(self.project,
+                                           children=[self.building.id])
+        assert sorted(pairs) == sorted([
+            (self.block.id, self.building.id),
+            (self.parcel.id, self.building.id),
+        ])
+        assert topology.containment_pairs(
+            self.project, parents=[self.outside.id]) == []
+
+    def test_contained_pairs(self):
+        contained = topology.contained_pairs([
+            (self.block, self.parcel),
+            (self.parcel, self.block),
+            (self.block, self.outside),
+        ])
+        assert contained == {0}
+        assert topology.contained_pairs([]) == set()
+
+    def test_contained_pairs_of_unsaved_children(self):
+        unsaved = SpatialUnitFactory.build(project=self.project,
+                                           geometry=square(3, 3, 4, 4))
+        self.outside.geometry = square(5, 5, 6, 6)
+        self.parcel.geometry = square(20, 20, 21, 21)
+        contained = topology.contained_pairs([
+            (self.block, unsaved),
+            (self.block, self.outside),
+            (self.block, self.parcel),
+        ])
+        assert contained == {0, 1}
+
+    def test_suggest_parents_and_children(self):
+        assert sorted(topology.suggest_parents(self.building)) == sorted(
+            [self.block.id, self.parcel.id])
+        assert sorted(topology.suggest_children(self.block)) == sorted(
+            [self.parcel.id, self.building.id])
+        assert topology.suggest_children(self.building) == []
+
+    def test_check_containment_of_batch(self):
+        relationship = {'project': self.project, 'type': 'C'}
+        with self.assertNumQueries(1):
+            SpatialRelationship.objects.check_containment([
+                dict(relationship, su1=self.block, su2=self.parcel),
+                dict(relationship, su1=self.parcel, su2=self.building),
+                # Not checked, only polygons contain other locations.
+                dict(relationship, su1=self.building, su2=self.outside),
+            ])
+
+        with pytest.raises(SpatialRelationshipError):
+            SpatialRelationship.objects.check_containment([
+                dict(relationship, su1=self.block, su2=self.parcel),
+                dict(relationship, su1=self.block, su2=self.outside),
+            ])
+
+        # The unsaved geometry of the child is checked.
+        self.outside.geometry = square(5, 5, 6, 6)
+        SpatialRelationship.objects.check_containment([
+            dict(relationship, su1=self.block, su2=self.outside)])
@@ -26,6 +26,33 @@ class SpatialUrlTest(TestCase):
         assert resolved.kwargs['organization'] == 'habitat'
         assert resolved.kwargs['project'] == '123abc'
 
+    def test_project_spatial_unit_tiles(self):
+        actual = reverse(
+            version_ns('spatial:tiles'),
+            kwargs={
+                'organization': 'habitat',
+                'project': '123abc',
+                'z': '3',
+                'x': '4',
+                'y': '5',
+                'format': 'mvt',
+            }
+        )
+        expected = version_url(
+            '/organizations/habitat/projects/123abc/spatial/tiles/3/4/5.mvt')
+        assert actual == expected
+
+        resolved = resolve(version_url(
+            '/organizations/habitat/projects/123abc/'
+            'spatial/tiles/3/4/5.geojson'))
+        assert resolved.func.__name__ == api.SpatialUnitTiles.__name__
+        assert resolved.kwargs['organization'] == 'habitat'
+        assert resolved.kwargs['project'] == '123abc'
+        assert resolved.kwargs['z'] == '3'
+        assert resolved.kwargs['x'] == '4'
+        assert resolved.kwargs['y'] == '5'
+        assert resolved.kwargs['format'] == 'geojson'
+
     def test_project_spatial_unit_detail(self):
         actual = reverse(
             version_ns('spatial:detail'),
@@ -1,6 +1,9 @@
 import json
+from urllib.parse import parse_qs, urlparse
+
 from django.test import TestCase
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APIRequestFactory, force_authenticate
 from tutelary.models import Policy, assign_user_policies
 from skivvy import APITestCase
 
@@ -60,17 +63,43 @@ class SpatialUnitListAPITest(APITestCase, UserTestCase, TestCase):
         extra_record = SpatialUnitFactory.create()
         response = self.request(user=self.user)
         assert response.status_code == 200
-        assert len(response.content) == 2
+        assert len(response.content['features']) == 2
         assert extra_record.id not in (
             [u['properties']['id'] for u in response.content['features']])
 
+    def test_paginated_list(self):
+        SpatialUnitFactory.create_batch(3, project=self.prj)
+        response = self.request(user=self.user, get_data={'page_size': 2})
+        assert response.status_code == 200
+        assert response.content['type'] == 'FeatureCollection'
+        assert len(response.content['features']) == 2
+
+        query = parse_qs(urlparse(response.content['next']).query)
+        response = self.request(user=self.user,
+                                get_data={'page_size': 2,
+                                          'cursor': query['cursor'][0]})
+        assert response.status_code == 200
+        assert len(response.content['features']) == 1
+        assert response.content['next'] is None
+
+    def test_unpaginated_list(self):
+        SpatialUnitFactory.create_batch(3, project=self.prj)
+        request = APIRequestFactory().get('/', {'paginate': 'false'})
+        force_authenticate(request, user=self.user)
+        response = self.view_class.as_view()(
+            request, **self.setup_url_kwargs())
+        assert response.status_code == 200
+        content = json.loads(b''.join(response.streaming_content).decode())
+        assert content['type'] == 'FeatureCollection'
+        assert len(content['features']) == 3
+
     def test_full_list_with_unauthorized_user(self):
         SpatialUnitFactory.create_batch(2, project=self.prj)
         extra_record = SpatialUnitFactory.create()
 
         response = self.request()
         assert response.status_code == 200
-        assert len(response.content) == 2
+        assert len(response.content['features']) == 2
         assert extra_record.id not in (
             [u['properties']['id'] for u in response.content['features']])
 
@@ -106,6 +135,68 @@ class SpatialUnitListAPITest(APITestCase, UserTestCase, TestCase):
         assert response.status_code == 200
         assert len(response.content['features']) == 1
 
+    def test_bbox_filter(self):
+        inside = SpatialUnitFactory.create(
+            project=self.prj, geometry='SRID=4326;POINT (1 1)')
+        SpatialUnitFactory.create(
+            project=self.prj, geometry='SRID=4326;POINT (10 10)')
+        crossing = SpatialUnitFactory.create(
+            project=self.prj,
+            geometry='SRID=4326;LINESTRING (-5 1, 5 1)')
+        response = self.request(user=self.user,
+                                get_data={'bbox': '0,0,2,2'})
+        assert response.status_code == 200
+        ids = [su['properties']['id'] for su in response.content['features']]
+        assert sorted(ids) == sorted([inside.id, crossing.id])
+
+    def test_invalid_bbox(self):
+        response = self.request(user=self.user, get_data={'bbox': '0,0,2'})
+        assert response.status_code == 400
+        assert 'bbox' in response.content
+
+    def test_simplify(self):
+        coords = ', '.join('{} {}'.format(i / 100, (i % 2) / 100000)
+                           for i in range(101))
+        SpatialUnitFactory.create(
+            project=self.prj,
+            geometry='SRID=4326;LINESTRING ({})'.format(coords))
+
+        response = self.request(user=self.user)
+        geometry = response.content['features'][0]['geometry']
+        assert len(geometry['coordinates']) == 101
+
+        response = self.request(user=self.user,
+                                get_data={'simplify': '0.001'})
+        assert response.status_code == 200
+        geometry = response.content['features'][0]['geometry']
+        assert geometry['coordinates'] == [[0, 0], [1, 0]]
+
+    def test_zoom(self):
+        coords = ', '.join('{} {}'.format(i / 100, (i % 2) / 100000)
+                           for i in range(101))
+        SpatialUnitFactory.create(
+            project=self.prj,
+            geometry='SRID=4326;LINESTRING ({})'.format(coords))
+
+        response = self.request(user=self.user, get_data={'zoom': '10'})
+        assert response.status_code == 200
+        geometry = response.content['features'][0]['geometry']
+        assert geometry['coordinates'] == [[0, 0], [1, 0]]
+
+        response = self.request(user=self.user, get_data={'zoom': '22'})
+        geometry = response.content['features'][0]['geometry']
+        assert len(geometry['coordinates']) == 101
+
+    def test_invalid_simplify_and_zoom(self):
+        response = self.request(user=self.user,
+                                get_data={'simplify': '-1'})
+        assert response.status_code == 400
+        assert 'simplify' in response.content
+
+        response = self.request(user=self.user, get_data={'zoom': 'abc'})
+        assert response.status_code == 400
+        assert 'zoom' in response.content
+
     def test_get_full_list_organization_does_not_exist(self):
         response = self.request(user=self.user,
                                 url_kwargs={'organization': 'some-org'})
@@ -126,7 +217,7 @@ class SpatialUnitListAPITest(APITestCase, UserTestCase, TestCase):
         extra_record = SpatialUnitFactory.create()
         response = self.request(user=self.user)
         assert response.status_code == 200
-        assert len(response.content) == 2
+        assert len(response.content['features']) == 2
         assert extra_record.id not in (
             [u['properties']['id'] for u in response.content['features']])
 
@@ -175,6 +266,62 @@ class SpatialUnitListAPITest(APITestCase, UserTestCase, TestCase):
         assert response.status_code == 200
 
 
+class SpatialUnitTilesAPITest(APITestCase, UserTestCase, TestCase):
+    view_class = api.SpatialUnitTiles
+
+    def setup_models(self):
+        self.user = UserFactory.create()
+        assign_policies(self.user)
+        self.prj = ProjectFactory.create(slug='test-project', access='public')
+        self.su = SpatialUnitFactory.create(
+            project=self.prj, geometry='SRID=4326;POINT (1 1)')
+        SpatialUnitFactory.create(geometry='SRID=4326;POINT (1 1)')
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.prj.organization.slug,
+            'project': self.prj.slug,
+            'z': '1',
+            'x': '1',
+            'y': '0',
+            'format': 'geojson'
+        }
+
+    def test_get_tile(self):
+        response = self.request(user=self.user)
+        assert response.status_code == 200
+        assert [f['id'] for f in response.content['features']] == [
+            self.su.id]
+
+    def test_get_empty_tile(self):
+        response = self.request(user=self.user, url_kwargs={'y': '1'})
+        assert response.status_code == 200
+        assert response.content['features'] == []
+
+    def test_get_tile_with_unauthorized_user(self):
+        response = self.request()
+        assert response.status_code == 200
+        assert len(response.content['features']) == 1
+
+    def test_get_invalid_tile(self):
+        response = self.request(user=self.user, url_kwargs={'x': '2'})
+        assert response.status_code == 404
+
+    def test_get_tile_project_does_not_exist(self):
+        response = self.request(user=self.user,
+                                url_kwargs={'project': 'some-prj'})
+        assert response.status_code == 404
+        assert response.content['detail'] == "Project not found."
+
+    def test_get_private_tile_with_unauthorized_user(self):
+        self.prj.access = 'private'
+        self.prj.save()
+
+        response = self.request()
+        assert response.status_code == 403
+        assert response.content['detail'] == PermissionDenied.default_detail
+
+
 class SpatialUnitCreateAPITest(APITestCase, UserTestCase, TestCase):
     view_class = api.SpatialUnitList
 
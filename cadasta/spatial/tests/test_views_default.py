@@ -12,6 +12,7 @@ from jsonattrs.models import Attribute, AttributeType, Schema
 from skivvy import ViewTestCase
 
 from accounts.tests.factories import UserFactory
+from organization import pages
 from organization.tests.factories import ProjectFactory
 from core.tests.utils.cases import UserTestCase
 from core.tests.utils.files import make_dirs  # noqa
@@ -25,7 +26,6 @@ from .factories import SpatialUnitFactory
 from ..views import default
 from .. import forms
 from ..models import SpatialUnit
-from ..serializers import SpatialUnitGeoJsonSerializer
 
 
 def assign_policies(user):
@@ -65,12 +65,12 @@ class LocationsListTest(ViewTestCase, UserTestCase, TestCase):
         SpatialUnitFactory.create()
 
     def setup_template_context(self):
-        geojson = json.dumps(
-            SpatialUnitGeoJsonSerializer(self.locations, many=True).data)
         return {
             'object': self.project,
             'object_list': self.locations,
-            'geojson': geojson
+            'locations_bounds': 'null',
+            'map_version': pages.get_project_version(self.project.id),
+            'page_cache_timeout': settings.PAGE_CACHE_TIMEOUT
         }
 
     def setup_url_kwargs(self):
@@ -148,8 +148,7 @@ class LocationAddTest(ViewTestCase, UserTestCase, TestCase):
                      'value': self.project.current_questionnaire,
                      'selector': self.project.current_questionnaire}
                 )
-            ),
-            'geojson': '{"type": "FeatureCollection", "features": []}'
+            )
         }
 
     def setup_url_kwargs(self):
@@ -241,7 +240,6 @@ class LocationDetailTest(ViewTestCase, UserTestCase, TestCase):
         return {
             'object': self.project,
             'location': self.location,
-            'geojson': '{"type": "FeatureCollection", "features": []}',
             'attributes': (('Test field', 'test', ), )
         }
 
@@ -318,8 +316,7 @@ class LocationEditTest(ViewTestCase, UserTestCase, TestCase):
     def setup_template_context(self):
         return {'object': self.project,
                 'location': self.location,
-                'form': forms.LocationForm(instance=self.location),
-                'geojson': '{"type": "FeatureCollection", "features": []}'}
+                'form': forms.LocationForm(instance=self.location)}
 
     def setup_url_kwargs(self):
         return {
@@ -400,8 +397,7 @@ class LocationDelete(ViewTestCase, UserTestCase, TestCase):
 
     def setup_template_context(self):
         return {'object': self.project,
-                'location': self.location,
-                'geojson': '{"type": "FeatureCollection", "features": []}'}
+                'location': self.location}
 
     def setup_url_kwargs(self):
         return {
@@ -492,8 +488,7 @@ class LocationResourceAddTest(ViewTestCase, UserTestCase, TestCase):
                                           project_id=self.project.id)
         return {'object': self.project,
                 'location': self.location,
-                'form': form,
-                'geojson': '{"type": "FeatureCollection", "features": []}'}
+                'form': form}
 
     def setup_url_kwargs(self):
         return {
@@ -591,8 +586,7 @@ class LocationResourceNewTest(ViewTestCase, UserTestCase, TestCase):
                             project_id=self.project.id)
         return {'object': self.project,
                 'location': self.location,
-                'form': form,
-                'geojson': '{"type": "FeatureCollection", "features": []}'}
+                'form': form}
 
     def setup_post_data(self):
         path = os.path.dirname(settings.BASE_DIR)
@@ -728,8 +722,6 @@ class TenureRelationshipAddTest(ViewTestCase, UserTestCase, TestCase):
                     'new_entity': not self.project.parties.exists(),
                 },
             ),
-            'geojson': json.dumps(SpatialUnitGeoJsonSerializer(
-                [self.spatial_unit], many=True).data),
         }
         # return {
         #     'object': self.project,
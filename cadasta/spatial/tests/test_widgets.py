@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.test import TestCase
 from organization.tests.factories import ProjectFactory
 from party.tests.factories import PartyFactory
@@ -11,14 +12,24 @@ class SelectPartyWidgetTest(TestCase):
         party_2 = PartyFactory.create(project=project)
 
         widget = SelectPartyWidget(project=project)
-        rendered = widget.render(name='name', value='value')
-        assert ('<select id="party-select" name="name">' in rendered)
+        rendered = widget.render(name='name', value=party_1.id)
+        url = '/api/v1/organizations/{}/projects/{}/parties/search/'.format(
+            project.organization.slug, project.slug)
+        assert ('<select id="party-select" name="name" '
+                'data-url="{}" data-limit="{}">'.format(
+                    url, settings.PARTY_SEARCH_LIMIT) in rendered)
         assert ('<option value="' + party_1.id + '" data-type="'
-                '' + party_1.get_type_display() + '">' + party_1.name + ''
-                '</option>' in rendered)
-        assert ('<option value="' + party_2.id + '" data-type="'
-                '' + party_2.get_type_display() + '">' + party_2.name + ''
-                '</option>' in rendered)
+                '' + party_1.get_type_display() + '" selected="selected">'
+                '' + party_1.name + '</option>' in rendered)
+        assert party_2.id not in rendered
+
+    def test_render_no_value(self):
+        project = ProjectFactory.create()
+        PartyFactory.create(project=project)
+
+        widget = SelectPartyWidget(project=project)
+        rendered = widget.render(name='name', value=None)
+        assert rendered.count('<option') == 1
 
 
 class NewEntityWidgetTest(TestCase):
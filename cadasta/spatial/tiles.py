@@ -0,0 +1,150 @@
+import json
+import math
+
+from django.conf import settings
+from django.contrib.gis.db.models import Extent
+from django.contrib.gis.geos import Polygon
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from core.cache import get_version as get_cache_version, increment_version
+
+# Half the width of the world in Web Mercator (EPSG:3857) metres.
+MERCATOR_EXTENT = 20037508.342789244
+
+# Size of the MVT tile coordinate space and of the buffer around each
+# tile, in tile coordinates.
+MVT_EXTENT = 4096
+MVT_BUFFER = 64
+
+# GeoJSON tiles below this zoom level hold geometries simplified to the
+# size of a pixel; from it on they hold complete geometries, which map
+# pages reuse when zoomed in further (see loadLocationTiles in
+# map_utils.js).
+GEOJSON_FULL_ZOOM = 16
+
+MVT_SQL = """
+    SELECT ST_AsMVT(tile, 'locations', {extent}, 'geom') FROM (
+        SELECT id, type, ST_AsMVTGeom(
+            ST_Transform(geometry, 3857),
+            ST_MakeEnvelope(%s, %s, %s, %s, 3857),
+            {extent}, {buffer}, true) AS geom
+        FROM {table}
+        WHERE project_id = %s AND geometry && ST_MakeEnvelope(
+            %s, %s, %s, %s, 4326)
+    ) AS tile WHERE geom IS NOT NULL
+"""
+
+_mvt_supported = None
+
+
+def valid_tile(z, x, y):
+    return (0 <= z <= settings.TILE_MAX_ZOOM and
+            0 <= x < 2 ** z and 0 <= y < 2 ** z)
+
+
+def mercator_bounds(z, x, y):
+    size = 2 * MERCATOR_EXTENT / 2 ** z
+    xmin = -MERCATOR_EXTENT + x * size
+    ymax = MERCATOR_EXTENT - y * size
+    return xmin, ymax - size, xmin + size, ymax
+
+
+def lonlat_bounds(z, x, y):
+    n = 2 ** z
+
+    def lat(y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+    return x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y)
+
+
+def mvt_supported():
+    """ST_AsMVT was added in PostGIS 2.4."""
+    global _mvt_supported
+    if _mvt_supported is None:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT postgis_lib_version()')
+            version = cursor.fetchone()[0]
+        _mvt_supported = (
+            tuple(int(v) for v in version.split('.')[:2]) >= (2, 4))
+    return _mvt_supported
+
+
+def render_mvt(project, z, x, y):
+    sql = MVT_SQL.format(extent=MVT_EXTENT, buffer=MVT_BUFFER,
+                         table=project.spatial_units.model._meta.db_table)
+    params = (mercator_bounds(z, x, y) + (project.id,) +
+              lonlat_bounds(z, x, y))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return bytes(cursor.fetchone()[0])
+
+
+def simplify_tolerance(z):
+    """Returns the size of a 256 pixel tile's pixel at zoom ``z`` in
+    degrees, or ``None`` from GEOJSON_FULL_ZOOM on."""
+    if z >= GEOJSON_FULL_ZOOM:
+        return None
+    return 360 / (256 * 2 ** z)
+
+
+def render_geojson(project, z, x, y):
+    # The serializers import the models, which import this module.
+    from .serializers import serialize_locations
+
+    envelope = Polygon.from_bbox(lonlat_bounds(z, x, y))
+    envelope.srid = 4326
+    locations = project.spatial_units.filter(geometry__bboverlaps=envelope)
+    return serialize_locations(locations, project,
+                               simplify=simplify_tolerance(z)).encode()
+
+
+def version_key(project_id):
+    return 'spatial.tiles.version:{}'.format(project_id)
+
+
+def get_version(project_id):
+    return get_cache_version(version_key(project_id))
+
+
+def invalidate_tiles(project_id):
+    key = version_key(project_id)
+    increment_version(key)
+    # Tiles rendered before the change is committed still show the old
+    # data; the version is changed again so that they are not used.
+    transaction.on_commit(lambda: increment_version(key))
+
+
+def get_tile(project, z, x, y, format):
+    key = 'spatial.tiles:{}:{}:{}/{}/{}.{}'.format(
+        project.id, get_version(project.id), z, x, y, format)
+    tile = cache.get(key)
+    if tile is None:
+        if format == 'mvt':
+            tile = render_mvt(project, z, x, y)
+        else:
+            tile = render_geojson(project, z, x, y)
+        cache.set(key, tile, settings.TILE_CACHE_TIMEOUT)
+    return tile
+
+
+def bounds_json(extent):
+    """Returns the ``(xmin, ymin, xmax, ymax)`` box ``extent`` as JSON, in
+    Leaflet's ``[[south, west], [north, east]]`` form, or ``null``."""
+    return json.dumps(extent and [[extent[1], extent[0]],
+                                  [extent[3], extent[2]]])
+
+
+def get_bounds(project):
+    """Returns the bounds of the project's locations as JSON, see
+    ``bounds_json``."""
+    key = 'spatial.bounds:{}:{}'.format(project.id,
+                                        get_version(project.id))
+    bounds = cache.get(key)
+    if bounds is None:
+        extent = project.spatial_units.aggregate(
+            extent=Extent('geometry'))['extent']
+        bounds = bounds_json(extent)
+        cache.set(key, bounds, settings.TILE_CACHE_TIMEOUT)
+    return bounds
@@ -0,0 +1,82 @@
+"""Set-based containment checks between the locations of a project.
+
+Each function answers its question with one query, in which PostGIS
+joins the locations with ST_Contains. ST_Contains compares the bounding
+boxes first, which uses the GiST index on the project and geometry of
+the locations (see migration 0003), so the cost is close to the number
+of candidate pairs rather than the square of the number of locations.
+"""
+from django.db import connection
+from django.utils.encoding import force_text
+
+CONTAINMENT_SQL = """
+    SELECT parent.id, child.id
+    FROM {table} AS parent JOIN {table} AS child
+        ON ST_Contains(parent.geometry, child.geometry)
+    WHERE parent.project_id = %s AND child.project_id = %s
+        AND parent.id <> child.id
+        AND ST_Dimension(parent.geometry) = 2
+"""
+
+CONTAINED_PAIRS_SQL = """
+    SELECT pair.number - 1
+    FROM unnest(%s::varchar[], %s::geometry[]) WITH ORDINALITY
+        AS pair(parent, child, number)
+    JOIN {table} AS parent ON parent.id = pair.parent
+    WHERE ST_Contains(parent.geometry, pair.child)
+"""
+
+
+def containment_pairs(project, parents=None, children=None):
+    """Returns the ``(parent_id, child_id)`` pairs of the project's
+    locations where the area of the parent contains the child. The pairs
+    can be limited to the parents and the children with the IDs in
+    ``parents`` and ``children``."""
+    sql = CONTAINMENT_SQL.format(
+        table=project.spatial_units.model._meta.db_table)
+    params = [project.id, project.id]
+    if parents is not None:
+        sql += ' AND parent.id = ANY(%s)'
+        params.append(list(parents))
+    if children is not None:
+        sql += ' AND child.id = ANY(%s)'
+        params.append(list(children))
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [tuple(row) for row in cursor.fetchall()]
+
+
+def contained_pairs(pairs):
+    """Returns the set of the indexes in ``pairs`` of the ``(parent,
+    child)`` location pairs where the parent contains the child. The
+    parent's stored area is compared with the geometry the child has in
+    memory, so the child need not be saved."""
+    pairs = list(pairs)
+    if not pairs:
+        return set()
+    sql = CONTAINED_PAIRS_SQL.format(
+        table=type(pairs[0][0])._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, ([parent.id for parent, _ in pairs],
+                             [force_text(child.geometry.hexewkb)
+                              for _, child in pairs]))
+        return {row[0] for row in cursor.fetchall()}
+
+
+def suggest_parents(location):
+    """Returns the IDs of the locations of the project whose area
+    contains ``location``."""
+    if location.geometry is None:
+        return []
+    return [parent for parent, _ in containment_pairs(
+        location.project, children=[location.id])]
+
+
+def suggest_children(location):
+    """Returns the IDs of the locations of the project contained in the
+    area of ``location``."""
+    if location.geometry is None or location.geometry.dims != 2:
+        return []
+    return [child for _, child in containment_pairs(
+        location.project, parents=[location.id])]
@@ -8,6 +8,10 @@ urlpatterns = [
         r'^$',
         api.SpatialUnitList.as_view(),
         name='list'),
+    url(
+        r'^tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.(?P<format>mvt|geojson)$',
+        api.SpatialUnitTiles.as_view(),
+        name='tiles'),
     url(
         r'^(?P<spatial_id>[-\w]+)/$',
         api.SpatialUnitDetail.as_view(),
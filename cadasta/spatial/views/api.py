@@ -1,13 +1,21 @@
+from django.contrib.gis.geos import Polygon
 from rest_framework import generics, filters, status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from tutelary.mixins import APIPermissionRequiredMixin
 
-from spatial import serializers
+from core.pagination import GeoJsonCursorPagination, PaginatedListMixin
+
+from spatial import renderers, serializers, tiles
 from . import mixins
+from .. import messages
+from ..functions import SimplifyPreserveTopology
 
 
 class SpatialUnitList(APIPermissionRequiredMixin,
+                      PaginatedListMixin,
                       mixins.SpatialQuerySetMixin,
+                      mixins.SimplifyGeometryMixin,
                       generics.ListCreateAPIView):
     def get_actions(self, request):
         if self.get_project().public():
@@ -16,6 +24,7 @@ class SpatialUnitList(APIPermissionRequiredMixin,
             return ['project.view_private', 'spatial.list']
 
     serializer_class = serializers.SpatialUnitSerializer
+    pagination_class = GeoJsonCursorPagination
     filter_backends = (filters.DjangoFilterBackend,
                        filters.SearchFilter,
                        filters.OrderingFilter,)
@@ -29,6 +38,63 @@ class SpatialUnitList(APIPermissionRequiredMixin,
     def get_perms_objects(self):
         return [self.get_project()]
 
+    def get_bbox(self):
+        bbox = self.request.query_params.get('bbox')
+        if not bbox:
+            return None
+        try:
+            west, south, east, north = (float(c) for c in bbox.split(','))
+        except ValueError:
+            raise ValidationError({'bbox': messages.INVALID_BBOX})
+        envelope = Polygon.from_bbox((west, south, east, north))
+        envelope.srid = 4326
+        return envelope
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        # ST_Intersects compares the bounding boxes first, which uses the
+        # GiST index of the geometry column.
+        envelope = self.get_bbox()
+        if envelope is not None:
+            queryset = queryset.filter(geometry__intersects=envelope)
+
+        tolerance = self.get_simplify_tolerance()
+        if tolerance:
+            queryset = queryset.defer('geometry').annotate(
+                simplified_geometry=SimplifyPreserveTopology(
+                    'geometry', tolerance))
+
+        return queryset
+
+
+class SpatialUnitTiles(APIPermissionRequiredMixin,
+                       mixins.SpatialQuerySetMixin,
+                       generics.GenericAPIView):
+    def get_actions(self, request):
+        if self.get_project().public():
+            return ['project.view', 'spatial.list']
+        else:
+            return ['project.view_private', 'spatial.list']
+
+    renderer_classes = (renderers.GeoJSONTileRenderer,
+                        renderers.MVTRenderer)
+    permission_required = {
+        'GET': get_actions,
+    }
+
+    def get_perms_objects(self):
+        return [self.get_project()]
+
+    def get(self, request, *args, **kwargs):
+        z, x, y = (int(self.kwargs[c]) for c in ('z', 'x', 'y'))
+        format = self.kwargs['format']
+        if (not tiles.valid_tile(z, x, y) or
+                (format == 'mvt' and not tiles.mvt_supported())):
+            raise NotFound()
+
+        return Response(tiles.get_tile(self.get_project(), z, x, y, format))
+
 
 class SpatialUnitDetail(APIPermissionRequiredMixin,
                         mixins.SpatialQuerySetMixin,
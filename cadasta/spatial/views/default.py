@@ -1,18 +1,18 @@
-import json
-from jsonattrs.mixins import JsonAttrsMixin
 import django.views.generic as base_generic
 from core.views import generic
+from django.conf import settings
 from django.core.urlresolvers import reverse
 
 from core.mixins import LoginPermissionRequiredMixin
+from core.views.mixins import JsonAttrsMixin
 
 from resources.forms import AddResourceFromLibraryForm
 from resources.views import mixins as resource_mixins
 from party.messages import TENURE_REL_CREATE
 from . import mixins
+from organization import pages
 from organization.views import mixins as organization_mixins
-from .. import forms
-from ..serializers import SpatialUnitGeoJsonSerializer
+from .. import forms, tiles
 from .. import messages as error_messages
 
 
@@ -24,6 +24,14 @@ class LocationsList(LoginPermissionRequiredMixin,
     permission_required = 'spatial.list'
     permission_denied_message = error_messages.SPATIAL_LIST
 
+    def get_context_data(self, *args, **kwargs):
+        context = super().get_context_data(*args, **kwargs)
+        context['locations_bounds'] = tiles.get_bounds(context['object'])
+        context['map_version'] = pages.get_project_version(
+            context['object'].id)
+        context['page_cache_timeout'] = settings.PAGE_CACHE_TIMEOUT
+        return context
+
 
 class LocationsAdd(LoginPermissionRequiredMixin,
                    mixins.SpatialQuerySetMixin,
@@ -127,16 +135,6 @@ class LocationResourceNew(LoginPermissionRequiredMixin,
     permission_required = 'spatial.resources.add'
     permission_denied_message = error_messages.SPATIAL_ADD_RESOURCE
 
-    def get_context_data(self, *args, **kwargs):
-        context = super().get_context_data(*args, **kwargs)
-        project_locations = context['object'].spatial_units
-        context['geojson'] = json.dumps(
-            SpatialUnitGeoJsonSerializer(
-                project_locations.exclude(id=context['location'].id),
-                many=True).data
-        )
-        return context
-
 
 class TenureRelationshipAdd(LoginPermissionRequiredMixin,
                             mixins.SpatialUnitRelationshipMixin,
@@ -150,15 +148,6 @@ class TenureRelationshipAdd(LoginPermissionRequiredMixin,
     def get_perms_objects(self):
         return [self.get_project()]
 
-    def get_context_data(self, *args, **kwargs):
-        context = super().get_context_data(*args, **kwargs)
-
-        context['geojson'] = json.dumps(
-            SpatialUnitGeoJsonSerializer(self.get_queryset(), many=True).data
-        )
-
-        return context
-
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
 
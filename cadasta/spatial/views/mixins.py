@@ -1,10 +1,11 @@
-import json
+from django.conf import settings
 from django.http import Http404
 from django.core.urlresolvers import reverse
 from organization.views.mixins import ProjectMixin
 from resources.views.mixins import ResourceViewMixin
+from rest_framework.exceptions import ValidationError
 
-from ..serializers import SpatialUnitGeoJsonSerializer
+from .. import messages
 from ..models import SpatialUnit
 
 
@@ -16,14 +17,6 @@ class SpatialQuerySetMixin(ProjectMixin):
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         context['object'] = self.get_project()
-        locations = self.get_queryset()
-
-        if locations.model == SpatialUnit:
-            context['geojson'] = json.dumps(
-                SpatialUnitGeoJsonSerializer(
-                    self.get_queryset(), many=True).data
-            )
-
         return context
 
     def get_serializer_context(self, *args, **kwargs):
@@ -43,6 +36,34 @@ class SpatialQuerySetMixin(ProjectMixin):
         return reverse('locations:detail', kwargs=kwargs)
 
 
+class SimplifyGeometryMixin:
+    """Reads how API views should simplify the geometries of locations
+    from the query parameters."""
+
+    def get_simplify_tolerance(self):
+        """Returns the simplification tolerance in degrees: either the
+        `simplify` parameter, or the size of a pixel at `zoom`."""
+        params = self.request.query_params
+        if params.get('simplify'):
+            try:
+                tolerance = float(params['simplify'])
+            except ValueError:
+                tolerance = -1
+            if tolerance < 0:
+                raise ValidationError({'simplify': messages.INVALID_SIMPLIFY})
+            return tolerance
+
+        if params.get('zoom'):
+            try:
+                zoom = int(params['zoom'])
+            except ValueError:
+                zoom = -1
+            if not 0 <= zoom <= settings.TILE_MAX_ZOOM:
+                raise ValidationError({'zoom': messages.INVALID_ZOOM.format(
+                    max_zoom=settings.TILE_MAX_ZOOM)})
+            return 360 / (256 * 2 ** zoom)
+
+
 class SpatialRelationshipQuerySetMixin(ProjectMixin):
     def get_queryset(self):
         self.proj = self.get_project()
@@ -68,29 +89,10 @@ class SpatialUnitObjectMixin(SpatialQuerySetMixin):
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         context['location'] = self.get_object()
-
-        locations = self.get_queryset()
-        if locations.model == SpatialUnit:
-            context['geojson'] = json.dumps(
-                SpatialUnitGeoJsonSerializer(
-                    locations.exclude(id=context['location'].id),
-                    many=True).data
-            )
         return context
 
 
 class SpatialUnitResourceMixin(ResourceViewMixin, SpatialUnitObjectMixin):
-    def get_context_data(self, *args, **kwargs):
-        context = super().get_context_data(*args, **kwargs)
-
-        locs = context['object'].spatial_units.exclude(
-            id=context['location'].id)
-        context['geojson'] = json.dumps(
-            SpatialUnitGeoJsonSerializer(locs, many=True).data
-        )
-
-        return context
-
     def get_content_object(self):
         return self.get_object()
 
@@ -1,28 +1,45 @@
+from django.conf import settings
+from django.core.urlresolvers import reverse
 from django.forms.widgets import Widget
+from django.utils.html import format_html
 from django.utils.translation import ugettext as _
 from party.models import Party
 
 
 class SelectPartyWidget(Widget):
+    """Select of the project's parties. Only the selected party is
+    rendered; the others are looked up with the party search API as the
+    user types, see templates/spatial/relationship_add.html."""
+
     def __init__(self, project, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.project = project
 
+    def get_search_url(self):
+        return reverse('api:v1:party:search', kwargs={
+            'organization': self.project.organization.slug,
+            'project': self.project.slug,
+        })
+
     def render(self, name, value, attrs={}):
-        prj_parties = Party.objects.filter(project_id=self.project)
-        parties = [
-            '<option value="' + p.id + '" data-type="' +
-            p.get_type_display() + '"' +
-            (' selected="selected"' if p.id == value else '') + '>' +
-            p.name + '</option>' for p in prj_parties
-        ]
-
-        return (
-            '<select id="party-select" name="{name}">'
-            '<option value="" data-type="">Please select a party</option>'
-            '{parties}'
-            '</select>'
-        ).format(parties=''.join(parties), name=name)
+        selected = ''
+        party = value and Party.objects.filter(
+            project=self.project, id=value).first()
+        if party:
+            selected = format_html(
+                '<option value="{}" data-type="{}" selected="selected">'
+                '{}</option>',
+                party.id, party.get_type_display(), party.name)
+
+        return format_html(
+            '<select id="party-select" name="{name}" data-url="{url}" '
+            'data-limit="{limit}">'
+            '<option value="" data-type="">{placeholder}</option>'
+            '{selected}'
+            '</select>',
+            name=name, url=self.get_search_url(),
+            limit=settings.PARTY_SEARCH_LIMIT,
+            placeholder=_("Please select a party"), selected=selected)
 
 
 class NewEntityWidget(Widget):
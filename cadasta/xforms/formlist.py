@@ -0,0 +1,60 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from core.cache import get_version, increment_version
+from core.permissions import is_superuser
+from questionnaires.models import Questionnaire
+
+from .renderers import XFormListRenderer
+from .serializers import XFormListSerializer
+
+VERSION_KEY = 'xforms.formlist.version'
+
+
+def invalidate_form_lists():
+    increment_version(VERSION_KEY)
+
+
+def get_user_forms(user):
+    """Returns the current questionnaires of the projects in the user's
+    organizations, or all questionnaires for superusers."""
+    if is_superuser(user):
+        return Questionnaire.objects.all()
+    return Questionnaire.objects.filter(
+        project__organization__users=user,
+        project__current_questionnaire=F('id'))
+
+
+def render_form_list(request):
+    serializer = XFormListSerializer(get_user_forms(request.user), many=True,
+                                     context={'request': request})
+    return XFormListRenderer().render(serializer.data).encode()
+
+
+def get_form_list(request):
+    """Returns the ETag and the XML of the user's form list. The download
+    URLs in the list depend on the host and protocol of the request, so
+    they are part of the cache key."""
+    origin = hashlib.md5('{} {}'.format(
+        request.META.get('SERVER_PROTOCOL'),
+        request.META.get('HTTP_HOST')).encode()).hexdigest()
+    key = 'xforms.formlist:{}:{}:{}'.format(get_version(VERSION_KEY),
+                                            request.user.id, origin)
+    form_list = cache.get(key)
+    if form_list is None:
+        content = render_form_list(request)
+        form_list = ('"{}"'.format(hashlib.md5(content).hexdigest()),
+                     content)
+        cache.set(key, form_list, settings.FORM_LIST_CACHE_TIMEOUT)
+    return form_list
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    etags = [e.strip() for e in if_none_match.split(',')]
+    return etag in etags or '*' in etags
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from core.benchmarks import Benchmark, create_project_records, run_in_rollback
+from core.util import random_id
+from questionnaires.models import Questionnaire
+
+from ...mixins.model_helper import ModelHelper
+from ...models import XFormSubmission
+
+SUBMISSION = """<?xml version='1.0' ?>
+<benchmark id="{id_string}" version="{version}">
+    <party_type>IN</party_type>
+    <party_name>Party {number}</party_name>
+    <location_geometry>{lat} {lng} 0.0 0.0;</location_geometry>
+    <location_type>PA</location_type>
+    <tenure_type>FH</tenure_type>
+    <meta>
+        <instanceID>uuid:{number}</instanceID>
+    </meta>
+</benchmark>
+"""
+
+
+class Command(BaseCommand):
+    help = """Compares storing XForm submissions one at a time with the
+            batched ingestion, in submissions per second, on a generated
+            project. Nothing is written to the database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submissions',
+                            nargs='+',
+                            type=int,
+                            dest='submissions',
+                            default=[1000],
+                            help="""Numbers of submissions to store.""")
+
+    def make_submissions(self, questionnaire, count):
+        return [
+            ('{}.xml'.format(i), SUBMISSION.format(
+                id_string=questionnaire.id_string,
+                version=questionnaire.version, number=i,
+                lat=i % 180 - 90, lng=i % 360 - 180).encode())
+            for i in range(count)
+        ]
+
+    def store_one_at_a_time(self, submissions, user):
+        helper = ModelHelper()
+        for name, xml_submission_file in submissions:
+            with transaction.atomic():
+                full_submission, data = helper.parse_submission(
+                    xml_submission_file)
+                questionnaire, party, location = helper.create_models(data)
+                XFormSubmission.objects.create(
+                    json_submission=full_submission, user=user,
+                    questionnaire=questionnaire)
+
+    def run(self, count):
+        project = create_project_records(0)
+        questionnaire = Questionnaire.objects.create(
+            project=project, id_string='benchmark', version=1,
+            title='Benchmark', filename='benchmark')
+        project.current_questionnaire = questionnaire.id
+        project.save()
+        user = User.objects.create(username='benchmark-' + random_id(),
+                                   email='benchmark@example.com')
+
+        with Benchmark('one at a time', count) as bench:
+            self.store_one_at_a_time(
+                self.make_submissions(questionnaire, count), user)
+        self.stdout.write(str(bench))
+
+        with Benchmark('batched', count) as bench:
+            ModelHelper().upload_submissions(
+                self.make_submissions(questionnaire, count), user)
+        self.stdout.write(str(bench))
+
+    def handle(self, *args, **options):
+        for count in sorted(options['submissions']):
+            run_in_rollback(self.run, count)
@@ -1,18 +1,35 @@
+from collections import namedtuple
+
 from shapely.geometry import LineString, Point, Polygon
 from shapely.wkt import dumps
 
+from core.models import create_historical_records
 from django.core.exceptions import ValidationError
 from django.core.files.storage import get_storage_class
 from django.db import transaction
 from django.utils.translation import ugettext as _
+from organization.statistics import merge_extents, record_change
 from party.models import Party, TenureRelationship, TenureRelationshipType
 from pyxform.xform2json import XFormToDict
 from questionnaires.models import Questionnaire
 from resources.models import Resource
-from spatial.models import SpatialUnit
+from resources.validators import validate_file_type
+from spatial.models import SpatialUnit, reassign_spatial_geometry
+from spatial.tiles import invalidate_tiles
 from xforms.exceptions import InvalidXMLSubmission
 from xforms.models import XFormSubmission
 
+# Outcome of one submission of a batch; `error` is None for submissions
+# that were stored.
+SubmissionResult = namedtuple('SubmissionResult',
+                              ('name', 'instance_id', 'error'))
+
+# Models created for an accepted submission of a batch.
+SubmissionModels = namedtuple(
+    'SubmissionModels',
+    ('full_submission', 'data', 'questionnaire', 'party', 'location',
+     'tenure', 'files'))
+
 
 class ModelHelper():
     """
@@ -22,8 +39,10 @@ class ModelHelper():
 
     def __init__(self, *arg):
         self.arg = arg
+        self._questionnaires = {}
+        self._tenure_types = None
 
-    def create_models(self, data):
+    def get_current_questionnaire(self, data):
         questionnaire = self.get_questionnaire(
             id_string=data['id'], version=data['version']
         )
@@ -31,6 +50,11 @@ class ModelHelper():
 
         if project.current_questionnaire != questionnaire.id:
             raise InvalidXMLSubmission(_('Form out of date'))
+        return questionnaire
+
+    def create_models(self, data):
+        questionnaire = self.get_current_questionnaire(data)
+        project = questionnaire.project
 
         party = self.create_party(
             data=data,
@@ -53,9 +77,9 @@ class ModelHelper():
 
         return questionnaire, party.id, location.id
 
-    def create_party(self, data, project):
+    def build_party(self, data, project):
         try:
-            party = Party.objects.create(
+            return Party(
                 project=project,
                 name=data['party_name'],
                 type=data['party_type'],
@@ -64,9 +88,17 @@ class ModelHelper():
         except Exception as e:
             raise InvalidXMLSubmission(_(
                 "Party error: {}".format(e)))
+
+    def create_party(self, data, project):
+        party = self.build_party(data, project)
+        try:
+            party.save()
+        except Exception as e:
+            raise InvalidXMLSubmission(_(
+                "Party error: {}".format(e)))
         return party
 
-    def create_spatial_unit(self, data, project, questionnaire, party=None):
+    def build_spatial_unit(self, data, project):
         if 'location_geotrace' in data.keys():
             location_geometry = data['location_geotrace']
             geoshape = False
@@ -77,7 +109,7 @@ class ModelHelper():
             location_geometry = data['location_geometry']
             geoshape = False
         try:
-            location = SpatialUnit.objects.create(
+            return SpatialUnit(
                 project=project,
                 type=data['location_type'],
                 geometry=self._format_geometry(location_geometry, geoshape),
@@ -86,22 +118,38 @@ class ModelHelper():
         except Exception as e:
             raise InvalidXMLSubmission(_(
                 'Location error: {}'.format(e)))
+
+    def create_spatial_unit(self, data, project, questionnaire, party=None):
+        location = self.build_spatial_unit(data, project)
+        try:
+            location.save()
+        except Exception as e:
+            raise InvalidXMLSubmission(_(
+                'Location error: {}'.format(e)))
         return location
 
-    def create_tenure_relationship(self, data, party, location, project):
+    def build_tenure_relationship(self, data, party, location, project):
         try:
-            TenureRelationship.objects.create(
+            return TenureRelationship(
                 project=project,
                 party=party,
                 spatial_unit=location,
-                tenure_type=TenureRelationshipType.objects.get(
-                    id=data['tenure_type']),
+                tenure_type=self.get_tenure_type(data['tenure_type']),
                 attributes=self.get_attributes(data, 'tenure_relationship')
             )
         except Exception as e:
             raise InvalidXMLSubmission(_(
                 "Tenure relationship error: {}".format(e)))
 
+    def create_tenure_relationship(self, data, party, location, project):
+        tenure = self.build_tenure_relationship(data, party, location,
+                                                project)
+        try:
+            tenure.save()
+        except Exception as e:
+            raise InvalidXMLSubmission(_(
+                "Tenure relationship error: {}".format(e)))
+
     def add_file_to_resource(self, data, user, project, content_object=None):
         Storage = get_storage_class()
         storage = Storage()
@@ -152,12 +200,25 @@ class ModelHelper():
             return dumps(Point(float(latlng[1]), float(latlng[0])))
 
     def get_questionnaire(self, id_string, version):
+        key = (id_string, version)
+        if key not in self._questionnaires:
+            try:
+                self._questionnaires[key] = Questionnaire.objects.get(
+                    id_string=id_string, version=int(version)
+                )
+            except Questionnaire.DoesNotExist:
+                raise ValidationError(_('Questionnaire not found.'))
+        return self._questionnaires[key]
+
+    def get_tenure_type(self, id):
+        if self._tenure_types is None:
+            self._tenure_types = {
+                t.id: t for t in TenureRelationshipType.objects.all()}
         try:
-            return Questionnaire.objects.get(
-                id_string=id_string, version=int(version)
-            )
-        except Questionnaire.DoesNotExist:
-            raise ValidationError(_('Questionnaire not found.'))
+            return self._tenure_types[id]
+        except KeyError:
+            raise TenureRelationshipType.DoesNotExist(
+                "TenureRelationshipType matching query does not exist.")
 
     def get_attributes(self, data, model_type):
         attributes = {}
@@ -175,12 +236,8 @@ class ModelHelper():
         if 'xml_submission_file' not in request.data.keys():
             raise InvalidXMLSubmission(_('XML submission not found'))
 
-        xml_submission_file = request.data['xml_submission_file'].read()
-        full_submission = XFormToDict(
-            xml_submission_file.decode('utf-8')
-        ).get_dict()
-
-        submission = full_submission[list(full_submission.keys())[0]]
+        full_submission, submission = self.parse_submission(
+            request.data['xml_submission_file'].read())
 
         with transaction.atomic():
             questionnaire, party, location = self.create_models(submission)
@@ -201,6 +258,13 @@ class ModelHelper():
             user=request.user,
             questionnaire=questionnaire)
 
+    def parse_submission(self, xml_submission_file):
+        full_submission = XFormToDict(
+            xml_submission_file.decode('utf-8')
+        ).get_dict()
+        submission = full_submission[list(full_submission.keys())[0]]
+        return full_submission, submission
+
     def upload_files(self, request, data):
         user = request.user
         files = request.FILES
@@ -219,3 +283,151 @@ class ModelHelper():
                                       user=user,
                                       project=project,
                                       content_object=content_object)
+
+    # ~~~~~~~~~~~~~~~
+    # Batched ingestion
+    # ~~~~~~~~~~~~~~~
+    def build_submission(self, xml_submission_file, files):
+        """Parses and validates one submission of a batch and returns its
+        unsaved models. Nothing is written to the database."""
+        try:
+            full_submission, data = self.parse_submission(
+                xml_submission_file)
+        except Exception:
+            raise InvalidXMLSubmission(_('Invalid XML submission'))
+
+        try:
+            questionnaire = self.get_current_questionnaire(data)
+        except (KeyError, ValueError, ValidationError):
+            raise InvalidXMLSubmission(_('Questionnaire not found.'))
+        project = questionnaire.project
+
+        party = self.build_party(data, project)
+        location = self.build_spatial_unit(data, project)
+        tenure = self.build_tenure_relationship(data, party, location,
+                                                project)
+        if location.geometry:
+            # bulk_create does not send the pre_save signal that wraps
+            # longitudes into [-180, 180].
+            reassign_spatial_geometry(location)
+
+        # The models are inserted together with the rest of the batch, so
+        # a submission the database would reject is rejected here instead.
+        self.validate_model(party, 'Party error', exclude=('contacts',))
+        self.validate_model(location, 'Location error')
+        self.validate_model(
+            tenure, 'Tenure relationship error',
+            exclude=('party', 'spatial_unit', 'tenure_type'))
+
+        attachments = {}
+        for file_name in (data.get('location_photo'),
+                          data.get('party_photo')):
+            if file_name in files:
+                try:
+                    validate_file_type(files[file_name].content_type)
+                except ValidationError as e:
+                    raise InvalidXMLSubmission(e.messages[0])
+                file = files[file_name]
+                self.validate_model(
+                    Resource(name=file.name, original_file=file.name,
+                             mime_type=file.content_type),
+                    'Resource error',
+                    exclude=('file', 'contributor', 'file_versions'))
+                attachments[file_name] = file
+
+        return SubmissionModels(
+            full_submission=full_submission, data=data,
+            questionnaire=questionnaire, party=party, location=location,
+            tenure=tenure, files=attachments)
+
+    def validate_model(self, instance, error, exclude=()):
+        """Runs the field validation of the unsaved ``instance``, except
+        for the fields set when it is inserted."""
+        try:
+            instance.full_clean(
+                exclude=('id', 'project', 'attributes') + tuple(exclude),
+                validate_unique=False)
+        except ValidationError as e:
+            raise InvalidXMLSubmission(_("{}: {}".format(error, e)))
+
+    def bulk_create_models(self, model, instances, user=None):
+        """Gives ``instances`` ids and inserts them, together with their
+        history rows, in a single query each."""
+        model.bulk_insert(instances)
+        create_historical_records(model, instances, user)
+
+    def upload_submissions(self, submissions, user, files=None):
+        """Ingests a batch of submissions in one transaction.
+
+        ``submissions`` is a list of ``(name, xml_submission_file)``
+        pairs and ``files`` maps file names to the uploaded photos they
+        refer to. Submissions that fail validation are skipped; the
+        others are stored with a few bulk inserts instead of several
+        queries per submission. Returns a SubmissionResult for each
+        submission, in order.
+        """
+        accepted = []
+        results = []
+        for name, xml_submission_file in submissions:
+            try:
+                models = self.build_submission(xml_submission_file,
+                                               files or {})
+            except InvalidXMLSubmission as e:
+                results.append(SubmissionResult(name, None, str(e)))
+                continue
+            accepted.append(models)
+            instance_id = models.data.get('meta', {}).get('instanceID')
+            results.append(SubmissionResult(name, instance_id, None))
+
+        if not accepted:
+            return results
+
+        with transaction.atomic():
+            self.bulk_create_models(
+                Party, [m.party for m in accepted], user)
+            self.bulk_create_models(
+                SpatialUnit, [m.location for m in accepted], user)
+            for m in accepted:
+                # The ids of the party and location were assigned after
+                # the relationship was built.
+                m.tenure.party = m.party
+                m.tenure.spatial_unit = m.location
+            self.bulk_create_models(
+                TenureRelationship, [m.tenure for m in accepted], user)
+            self.bulk_create_models(XFormSubmission, [
+                XFormSubmission(json_submission=m.full_submission,
+                                user=user, questionnaire=m.questionnaire)
+                for m in accepted
+            ])
+
+            for m in accepted:
+                project = m.questionnaire.project
+                for file_name, file in m.files.items():
+                    if file_name == m.data.get('location_photo'):
+                        content_object = m.location
+                    else:
+                        content_object = m.party
+                    self.add_file_to_resource(data=file,
+                                              user=user,
+                                              project=project,
+                                              content_object=content_object)
+
+            # bulk_create does not send the post_save signals that update
+            # the project statistics.
+            by_project = {}
+            for m in accepted:
+                by_project.setdefault(m.questionnaire.project_id, []).append(m)
+            for project_id, project_models in by_project.items():
+                record_change(
+                    project_id,
+                    num_parties=len(project_models),
+                    num_locations=len(project_models),
+                    num_relationships=len(project_models),
+                    extent=merge_extents(
+                        m.location.geometry.extent for m in project_models
+                        if m.location.geometry is not None))
+
+        for project_id in {m.questionnaire.project_id for m in accepted}:
+            invalidate_tiles(project_id)
+
+        return results
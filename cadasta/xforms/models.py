@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.postgres.fields import JSONField
+from django.dispatch import receiver
+from tutelary.models import PermissionSet
 from core.models import RandomIDModel
+from organization.models import OrganizationRole, Project
 from questionnaires.models import Questionnaire
 from accounts.models import User
 
@@ -10,3 +13,17 @@ class XFormSubmission(RandomIDModel):
     user = models.ForeignKey(User, related_name='submissions', null=False)
     questionnaire = models.ForeignKey(
         Questionnaire, null=False, related_name='submissions')
+
+
+@receiver(models.signals.post_save, sender=Questionnaire)
+@receiver(models.signals.post_delete, sender=Questionnaire)
+@receiver(models.signals.post_save, sender=Project)
+@receiver(models.signals.post_delete, sender=Project)
+@receiver(models.signals.post_save, sender=OrganizationRole)
+@receiver(models.signals.post_delete, sender=OrganizationRole)
+@receiver(models.signals.m2m_changed, sender=PermissionSet.users.through)
+def invalidate_form_list_cache(sender, **kwargs):
+    # The form list module imports the serializers, which import this
+    # module.
+    from .formlist import invalidate_form_lists
+    invalidate_form_lists()
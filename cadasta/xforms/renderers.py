@@ -21,10 +21,11 @@ class XFormListRenderer(renderers.BaseRenderer):
         """
         Renders *obj* into serialized XML.
         """
-        # if data is None:
-        #     return ''
-        # elif isinstance(data, six.string_types):
-        #     return data
+        if data is None:
+            return b''
+        elif isinstance(data, bytes):
+            # The form list has been rendered and cached already.
+            return data
 
         stream = StringIO()
 
@@ -16,3 +16,10 @@ class XFormsUrlTest(TestCase):
 
         resolved = resolve('/collect/submission')
         assert resolved.func.__name__ == api.XFormSubmissionViewSet.__name__
+
+    def test_xforms_bulk_submission(self):
+        assert reverse('bulk-submissions') == '/collect/bulk-submission'
+
+        resolved = resolve('/collect/bulk-submission')
+        assert (resolved.func.__name__ ==
+                api.XFormBulkSubmissionViewSet.__name__)
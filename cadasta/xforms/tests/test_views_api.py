@@ -9,6 +9,7 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import InMemoryUploadedFile
+from rest_framework.test import APIRequestFactory, force_authenticate
 from skivvy import APITestCase
 
 from accounts.tests.factories import UserFactory
@@ -25,6 +26,7 @@ from questionnaires.tests.utils import get_form
 from resources.models import Resource
 from spatial.models import SpatialUnit
 from tutelary.models import Role
+from xforms.models import XFormSubmission
 from xforms.tests.files.test_resources import responses
 
 from ..views import api
@@ -106,6 +108,57 @@ class XFormListTest(APITestCase, UserTestCase, TestCase):
         assert xml.find(
             './/xf:xform/xf:formID', namespaces=ns).text == 'form_2'
 
+    def test_get_xforms_is_cached(self):
+        OrganizationRole.objects.create(
+            organization=self.org, user=self.user, admin=True)
+        self._get_questionnaire()
+        response = self.request(user=self.user)
+
+        with self.assertNumQueries(0):
+            cached = self.request(user=self.user)
+        assert cached.content == response.content
+
+    def test_get_xforms_cache_is_invalidated(self):
+        OrganizationRole.objects.create(
+            organization=self.org, user=self.user, admin=True)
+        self.request(user=self.user)
+
+        questionnaire = self._get_questionnaire()
+        response = self.request(user=self.user)
+        assert questionnaire.md5_hash in response.content
+
+        OrganizationRole.objects.get(user=self.user).delete()
+        response = self.request(user=self.user)
+        assert questionnaire.md5_hash not in response.content
+
+    def test_get_xforms_not_modified(self):
+        OrganizationRole.objects.create(
+            organization=self.org, user=self.user, admin=True)
+        self._get_questionnaire()
+        view = self.view_class.as_view(self.viewset_actions)
+
+        request = APIRequestFactory().get('/collect/formList/')
+        force_authenticate(request, user=self.user)
+        response = view(request)
+        assert response.status_code == 200
+        etag = response['ETag']
+
+        request = APIRequestFactory().get('/collect/formList/',
+                                          HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.user)
+        response = view(request)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert response.render().content == b''
+
+        self._get_questionnaire(id='form_2', version=2016072516330113)
+        request = APIRequestFactory().get('/collect/formList/',
+                                          HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.user)
+        response = view(request)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
     def test_get_without_data(self):
         OrganizationRole.objects.create(
             organization=self.org, user=self.user, admin=True)
@@ -115,10 +168,7 @@ class XFormListTest(APITestCase, UserTestCase, TestCase):
         assert 'hash' not in response
 
 
-class XFormSubmissionTest(APITestCase, UserTestCase, TestCase):
-    view_class = api.XFormSubmissionViewSet
-    viewset_actions = {'post': 'create', 'head': 'create'}
-
+class SubmissionTestCase:
     def setup_models(self):
         self.user = UserFactory.create()
         self.org = OrganizationFactory.create()
@@ -249,6 +299,12 @@ class XFormSubmissionTest(APITestCase, UserTestCase, TestCase):
         ns = {'or': 'http://openrosa.org/http/response'}
         return xml.find('.//or:message', namespaces=ns).text
 
+
+class XFormSubmissionTest(SubmissionTestCase, APITestCase, UserTestCase,
+                          TestCase):
+    view_class = api.XFormSubmissionViewSet
+    viewset_actions = {'post': 'create', 'head': 'create'}
+
     def test_submission_upload(self):
         data = self._submission(form='form',
                                 image=['test_image_one', 'test_image_two'])
@@ -387,3 +443,100 @@ class XFormSubmissionTest(APITestCase, UserTestCase, TestCase):
                                 content_type='multipart/form-data')
         msg = self._getResponseMessage(response)
         assert msg == 'Form out of date'
+
+
+class XFormBulkSubmissionTest(SubmissionTestCase, APITestCase, UserTestCase,
+                              TestCase):
+    view_class = api.XFormBulkSubmissionViewSet
+    viewset_actions = {'post': 'create', 'head': 'create'}
+
+    def _bulk_submission(self, forms, image=[]):
+        data = self._submission(form=forms[0], image=image)
+        data['xml_submission_file'] = [
+            self._make_form_file(str.encode(responses[form]).decode('ascii'))
+            for form in forms]
+        return data
+
+    def _getSubmissionResults(self, response):
+        xml = etree.fromstring(response.content)
+        ns = {'or': 'http://openrosa.org/http/response'}
+        return [(s.get('status'), s.text)
+                for s in xml.findall('.//or:submission', namespaces=ns)]
+
+    def test_bulk_submission_upload(self):
+        data = self._bulk_submission(
+            forms=['form', 'line_form', 'poly_form'],
+            image=['test_image_one', 'test_image_two'])
+
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 201
+        assert (self._getResponseMessage(response) ==
+                '3 of 3 submissions were stored.')
+
+        party = Party.objects.get(name='Bilbo Baggins')
+        location = SpatialUnit.objects.get(attributes={'name': 'Middle Earth'})
+        assert location in party.tenure_relationships.all()
+        assert party.history.count() == 1
+        assert location.history.count() == 1
+        assert len(location.resources) == 1
+        assert len(party.resources) == 1
+
+        geom = SpatialUnit.objects.get(attributes={'name': 'Line'})
+        assert geom.geometry.geom_type == 'LineString'
+        geom = SpatialUnit.objects.get(attributes={'name': 'Polygon'})
+        assert geom.geometry.geom_type == 'Polygon'
+        assert XFormSubmission.objects.count() == 3
+
+    def test_bulk_submission_reports_invalid_submissions(self):
+        data = self._bulk_submission(
+            forms=['line_form', 'bad_party_form', 'bad_tenure_form'])
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 201
+        assert (self._getResponseMessage(response) ==
+                '1 of 3 submissions were stored.')
+        assert self._getSubmissionResults(response) == [
+            ('201', 'Submission stored.'),
+            ('400', "Party error: 'party_name'"),
+            ('400', "Tenure relationship error: 'tenure_type'"),
+        ]
+        assert Party.objects.count() == 1
+        assert SpatialUnit.objects.count() == 1
+
+    def test_bulk_submission_rejects_submissions_the_database_rejects(self):
+        data = self._bulk_submission(forms=['line_form', 'poly_form'])
+        long_type = responses['form'].replace(
+            '<party_type>IN</party_type>',
+            '<party_type>INDIVIDUAL</party_type>')
+        data['xml_submission_file'].insert(
+            1, self._make_form_file(str.encode(long_type).decode('ascii')))
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 201
+        assert (self._getResponseMessage(response) ==
+                '2 of 3 submissions were stored.')
+        results = self._getSubmissionResults(response)
+        assert results[0] == ('201', 'Submission stored.')
+        assert results[1][0] == '400'
+        assert results[1][1].startswith('Party error:')
+        assert results[2] == ('201', 'Submission stored.')
+        assert Party.objects.count() == 2
+        assert SpatialUnit.objects.count() == 2
+
+    def test_bulk_submission_with_no_valid_submissions(self):
+        data = self._bulk_submission(forms=['bad_location_form'])
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert self._getSubmissionResults(response) == [
+            ('400', "Location error: 'location_type'")]
+        assert Party.objects.count() == 0
+
+    def test_bulk_submission_without_xml(self):
+        data = self._invalid_submission(form='This is not an xml form!')
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert (self._getResponseMessage(response) ==
+                'XML submission not found')
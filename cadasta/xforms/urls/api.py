@@ -10,4 +10,8 @@ urlpatterns = [
         api.XFormSubmissionViewSet.as_view(
             {'post': 'create', 'head': 'create'}),
         name='submissions'),
+    url(r'^bulk-submission$',
+        api.XFormBulkSubmissionViewSet.as_view(
+            {'post': 'create', 'head': 'create'}),
+        name='bulk-submissions'),
 ]
@@ -1,17 +1,17 @@
 import logging
+from xml.sax.saxutils import escape, quoteattr
 
 from django.utils.six import BytesIO
 from django.utils.translation import ugettext as _
-from questionnaires.models import Questionnaire
 from rest_framework import status, viewsets
 from rest_framework.authentication import BasicAuthentication
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from tutelary.models import Role
 from xforms.mixins.model_helper import ModelHelper
 from xforms.mixins.openrosa_headers_mixin import OpenRosaHeadersMixin
+from xforms import formlist
 from xforms.renderers import XFormListRenderer
 from xforms.serializers import XFormListSerializer, XFormSubmissionSerializer
 
@@ -25,6 +25,18 @@ OPEN_ROSA_ENVELOPE = """
     </OpenRosaResponse>
 """
 
+OPEN_ROSA_BULK_ENVELOPE = """
+    <OpenRosaResponse xmlns="http://openrosa.org/http/response">
+        <message>{message}</message>
+        <submissions>{submissions}</submissions>
+    </OpenRosaResponse>
+"""
+
+SUBMISSION_RESULT = (
+    '<submission name={name} instanceID={instance_id} status="{status}">'
+    '{message}</submission>'
+)
+
 
 class XFormSubmissionViewSet(OpenRosaHeadersMixin,
                              viewsets.GenericViewSet):
@@ -78,6 +90,54 @@ class XFormSubmissionViewSet(OpenRosaHeadersMixin,
         )
 
 
+class XFormBulkSubmissionViewSet(XFormSubmissionViewSet):
+    """
+    Serves up the /collect/bulk-submission api requests
+    Stores many submissions in one request: each is sent as an
+    xml_submission_file part, along with the photos they refer to
+    Returns the outcome of every submission
+    """
+
+    def create(self, request, *args, **kwargs):
+        if request.method.upper() == 'HEAD':
+            return Response(headers=self.get_openrosa_headers(request),
+                            status=status.HTTP_204_NO_CONTENT,)
+
+        xml_files = request.FILES.getlist('xml_submission_file')
+        if not xml_files:
+            return self._sendErrorResponse(
+                request, InvalidXMLSubmission(_('XML submission not found')))
+
+        files = {name: file for name, file in request.FILES.items()
+                 if name != 'xml_submission_file'}
+        results = ModelHelper().upload_submissions(
+            [(f.name, f.read()) for f in xml_files], request.user, files)
+
+        stored = len([r for r in results if r.error is None])
+        for result in results:
+            if result.error is not None:
+                logger.debug('{}: {}'.format(result.name, result.error))
+
+        message = _('{stored} of {total} submissions were stored.').format(
+            stored=stored, total=len(results))
+        submissions = ''.join(SUBMISSION_RESULT.format(
+            name=quoteattr(result.name),
+            instance_id=quoteattr(result.instance_id or ''),
+            status=201 if result.error is None else 400,
+            message=escape(result.error or _('Submission stored.'))
+        ) for result in results)
+
+        return Response(
+            OPEN_ROSA_BULK_ENVELOPE.format(message=message,
+                                           submissions=submissions),
+            headers=self.get_openrosa_headers(
+                request, location=False, content_length=False),
+            status=(status.HTTP_201_CREATED if stored else
+                    status.HTTP_400_BAD_REQUEST),
+            content_type='application/xml'
+        )
+
+
 class XFormListView(OpenRosaHeadersMixin,
                     viewsets.ReadOnlyModelViewSet):
     """
@@ -90,29 +150,14 @@ class XFormListView(OpenRosaHeadersMixin,
     renderer_classes = (XFormListRenderer,)
     serializer_class = XFormListSerializer
 
-    def get_user_forms(self):
-        forms = []
-        policies = self.request.user.assigned_policies()
-        orgs = self.request.user.organizations.all()
-        if Role.objects.get(name='superuser') in policies:
-            return Questionnaire.objects.all()
-        for org in orgs:
-            projects = org.projects.all()
-            for project in projects:
-                try:
-                    questionnaire = Questionnaire.objects.get(
-                        id=project.current_questionnaire
-                    )
-                    forms.append(questionnaire)
-                except Questionnaire.DoesNotExist:
-                    pass
-        return forms
-
     def get_queryset(self):
-        return self.get_user_forms()
+        return formlist.get_user_forms(self.request.user)
 
     def list(self, request, *args, **kwargs):
-        self.object_list = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(self.object_list, many=True)
-        return Response(
-            serializer.data, headers=self.get_openrosa_headers(request))
+        etag, form_list = formlist.get_form_list(request)
+        headers = self.get_openrosa_headers(request)
+        headers['ETag'] = etag
+        if formlist.etag_matches(request, etag):
+            return Response(headers=headers,
+                            status=status.HTTP_304_NOT_MODIFIED)
+        return Response(form_list, headers=headers)